@@ -6,7 +6,15 @@ from typing import TYPE_CHECKING, cast
 
 from fastapi import Depends, Request
 
-from app.application.services import AuthService, FileService, MaterialService, TestService, UserService
+from app.application.services import (
+    AuthService,
+    FileService,
+    GenerationJobService,
+    MaterialService,
+    MonitoringService,
+    TestService,
+    UserService,
+)
 
 if TYPE_CHECKING:  # pragma: no cover - only for type hints
     from app.bootstrap import AppContainer
@@ -29,6 +37,10 @@ def get_test_service(container=Depends(get_app_container)) -> TestService:
     return container.provide_test_service()
 
 
+def get_generation_job_service(container=Depends(get_app_container)) -> GenerationJobService:
+    return container.provide_generation_job_service()
+
+
 def get_file_service(container=Depends(get_app_container)) -> FileService:
     return container.provide_file_service()
 
@@ -39,12 +51,18 @@ def get_material_service(container=Depends(get_app_container)) -> MaterialServic
 def get_user_service(container=Depends(get_app_container)) -> UserService:
     return container.provide_user_service()
 
+
+def get_monitoring_service(container=Depends(get_app_container)) -> MonitoringService:
+    return container.provide_monitoring_service()
+
 __all__ = [
     "get_app_container",
     "get_auth_service",
     "get_test_service",
+    "get_generation_job_service",
     "get_file_service",
     "get_material_service",
     "get_user_service",
+    "get_monitoring_service",
 ]
 
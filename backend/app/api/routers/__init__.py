@@ -1,3 +1,3 @@
-from . import auth, files, materials, tests, users
+from . import auth, files, materials, monitoring, tests, users
 
-__all__ = ["auth", "files", "materials", "tests", "users"]
+__all__ = ["auth", "files", "materials", "monitoring", "tests", "users"]
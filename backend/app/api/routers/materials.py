@@ -5,6 +5,7 @@ from fastapi import APIRouter, Depends, File, HTTPException, Response, UploadFil
 
 from app.api.dependencies import get_material_service
 from app.api.schemas.materials import MaterialOut, MaterialUpdate
+from app.api.sse import sse_response
 from app.application.services import MaterialService
 from app.core.security import get_current_user
 from app.db.models import User
@@ -14,7 +15,7 @@ router = APIRouter(prefix="/materials", tags=["materials"])
 _ALLOWED_EXTENSIONS = [".pdf", ".docx", ".txt", ".md"]
 
 
-@router.post("/upload", response_model=MaterialOut)
+@router.post("/upload", response_model=MaterialOut, status_code=status.HTTP_202_ACCEPTED)
 def upload_material(
     uploaded_file: UploadFile = File(...),
     current_user: User = Depends(get_current_user),
@@ -27,6 +28,7 @@ def upload_material(
             detail=f"Allowed file types: {', '.join(sorted(_ALLOWED_EXTENSIONS))}",
         )
 
+    # The material comes back "pending"; follow it with GET /materials/{id}/events.
     content = uploaded_file.file.read()
     return material_service.upload_material(
         owner_id=current_user.id,
@@ -56,6 +58,22 @@ def get_material(
         raise HTTPException(status_code=404, detail=str(exc)) from exc
 
 
+@router.get("/{material_id}/events")
+async def watch_material(
+    material_id: int,
+    current_user: User = Depends(get_current_user),
+    material_service: MaterialService = Depends(get_material_service),
+):
+    """Stream the material's processing status as server-sent events until it settles."""
+    try:
+        events = await material_service.awatch_material(
+            owner_id=current_user.id, material_id=material_id
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    return sse_response(events)
+
+
 @router.patch("/{material_id}", response_model=MaterialOut)
 def update_material(
     material_id: int,
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.api.dependencies import get_monitoring_service
+from app.api.schemas.monitoring import GenerationStatsOut, LLMStatusOut, OCRStatusOut
+from app.application.services import MonitoringService
+from app.core.security import get_current_admin
+from app.db.models import User
+
+router = APIRouter()
+
+
+@router.get("/llm", response_model=LLMStatusOut)
+def llm_status(
+    _: User = Depends(get_current_admin),
+    monitoring_service: MonitoringService = Depends(get_monitoring_service),
+):
+    """Circuit breaker state, retry counters, scheduler queues and result cache of the LLM."""
+    return monitoring_service.llm_status()
+
+
+@router.get("/ocr", response_model=OCRStatusOut)
+def ocr_status(
+    _: User = Depends(get_current_admin),
+    monitoring_service: MonitoringService = Depends(get_monitoring_service),
+):
+    """Hit and miss counters of the OCR result cache."""
+    return monitoring_service.ocr_status()
+
+
+@router.get("/generation", response_model=GenerationStatsOut)
+def generation_stats(
+    hours: int = Query(24, ge=1, le=24 * 90),
+    _: User = Depends(get_current_admin),
+    monitoring_service: MonitoringService = Depends(get_monitoring_service),
+):
+    """Latency percentiles per stage, token usage, cost and errors of recent generations."""
+    try:
+        return monitoring_service.generation_stats(hours=hours)
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, Response, status
 
-from app.api.dependencies import get_test_service
-from app.api.schemas.tests import TestDetailOut, TestGenerateRequest, TestGenerateResponse, QuestionOut, QuestionCreate, QuestionUpdate, TestTitleUpdate, TestOut
-from app.application.services import TestService
+from app.api.dependencies import get_generation_job_service, get_test_service
+from app.api.sse import sse_response
+from app.api.schemas.tests import GenerationEstimateOut, TestBatchGenerateRequest, TestBatchGenerateResponse, GenerationJobOut, TestDetailOut, TestGenerateRequest, TestGenerateResponse, QuestionOut, QuestionCreate, QuestionUpdate, TestTitleUpdate, TestOut
+from app.application.services import GenerationJobService, TestService
 from app.core.security import get_current_user
 from app.db.models import User
 
@@ -10,21 +11,86 @@ router = APIRouter()
 
 
 @router.post("/generate", response_model=TestGenerateResponse, status_code=status.HTTP_201_CREATED)
-def generate_test(
+async def generate_test(
     req: TestGenerateRequest,
     current_user: User = Depends(get_current_user),
     test_service: TestService = Depends(get_test_service),
 ):
     try:
-        return test_service.generate_test_from_input(
+        return await test_service.agenerate_test_from_input(
             request=req, owner_id=current_user.id
         )
+    except HTTPException:
+        raise
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
     except Exception as exc:  # noqa: BLE001
         raise HTTPException(status_code=500, detail=f"LLM error: {exc}") from exc
 
 
+@router.post("/generate/batch", response_model=TestBatchGenerateResponse)
+async def generate_tests_batch(
+    req: TestBatchGenerateRequest,
+    current_user: User = Depends(get_current_user),
+    test_service: TestService = Depends(get_test_service),
+):
+    """Generate one test per material/file concurrently and report each item's outcome."""
+    try:
+        return await test_service.agenerate_batch(request=req, owner_id=current_user.id)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+
+@router.post("/generate/estimate", response_model=GenerationEstimateOut)
+def estimate_generation(
+    req: TestGenerateRequest,
+    current_user: User = Depends(get_current_user),
+    test_service: TestService = Depends(get_test_service),
+):
+    """Estimate prompt size, cost and latency for the generate form without calling the LLM."""
+    try:
+        return test_service.estimate_generation(request=req, owner_id=current_user.id)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+
+@router.post("/generate/stream")
+def generate_test_stream(
+    req: TestGenerateRequest,
+    current_user: User = Depends(get_current_user),
+    test_service: TestService = Depends(get_test_service),
+):
+    """Stream questions as server-sent events while the LLM produces them."""
+    try:
+        events = test_service.stream_test_from_input(request=req, owner_id=current_user.id)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+    return sse_response(events)
+
+
+@router.post("/jobs", response_model=GenerationJobOut, status_code=status.HTTP_202_ACCEPTED)
+def enqueue_generation_job(
+    req: TestGenerateRequest,
+    current_user: User = Depends(get_current_user),
+    job_service: GenerationJobService = Depends(get_generation_job_service),
+):
+    """Queue a test generation and return immediately with the job id."""
+    return job_service.submit(request=req, owner_id=current_user.id)
+
+
+@router.get("/jobs/{job_id}", response_model=GenerationJobOut)
+def get_generation_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    job_service: GenerationJobService = Depends(get_generation_job_service),
+):
+    try:
+        return job_service.get_job(owner_id=current_user.id, job_id=job_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+
+
 @router.get("/{test_id}", response_model=TestDetailOut)
 def get_test(
     test_id: int,
@@ -0,0 +1,84 @@
+from typing import Dict, List, Literal, Optional
+
+from pydantic import BaseModel
+
+
+class CircuitBreakerOut(BaseModel):
+    name: str
+    state: Literal["closed", "open", "half_open"]
+    trips: int
+    rejected_calls: int
+    total_calls: int
+    total_failures: int
+    window_calls: int
+    window_failures: int
+    retry_after_seconds: float
+
+
+class SchedulerFlowOut(BaseModel):
+    flow: str
+    queued: int
+    granted: int
+
+
+class LLMSchedulerOut(BaseModel):
+    max_in_flight: int
+    in_flight: int
+    queued: int
+    granted: int
+    timed_out: int
+    wait_p50_ms: float
+    wait_p95_ms: float
+    # Busiest flows first (``user:<id>:interactive`` / ``user:<id>:bulk``).
+    flows: List[SchedulerFlowOut]
+
+
+class CacheStatsOut(BaseModel):
+    memory_hits: int
+    disk_hits: int
+    misses: int
+    hit_ratio: float
+    memory_entries: int
+
+
+class PercentilesOut(BaseModel):
+    p50: float
+    p90: float
+    p95: float
+    p99: float
+    max: float
+
+
+class GenerationStatsOut(BaseModel):
+    window_hours: int
+    runs: int
+    succeeded: int
+    failed: int
+    # True when the window held more runs than were read; stats cover the newest ones.
+    truncated: bool
+    # Per stage: total, source (OCR/extraction), prompt, llm, parse, store.
+    latency_ms: Dict[str, PercentilesOut]
+    prompt_tokens: PercentilesOut
+    output_tokens: PercentilesOut
+    questions_requested: int
+    questions_returned: int
+    questions_saved: int
+    reused_from_bank: int
+    total_cost_usd: float
+    mean_cost_usd_per_test: float
+    # Failed runs by error class, most frequent first.
+    errors: Dict[str, int]
+    runs_by_model: Dict[str, int]
+
+
+class LLMStatusOut(BaseModel):
+    circuit_breaker: CircuitBreakerOut
+    retries: int
+    scheduler: Optional[LLMSchedulerOut] = None
+    # Generation result cache; absent when LLM_CACHE_ENABLED is off.
+    cache: Optional[CacheStatsOut] = None
+
+
+class OCRStatusOut(BaseModel):
+    # Absent when OCR_CACHE_ENABLED is off.
+    cache: Optional[CacheStatsOut] = None
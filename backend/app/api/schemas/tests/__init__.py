@@ -63,6 +63,8 @@ class GenerateParams(BaseModel):
 class TestGenerateRequest(GenerateParams):
     text: Optional[str] = None
     file_id: Optional[int] = None
+    # A processed material; its stored text is used, nothing is re-extracted.
+    material_id: Optional[int] = None
 
     @model_validator(mode="after")
     def validate_source(self):
@@ -70,8 +72,11 @@ class TestGenerateRequest(GenerateParams):
         has_text = bool(text_value)
         has_file = self.file_id is not None
 
-        if not has_text and not has_file:
-            raise ValueError("Please provide text or file_id")
+        if self.material_id is not None:
+            if has_text or has_file:
+                raise ValueError("material_id cannot be combined with text or file_id")
+        elif not has_text and not has_file:
+            raise ValueError("Please provide text, file_id or material_id")
 
         self.text = text_value or None
         return self
@@ -80,6 +85,63 @@ class TestGenerateRequest(GenerateParams):
 class TestGenerateResponse(BaseModel):
     test_id: int
     num_questions: int
+    # Questions copied from the source's question bank instead of generated.
+    reused_from_bank: int = 0
+    # Near-duplicates dropped from this generation before saving.
+    duplicates_removed: int = 0
+    # Saved questions that closely repeat one from the user's earlier tests.
+    repeated_question_ids: List[int] = Field(default_factory=list)
+
+
+class BatchGenerateItem(GenerateParams):
+    material_id: Optional[int] = None
+    file_id: Optional[int] = None
+
+    @model_validator(mode="after")
+    def validate_source(self):
+        if (self.material_id is None) == (self.file_id is None):
+            raise ValueError("Provide exactly one of material_id or file_id")
+        return self
+
+
+class TestBatchGenerateRequest(BaseModel):
+    items: List[BatchGenerateItem] = Field(min_length=1)
+
+
+class BatchItemResult(BaseModel):
+    index: int
+    status: Literal["ok", "error"]
+    test_id: Optional[int] = None
+    num_questions: Optional[int] = None
+    reused_from_bank: int = 0
+    repeated_question_ids: List[int] = Field(default_factory=list)
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+
+
+class TestBatchGenerateResponse(BaseModel):
+    results: List[BatchItemResult]
+    succeeded: int
+    failed: int
+
+
+class GenerationEstimateOut(BaseModel):
+    source_tokens: int
+    prompt_tokens: int
+    output_tokens: int
+    trimmed: bool
+    estimated_cost_usd: float
+    estimated_latency_seconds: float
+
+
+class GenerationJobOut(BaseModel):
+    job_id: str
+    status: Literal["queued", "running", "done", "failed"]
+    test_id: Optional[int] = None
+    num_questions: Optional[int] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
 
 
 class QuestionOut(BaseModel):
@@ -174,6 +236,12 @@ __all__ = [
     "GenerateParams",
     "TestGenerateRequest",
     "TestGenerateResponse",
+    "BatchGenerateItem",
+    "TestBatchGenerateRequest",
+    "BatchItemResult",
+    "TestBatchGenerateResponse",
+    "GenerationEstimateOut",
+    "GenerationJobOut",
     "QuestionOut",
     "TestDetailOut",
     "QuestionCreate",
@@ -0,0 +1,34 @@
+import json
+from typing import Any, AsyncIterator, Dict, Iterator, Union
+
+from fastapi.responses import StreamingResponse
+
+
+def format_sse(events: Iterator[Dict[str, Any]]) -> Iterator[str]:
+    for event in events:
+        data = json.dumps(event["data"], ensure_ascii=False)
+        yield f"event: {event['event']}\ndata: {data}\n\n"
+
+
+async def aformat_sse(events: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    async for event in events:
+        data = json.dumps(event["data"], ensure_ascii=False)
+        yield f"event: {event['event']}\ndata: {data}\n\n"
+
+
+def sse_response(
+    events: Union[Iterator[Dict[str, Any]], AsyncIterator[Dict[str, Any]]]
+) -> StreamingResponse:
+    """Serve ``{"event": ..., "data": ...}`` dicts as a server-sent event stream.
+
+    Sync iterators are pulled on the threadpool; async ones on the event loop.
+    """
+    body = aformat_sse(events) if hasattr(events, "__aiter__") else format_sse(events)
+    return StreamingResponse(
+        body,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+__all__ = ["aformat_sse", "format_sse", "sse_response"]
@@ -0,0 +1,208 @@
+"""Near-duplicate detection for generated questions (MinHash + LSH)."""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Generic, Hashable, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+from app.domain.models import Question
+
+K = TypeVar("K", bound=Hashable)
+
+_WORD_RE = re.compile(r"\w+")
+_MAX_HASH = (1 << 64) - 1
+
+
+def question_fingerprint_text(question: Question) -> str:
+    """Text compared for near-duplicates: the question plus its choices, order-insensitive."""
+    choices = " ".join(sorted(choice.strip() for choice in question.choices or []))
+    return f"{question.text} {choices}" if choices else question.text
+
+
+def shingles(text: str, size: int = 4) -> FrozenSet[str]:
+    """Character ``size``-grams of the case-folded words, so inflected forms still overlap."""
+    normalized = unicodedata.normalize("NFKC", text).casefold()
+    joined = " ".join(_WORD_RE.findall(normalized))
+    if len(joined) <= size:
+        return frozenset({joined}) if joined else frozenset()
+    return frozenset(joined[i : i + size] for i in range(len(joined) - size + 1))
+
+
+def jaccard(left: FrozenSet[str], right: FrozenSet[str]) -> float:
+    if not left and not right:
+        return 1.0
+    return len(left & right) / len(left | right)
+
+
+def _hash64(shingle: str) -> int:
+    # Signatures never leave the process, so the (per-process salted) builtin hash is enough.
+    return hash(shingle) & _MAX_HASH
+
+
+def minhash_signature(shingle_set: Iterable[str], num_perm: int) -> Tuple[int, ...]:
+    """One-permutation MinHash: one hash per shingle, minimum kept per bin.
+
+    Costs O(len(shingle_set)) instead of O(len(shingle_set) * num_perm);
+    empty bins borrow the value of the next non-empty one (rotation
+    densification) so short texts still produce comparable signatures.
+    """
+    bins = [_MAX_HASH] * num_perm
+    for shingle in shingle_set:
+        value = _hash64(shingle)
+        index = value % num_perm
+        if value < bins[index]:
+            bins[index] = value
+
+    filled = [i for i, value in enumerate(bins) if value != _MAX_HASH]
+    if not filled or len(filled) == num_perm:
+        return tuple(bins)
+
+    densified = list(bins)
+    for i in range(num_perm):
+        if densified[i] == _MAX_HASH:
+            offset = 1
+            while bins[(i + offset) % num_perm] == _MAX_HASH:
+                offset += 1
+            # Mix in the distance so borrowed values differ from their source bin.
+            densified[i] = (bins[(i + offset) % num_perm] + offset) & _MAX_HASH
+    return tuple(densified)
+
+
+def _band_layout(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """Bands/rows whose LSH S-curve midpoint sits a bit below ``threshold``.
+
+    Candidates are re-checked with exact Jaccard, so erring towards more
+    candidates only costs a few comparisons, while missing one is permanent.
+    """
+    target = max(0.05, threshold - 0.1)
+    best: Optional[Tuple[float, int, int]] = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        midpoint = (1.0 / bands) ** (1.0 / rows)
+        score = abs(midpoint - target)
+        if best is None or score < best[0]:
+            best = (score, bands, rows)
+    assert best is not None
+    return best[1], best[2]
+
+
+class NearDuplicateIndex(Generic[K]):
+    """Incremental LSH index answering "is there a stored text this similar?"."""
+
+    def __init__(self, *, threshold: float, num_perm: int = 64, shingle_size: int = 4) -> None:
+        self._threshold = threshold
+        self._num_perm = num_perm
+        self._shingle_size = shingle_size
+        self._bands, self._rows = _band_layout(num_perm, threshold)
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[K]] = defaultdict(list)
+        self._shingles: Dict[K, FrozenSet[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._shingles)
+
+    def add(self, key: K, text: str) -> None:
+        shingle_set = shingles(text, self._shingle_size)
+        self._shingles[key] = shingle_set
+        for band in self._band_keys(shingle_set):
+            self._buckets[band].append(key)
+
+    def best_match(self, text: str) -> Optional[Tuple[K, float]]:
+        """Most similar stored key at or above the threshold, if any."""
+        shingle_set = shingles(text, self._shingle_size)
+        best: Optional[Tuple[K, float]] = None
+        seen = set()
+        for band in self._band_keys(shingle_set):
+            for key in self._buckets.get(band, ()):
+                if key in seen:
+                    continue
+                seen.add(key)
+                similarity = jaccard(shingle_set, self._shingles[key])
+                if similarity >= self._threshold and (best is None or similarity > best[1]):
+                    best = (key, similarity)
+        return best
+
+    def _band_keys(self, shingle_set: FrozenSet[str]) -> List[Tuple[int, Tuple[int, ...]]]:
+        if not shingle_set:
+            return []
+        signature = minhash_signature(shingle_set, self._num_perm)
+        return [
+            (band, signature[band * self._rows : (band + 1) * self._rows])
+            for band in range(self._bands)
+        ]
+
+
+@dataclass(slots=True)
+class DedupResult:
+    unique: List[Question] = field(default_factory=list)
+    # (dropped question, index in ``unique`` of the question it duplicates, similarity)
+    dropped: List[Tuple[Question, int, float]] = field(default_factory=list)
+    # index in ``unique`` -> id of the existing question it repeats
+    repeats: Dict[int, int] = field(default_factory=dict)
+
+
+class QuestionDeduplicator:
+    """Drops near-duplicates within a generation and flags repeats of existing questions.
+
+    Similarity is Jaccard over character shingles of the question text and
+    its choices; MinHash/LSH keeps the candidate search sub-quadratic, so
+    checking a fresh test against a user's whole history stays cheap.
+    """
+
+    def __init__(self, *, threshold: float = 0.8, num_perm: int = 64, shingle_size: int = 4) -> None:
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1]")
+        self._threshold = threshold
+        self._num_perm = num_perm
+        self._shingle_size = shingle_size
+
+    def new_index(self) -> NearDuplicateIndex:
+        return NearDuplicateIndex(
+            threshold=self._threshold,
+            num_perm=self._num_perm,
+            shingle_size=self._shingle_size,
+        )
+
+    def dedupe(
+        self,
+        questions: Sequence[Question],
+        *,
+        existing: Iterable[Question] = (),
+    ) -> DedupResult:
+        result = DedupResult()
+        batch_index: NearDuplicateIndex[int] = self.new_index()
+        for question in questions:
+            text = question_fingerprint_text(question)
+            match = batch_index.best_match(text)
+            if match is not None:
+                result.dropped.append((question, match[0], match[1]))
+                continue
+            batch_index.add(len(result.unique), text)
+            result.unique.append(question)
+
+        history_index: NearDuplicateIndex[int] = self.new_index()
+        for question in existing:
+            if question.id is not None:
+                history_index.add(question.id, question_fingerprint_text(question))
+        if len(history_index):
+            for position, question in enumerate(result.unique):
+                match = history_index.best_match(question_fingerprint_text(question))
+                if match is not None:
+                    result.repeats[position] = match[0]
+
+        return result
+
+
+__all__ = [
+    "DedupResult",
+    "NearDuplicateIndex",
+    "QuestionDeduplicator",
+    "jaccard",
+    "minhash_signature",
+    "question_fingerprint_text",
+    "shingles",
+]
@@ -6,9 +6,9 @@ import json
 from typing import Any, Dict, Iterable, List, Optional
 
 from app.api.schemas.materials import MaterialOut
-from app.api.schemas.tests import TestOut, TestDetailOut, QuestionOut
+from app.api.schemas.tests import GenerationJobOut, TestOut, TestDetailOut, QuestionOut
 from app.api.schemas.users import UserRead
-from app.domain.models import Material, Question, Test, User
+from app.domain.models import GenerationJob, Material, Question, Test, User
 
 def _as_list(value: Any) -> Optional[List[str]]:
     """
@@ -85,6 +85,18 @@ def to_test_response(test: Test) -> Dict:
     }
 
 
+def to_generation_job_out(job: GenerationJob) -> GenerationJobOut:
+    return GenerationJobOut(
+        job_id=job.id,
+        status=job.status.value,
+        test_id=job.test_id,
+        num_questions=job.num_questions,
+        error=job.error,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+    )
+
+
 def to_material_out(material: Material) -> MaterialOut:
     return MaterialOut(
         id=material.id,
@@ -111,6 +123,7 @@ __all__ = [
     "to_question_out",
     "to_test_response",
     "to_test_detail",
+    "to_generation_job_out",
     "to_material_out",
     "to_materials_out",
 ]
@@ -6,11 +6,21 @@ from typing import Protocol
 
 from app.domain.repositories import (
     FileRepository,
+    GenerationRunRepository,
     MaterialRepository,
+    QuestionBankRepository,
     TestRepository,
     UserRepository,
 )
-from app.domain.services import FileStorage, OCRService, QuestionGenerator
+from app.domain.services import (
+    FileStorage,
+    GenerationEstimator,
+    GenerationJobQueue,
+    MaterialProcessingQueue,
+    OCRService,
+    QuestionGenerator,
+    StreamingQuestionGenerator,
+)
 
 
 class UnitOfWork(Protocol):
@@ -18,6 +28,8 @@ class UnitOfWork(Protocol):
     tests: TestRepository
     files: FileRepository
     materials: MaterialRepository
+    question_bank: QuestionBankRepository
+    generation_runs: GenerationRunRepository
 
     def __enter__(self) -> "UnitOfWork":
         ...
@@ -32,5 +44,14 @@ class UnitOfWork(Protocol):
         ...
 
 
-__all__ = ["UnitOfWork", "FileStorage", "OCRService", "QuestionGenerator"]
+__all__ = [
+    "UnitOfWork",
+    "FileStorage",
+    "GenerationEstimator",
+    "GenerationJobQueue",
+    "MaterialProcessingQueue",
+    "OCRService",
+    "QuestionGenerator",
+    "StreamingQuestionGenerator",
+]
 
@@ -2,14 +2,18 @@
 
 from .auth_service import AuthService
 from .file_service import FileService
+from .generation_job_service import GenerationJobService
 from .material_service import MaterialService
+from .monitoring_service import MonitoringService
 from .test_service import TestService
 from .user_service import UserService
 
 __all__ = [
     "AuthService",
     "FileService",
+    "GenerationJobService",
     "MaterialService",
+    "MonitoringService",
     "TestService",
     "UserService",
 ]
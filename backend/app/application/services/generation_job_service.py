@@ -0,0 +1,25 @@
+"""Service exposing asynchronous test generation jobs."""
+
+from __future__ import annotations
+
+from app.api.schemas.tests import GenerationJobOut, TestGenerateRequest
+from app.application import dto
+from app.application.interfaces import GenerationJobQueue
+
+
+class GenerationJobService:
+    def __init__(self, *, job_queue: GenerationJobQueue) -> None:
+        self._job_queue = job_queue
+
+    def submit(self, *, request: TestGenerateRequest, owner_id: int) -> GenerationJobOut:
+        job = self._job_queue.enqueue(owner_id=owner_id, request=request)
+        return dto.to_generation_job_out(job)
+
+    def get_job(self, *, owner_id: int, job_id: str) -> GenerationJobOut:
+        job = self._job_queue.get(job_id)
+        if not job or job.owner_id != owner_id:
+            raise ValueError("Job not found")
+        return dto.to_generation_job_out(job)
+
+
+__all__ = ["GenerationJobService"]
@@ -2,33 +2,57 @@
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
+import logging
+import time
 from datetime import datetime
+from functools import partial
 from pathlib import Path
-from typing import Callable, Iterable, Optional, Sequence, List
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Optional, Sequence, List, Tuple
 
 from app.api.schemas.materials import MaterialOut, MaterialUpdate
 from app.application import dto
-from app.application.interfaces import FileStorage, UnitOfWork
+from app.application.interfaces import FileStorage, MaterialProcessingQueue, UnitOfWork
 from app.domain.models import File as FileDomain, Material as MaterialDomain
 from app.domain.models.enums import ProcessingStatus
 
+logger = logging.getLogger(__name__)
+
+_EXTRACTION_FAILED = "Could not extract text (unsupported or empty)"
+
 
 class MaterialService:
+    """Uploads and manages materials.
+
+    With a ``processing_queue`` an upload only stores the file and a
+    pending material; text extraction runs in the background through
+    ``process_material`` and clients follow it with ``awatch_material``,
+    including page progress of long PDFs. Without one, extraction happens inside the upload call.
+    """
+
     def __init__(
         self,
         uow_factory: Callable[[], UnitOfWork],
         *,
         storage: FileStorage,
-        text_extractor: Callable[[Path, Optional[str]], str],
+        # Called as ``text_extractor(path, mime_type, max_chars=...)``, plus
+        # ``progress=`` (an ``OCRProgress``) when extraction runs on the queue.
+        text_extractor: Callable[..., Optional[str]],
         mime_detector: Optional[Callable[[Path], Optional[str]]] = None,
         max_text_length: int = 1_000_000,
+        processing_queue: Optional[MaterialProcessingQueue] = None,
+        status_stream_timeout: float = 300.0,
+        status_poll_interval: float = 5.0,
     ) -> None:
         self._uow_factory = uow_factory
         self._storage = storage
         self._text_extractor = text_extractor
         self._mime_detector = mime_detector
         self._max_text_length = max_text_length
+        self._processing_queue = processing_queue
+        self._status_stream_timeout = status_stream_timeout
+        self._status_poll_interval = status_poll_interval
 
     def upload_material(
         self,
@@ -62,36 +86,134 @@ class MaterialService:
 
         with self._uow_factory() as uow:
             file_record = uow.files.add(file_domain)
-
-            extracted_text = self._text_extractor(stored_path, mime_type)
-            normalized_text = (
-                extracted_text[: self._max_text_length]
-                if extracted_text
-                else None
+            material_record = uow.materials.add(
+                MaterialDomain(
+                    id=None,
+                    owner_id=owner_id,
+                    file=file_record,
+                    mime_type=mime_type,
+                    size_bytes=size_bytes,
+                    checksum=checksum,
+                    status=ProcessingStatus.PENDING,
+                )
             )
 
-            status = (
-                ProcessingStatus.DONE
-                if normalized_text
-                else ProcessingStatus.FAILED
-            )
-            processing_error = None if normalized_text else "Could not extract text (unsupported or empty)"
-
-            material = MaterialDomain(
-                id=None,
-                owner_id=owner_id,
-                file=file_record,
-                mime_type=mime_type,
-                size_bytes=size_bytes,
-                checksum=checksum,
-                status=status,
-                extracted_text=normalized_text,
-                processing_error=processing_error,
+        if self._processing_queue is None:
+            material_record = self.process_material(material_record.id) or material_record
+        else:
+            self._processing_queue.enqueue(material_record.id)
+        return dto.to_material_out(material_record)
+
+    def process_material(self, material_id: int) -> Optional[MaterialDomain]:
+        """Extract the text of a pending material and store it as done or failed.
+
+        Returns the updated material, or ``None`` when it is gone or no
+        longer pending (already processed, or edited by its owner meanwhile).
+        """
+        with self._uow_factory() as uow:
+            material = uow.materials.get(material_id)
+        if material is None or material.status != ProcessingStatus.PENDING:
+            return None
+
+        # Extraction can take minutes for large PDFs; no transaction is held meanwhile.
+        started = time.perf_counter()
+        options: Dict[str, Any] = {"max_chars": self._max_text_length}
+        if self._processing_queue is not None:
+            options["progress"] = partial(self._processing_queue.report_progress, material_id)
+        try:
+            extracted_text = self._text_extractor(
+                material.file.stored_path, material.mime_type, **options
             )
+        except Exception as exc:  # noqa: BLE001 - recorded on the material
+            logger.warning("Text extraction failed for material %s: %s", material_id, exc)
+            extracted_text = None
+        normalized_text = extracted_text[: self._max_text_length] if extracted_text else None
+
+        with self._uow_factory() as uow:
+            current = uow.materials.get(material_id)
+            if current is None or current.status != ProcessingStatus.PENDING:
+                return None
+            if normalized_text:
+                current.mark_processed(normalized_text)
+            else:
+                current.mark_failed(_EXTRACTION_FAILED)
+            updated = uow.materials.update(current)
 
-            material_record = uow.materials.add(material)
+        logger.info(
+            "Material %s processed in %.2fs: %s",
+            material_id,
+            time.perf_counter() - started,
+            updated.status.value,
+        )
+        return updated
 
-        return dto.to_material_out(material_record)
+    def resume_pending(self) -> int:
+        """Queue materials left pending, e.g. by a restart mid-extraction; returns how many."""
+        if self._processing_queue is None:
+            return 0
+        with self._uow_factory() as uow:
+            pending = [material.id for material in uow.materials.list_by_status(ProcessingStatus.PENDING)]
+        for material_id in pending:
+            self._processing_queue.enqueue(material_id)
+        if pending:
+            logger.info("Resumed processing of %d pending materials", len(pending))
+        return len(pending)
+
+    async def awatch_material(
+        self, *, owner_id: int, material_id: int
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Status events of a material until it is done or failed, or the stream times out.
+
+        Ownership is checked before the iterator is returned, so a missing
+        material raises ``ValueError`` right away. A ``status`` event is
+        emitted for the current state and for every change, and a
+        ``progress`` event for each page count reported while the material
+        is extracted here; the stream ends with the final state or a
+        ``timeout`` event. Changes made by this
+        process wake the stream immediately; others are picked up by
+        re-reading the material every ``status_poll_interval`` seconds.
+        Waiting happens on the event loop, so idle watchers hold no thread.
+        """
+        current = await asyncio.to_thread(
+            self.get_material, owner_id=owner_id, material_id=material_id
+        )
+        return self._status_events(current)
+
+    async def _status_events(self, current: MaterialOut) -> AsyncIterator[Dict[str, Any]]:
+        deadline = time.monotonic() + self._status_stream_timeout
+        yield _status_event(current)
+        last_status = current.processing_status
+        last_progress: Optional[Tuple[int, int]] = None
+        while last_status == ProcessingStatus.PENDING.value:
+            progress = (
+                self._processing_queue.progress(current.id)
+                if self._processing_queue is not None
+                else None
+            )
+            if progress is not None and progress != last_progress:
+                yield _progress_event(current.id, progress)
+                last_progress = progress
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                yield {"event": "timeout", "data": {"id": current.id}}
+                return
+            wait = min(self._status_poll_interval, remaining)
+            if self._processing_queue is not None:
+                await self._processing_queue.await_update(current.id, wait)
+            else:
+                await asyncio.sleep(wait)
+            material = await asyncio.to_thread(self._load_material, current.id)
+            if material is None:
+                yield {"event": "deleted", "data": {"id": current.id}}
+                return
+            current = dto.to_material_out(material)
+            if current.processing_status != last_status:
+                yield _status_event(current)
+                last_status = current.processing_status
+
+    def _load_material(self, material_id: int) -> Optional[MaterialDomain]:
+        with self._uow_factory() as uow:
+            return uow.materials.get(material_id)
 
     def list_materials(self, *, owner_id: int) -> List[MaterialOut]:
         with self._uow_factory() as uow:
@@ -153,5 +275,21 @@ class MaterialService:
             return None
 
 
+def _progress_event(material_id: int, progress: Tuple[int, int]) -> Dict[str, Any]:
+    done, total = progress
+    return {
+        "event": "progress",
+        "data": {"id": material_id, "pages_done": done, "pages_total": total},
+    }
+
+
+def _status_event(material: MaterialOut) -> Dict[str, Any]:
+    # The extracted text can be megabytes; clients fetch it once the material is done.
+    return {
+        "event": "status",
+        "data": material.model_dump(mode="json", exclude={"extracted_text"}),
+    }
+
+
 __all__ = ["MaterialService"]
 
@@ -0,0 +1,155 @@
+"""Service exposing operational state for monitoring endpoints."""
+
+from __future__ import annotations
+
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, Sequence
+
+from app.api.schemas.monitoring import (
+    CacheStatsOut,
+    CircuitBreakerOut,
+    GenerationStatsOut,
+    LLMSchedulerOut,
+    LLMStatusOut,
+    OCRStatusOut,
+    PercentilesOut,
+    SchedulerFlowOut,
+)
+from app.application.interfaces import UnitOfWork
+from app.infrastructure.llm.cache import CachingQuestionGenerator
+from app.infrastructure.llm.resilience import ResilientQuestionGenerator
+from app.infrastructure.ocr.cache import CachingOCRService
+from app.infrastructure.llm.scheduling import FairScheduler
+
+
+class MonitoringService:
+    def __init__(
+        self,
+        *,
+        llm_resilience: ResilientQuestionGenerator,
+        llm_scheduler: Optional[FairScheduler] = None,
+        llm_cache: Optional[CachingQuestionGenerator] = None,
+        ocr_cache: Optional[CachingOCRService] = None,
+        uow_factory: Optional[Callable[[], UnitOfWork]] = None,
+        generation_stats_max_runs: int = 20_000,
+    ) -> None:
+        self._llm_resilience = llm_resilience
+        self._llm_scheduler = llm_scheduler
+        self._llm_cache = llm_cache
+        self._ocr_cache = ocr_cache
+        self._uow_factory = uow_factory
+        self._generation_stats_max_runs = generation_stats_max_runs
+
+    def llm_status(self) -> LLMStatusOut:
+        stats = self._llm_resilience.stats()
+        breaker = stats.breaker
+        return LLMStatusOut(
+            circuit_breaker=CircuitBreakerOut(
+                name=breaker.name,
+                state=breaker.state.value,
+                trips=breaker.trips,
+                rejected_calls=breaker.rejected_calls,
+                total_calls=breaker.total_calls,
+                total_failures=breaker.total_failures,
+                window_calls=breaker.window_calls,
+                window_failures=breaker.window_failures,
+                retry_after_seconds=round(breaker.retry_after_seconds, 1),
+            ),
+            retries=stats.retries,
+            scheduler=self._scheduler_status(),
+            cache=CacheStatsOut(**self._llm_cache.stats()) if self._llm_cache else None,
+        )
+
+    def ocr_status(self) -> OCRStatusOut:
+        return OCRStatusOut(
+            cache=CacheStatsOut(**self._ocr_cache.stats()) if self._ocr_cache else None,
+        )
+
+    def _scheduler_status(self) -> Optional[LLMSchedulerOut]:
+        if self._llm_scheduler is None:
+            return None
+        stats = self._llm_scheduler.stats()
+        return LLMSchedulerOut(
+            max_in_flight=stats.max_in_flight,
+            in_flight=stats.in_flight,
+            queued=stats.queued,
+            granted=stats.granted,
+            timed_out=stats.timed_out,
+            wait_p50_ms=round(stats.wait_p50_seconds * 1000, 1),
+            wait_p95_ms=round(stats.wait_p95_seconds * 1000, 1),
+            flows=[
+                SchedulerFlowOut(flow=flow.flow, queued=flow.queued, granted=flow.granted)
+                for flow in stats.flows
+            ],
+        )
+
+    def generation_stats(self, *, hours: int = 24) -> GenerationStatsOut:
+        """Percentile summary of the generation runs recorded in the last ``hours``."""
+        if self._uow_factory is None:
+            raise ValueError("Generation telemetry is not available")
+
+        since = datetime.utcnow() - timedelta(hours=hours)
+        with self._uow_factory() as uow:
+            runs = uow.generation_runs.list_since(
+                since, limit=self._generation_stats_max_runs + 1
+            )
+        truncated = len(runs) > self._generation_stats_max_runs
+        runs = runs[: self._generation_stats_max_runs]
+
+        succeeded = [run for run in runs if run.status == "ok"]
+        # Stage timings of failed runs are cut short, so latencies describe successes only.
+        stages = {
+            "total": [run.total_ms for run in succeeded],
+            "source": [run.source_ms for run in succeeded],
+            "prompt": [run.prompt_ms for run in succeeded],
+            "llm": [run.llm_ms for run in succeeded],
+            "parse": [run.parse_ms for run in succeeded],
+            "store": [run.store_ms for run in succeeded],
+        }
+        called_llm = [run for run in runs if run.llm_calls]
+        total_cost = sum(run.cost_usd for run in runs)
+        errors = Counter(run.error_class or "unknown" for run in runs if run.status != "ok")
+        return GenerationStatsOut(
+            window_hours=hours,
+            runs=len(runs),
+            succeeded=len(succeeded),
+            failed=len(runs) - len(succeeded),
+            truncated=truncated,
+            latency_ms={name: _percentiles(values) for name, values in stages.items()},
+            prompt_tokens=_percentiles([run.prompt_tokens for run in called_llm]),
+            output_tokens=_percentiles([run.output_tokens for run in called_llm]),
+            questions_requested=sum(run.questions_requested for run in runs),
+            questions_returned=sum(run.questions_returned for run in runs),
+            questions_saved=sum(run.questions_saved for run in runs),
+            reused_from_bank=sum(run.reused_from_bank for run in runs),
+            total_cost_usd=round(total_cost, 6),
+            # Failed runs still cost money; spread it over the tests actually produced.
+            mean_cost_usd_per_test=round(total_cost / len(succeeded), 6) if succeeded else 0.0,
+            errors=dict(errors.most_common()),
+            runs_by_model=dict(
+                Counter(run.model_name for run in called_llm if run.model_name).most_common()
+            ),
+        )
+
+
+def _percentiles(values: Sequence[float]) -> PercentilesOut:
+    ordered: List[float] = sorted(values)
+
+    def pick(pct: float) -> float:
+        if not ordered:
+            return 0.0
+        # Nearest rank.
+        index = min(len(ordered) - 1, max(0, -(-len(ordered) * pct // 100) - 1))
+        return round(float(ordered[int(index)]), 1)
+
+    return PercentilesOut(
+        p50=pick(50),
+        p90=pick(90),
+        p95=pick(95),
+        p99=pick(99),
+        max=round(float(ordered[-1]), 1) if ordered else 0.0,
+    )
+
+
+__all__ = ["MonitoringService"]
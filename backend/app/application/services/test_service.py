@@ -1,16 +1,28 @@
 """Service handling test generation and management use-cases."""
 
 from __future__ import annotations
+import asyncio
+import dataclasses
+import hashlib
 import logging
+import math
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime
 
 logger = logging.getLogger(__name__)
 import json
-from typing import Callable, Dict, List, Tuple
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
 import re
 import unicodedata
 from fastapi import HTTPException
 
 from app.api.schemas.tests import (
+    BatchGenerateItem,
+    BatchItemResult,
+    GenerateParams,
+    GenerationEstimateOut,
+    TestBatchGenerateRequest,
+    TestBatchGenerateResponse,
     TestDetailOut,
     TestGenerateRequest,
     TestGenerateResponse,
@@ -20,8 +32,30 @@ from app.api.schemas.tests import (
     QuestionUpdate
 )
 from app.application import dto
-from app.application.interfaces import OCRService, QuestionGenerator, UnitOfWork
+from app.application.dedup import QuestionDeduplicator, question_fingerprint_text
+from app.application.interfaces import (
+    GenerationEstimator,
+    OCRService,
+    QuestionGenerator,
+    StreamingQuestionGenerator,
+    UnitOfWork,
+)
+from app.core.telemetry import (
+    STAGE_LLM,
+    STAGE_PARSE,
+    STAGE_PROMPT,
+    STAGE_SOURCE,
+    STAGE_STORE,
+    GenerationTrace,
+    trace_stage,
+    tracing,
+)
+from app.domain.services import LLMUnavailableError, agenerate_questions
 from app.domain.events import TestGenerated
+from app.domain.models import GenerationRun
+from app.domain.models import Material as MaterialDomain
+from app.domain.models import ProcessingStatus
+from app.domain.models import Question as QuestionDomain
 from app.domain.models import Test as TestDomain
 from app.db.models import Question as QuestionRow
 from app.db.models import Test as TestRow
@@ -31,6 +65,106 @@ from app.infrastructure.exporting import (
     render_test_to_tex,
     test_to_xml_bytes,
 )
+from app.infrastructure.caching import TwoTierCache, make_cache_key
+from app.infrastructure.llm.cache import normalize_source_text
+from app.infrastructure.llm.scheduling import llm_caller
+from app.infrastructure.llm.selection import compute_shortfall, select_questions
+from app.infrastructure.llm.token_budget import compact_text
+
+# Anything with GenerateParams plus a text, file_id or material_id source.
+GenerationSource = Union[TestGenerateRequest, BatchGenerateItem]
+
+
+class ResolvedSource(NamedTuple):
+    text: str
+    title: str
+    # Identifies the source material in the question bank.
+    checksum: str
+
+
+@dataclasses.dataclass(slots=True)
+class BankPlan:
+    """What a generation takes from the question bank and what is left for the LLM."""
+
+    checksum: Optional[str] = None
+    reused: List[QuestionDomain] = dataclasses.field(default_factory=list)
+    # id() of a reused question -> its bank entry id.
+    entry_ids: Dict[int, int] = dataclasses.field(default_factory=dict)
+    # ``None`` when the bank covers the whole request.
+    shortfall: Optional[GenerateParams] = None
+    # Valid LLM output beyond what the request asked for, banked for later.
+    surplus: List[QuestionDomain] = dataclasses.field(default_factory=list)
+
+
+@dataclasses.dataclass(slots=True)
+class RunRecord:
+    """Outcome of one generation, filled in as it progresses and saved as a ``GenerationRun``."""
+
+    owner_id: int
+    source_kind: str
+    questions_requested: int
+    trace: GenerationTrace = dataclasses.field(default_factory=GenerationTrace)
+    source_chars: int = 0
+    questions_returned: int = 0
+    response: Optional[TestGenerateResponse] = None
+    status: str = "ok"
+    error_class: Optional[str] = None
+
+    @classmethod
+    def start(cls, request: GenerationSource, owner_id: int) -> "RunRecord":
+        if getattr(request, "material_id", None) is not None:
+            source_kind = "material"
+        elif (getattr(request, "text", None) or "").strip():
+            source_kind = "text"
+        else:
+            source_kind = "file"
+        return cls(
+            owner_id=owner_id,
+            source_kind=source_kind,
+            questions_requested=request.closed.total() + request.num_open,
+        )
+
+    def fail(self, exc: BaseException) -> None:
+        if isinstance(exc, (GeneratorExit, asyncio.CancelledError)):
+            self.status = "cancelled"
+        else:
+            self.status = "error"
+        # HTTPException wraps the interesting error (LLMUnavailableError, ...).
+        cause = exc.__cause__ if isinstance(exc, HTTPException) and exc.__cause__ else exc
+        self.error_class = type(cause).__name__
+
+    def to_domain(self) -> GenerationRun:
+        trace = self.trace
+        response = self.response
+        return GenerationRun(
+            id=None,
+            owner_id=self.owner_id,
+            test_id=response.test_id if response else None,
+            source_kind=self.source_kind,
+            status=self.status,
+            error_class=self.error_class,
+            model_name=trace.model_name,
+            questions_requested=self.questions_requested,
+            questions_returned=self.questions_returned,
+            questions_saved=response.num_questions if response else 0,
+            reused_from_bank=response.reused_from_bank if response else 0,
+            source_chars=self.source_chars,
+            prompt_chars=trace.prompt_chars,
+            response_chars=trace.response_chars,
+            prompt_tokens=trace.prompt_tokens,
+            output_tokens=trace.output_tokens,
+            total_tokens=trace.total_tokens,
+            llm_calls=trace.llm_calls,
+            cost_usd=trace.cost_usd,
+            source_ms=trace.stage_ms(STAGE_SOURCE),
+            prompt_ms=trace.stage_ms(STAGE_PROMPT),
+            llm_ms=trace.stage_ms(STAGE_LLM),
+            parse_ms=trace.stage_ms(STAGE_PARSE),
+            store_ms=trace.stage_ms(STAGE_STORE),
+            total_ms=trace.elapsed_seconds * 1000,
+            created_at=datetime.utcnow(),
+        )
+
 
 class TestService:
     def __init__(
@@ -39,85 +173,612 @@ class TestService:
         *,
         question_generator: QuestionGenerator,
         ocr_service: OCRService,
+        streaming_generator: Optional[StreamingQuestionGenerator] = None,
+        generation_estimator: Optional[GenerationEstimator] = None,
         tex_renderer: Callable[..., str] = render_test_to_tex,
         pdf_compiler: Callable[[str], bytes] = compile_tex_to_pdf,
         xml_serializer: Callable[[Dict], bytes] = test_to_xml_bytes,
+        max_batch_items: int = 50,
+        deduplicator: Optional[QuestionDeduplicator] = None,
+        dedup_history_limit: int = 2000,
+        question_bank_enabled: bool = False,
+        question_bank_fetch_limit: int = 200,
+        material_text_cache: Optional[TwoTierCache] = None,
+        telemetry_enabled: bool = False,
     ) -> None:
         self._uow_factory = uow_factory
         self._question_generator = question_generator
         self._ocr_service = ocr_service
+        self._streaming_generator = streaming_generator
+        self._generation_estimator = generation_estimator
         self._render_test_to_tex = tex_renderer
         self._compile_tex_to_pdf = pdf_compiler
         self._test_to_xml = xml_serializer
+        self._max_batch_items = max_batch_items
+        self._deduplicator = deduplicator
+        self._dedup_history_limit = dedup_history_limit
+        self._question_bank_enabled = question_bank_enabled
+        self._question_bank_fetch_limit = question_bank_fetch_limit
+        self._material_text_cache = material_text_cache
+        self._telemetry_enabled = telemetry_enabled
 
     def generate_test_from_input(
         self,
         *,
         request: TestGenerateRequest,
         owner_id: int,
+        bulk: bool = False,
     ) -> TestGenerateResponse:
-        with self._uow_factory() as uow:
-            normalized_text = request.text.strip() if request.text else ""
-            source_text: str
-            base_title: str
-
-            if normalized_text:
-                source_text = normalized_text
-                if request.file_id is not None:
-                    source_file = uow.files.get(request.file_id)
-                    if not source_file or source_file.owner_id != owner_id:
-                        raise ValueError("File not found")
-                    base_title = source_file.filename
-                else:
-                    base_title = "From raw text"
-            else:
-                if request.file_id is None:
-                    raise ValueError("file_id is required when text is not provided")
-                source_file = uow.files.get(request.file_id)
-                if not source_file or source_file.owner_id != owner_id:
-                    raise ValueError("File not found")
-                source_text = self._ocr_service.extract_text(
-                    file_path=str(source_file.stored_path)
-                )
-                base_title = source_file.filename
+        """Blocking generation; ``bulk`` marks background work for the LLM scheduler."""
+        with self._recorded_run(request, owner_id) as run:
+            run.response = self._generate(request=request, owner_id=owner_id, bulk=bulk, run=run)
+            return run.response
+
+    def _generate(
+        self,
+        *,
+        request: TestGenerateRequest,
+        owner_id: int,
+        bulk: bool,
+        run: RunRecord,
+    ) -> TestGenerateResponse:
+        source, plan = self._load_source(request=request, owner_id=owner_id)
+        run.source_chars = len(source.text)
 
+        llm_title: Optional[str] = None
+        generated: List[QuestionDomain] = []
+        if plan.shortfall is not None:
             try:
-                llm_title, questions = self._question_generator.generate(
-                    source_text=source_text,
-                    params=request,
-                )
+                with llm_caller(owner_id, bulk=bulk):
+                    llm_title, generated = self._question_generator.generate(
+                        source_text=source.text,
+                        params=plan.shortfall,
+                        surplus=plan.surplus,
+                    )
+            except LLMUnavailableError as exc:
+                raise self._unavailable(exc) from exc
             except ValueError as exc:
                 raise HTTPException(status_code=400, detail=str(exc)) from exc
             except Exception as exc:
                 raise HTTPException(status_code=500, detail=f"LLM error: {exc}") from exc
 
-            if not questions:
-                raise ValueError("LLM zwrócił pustą listę pytań.")
+        run.questions_returned = len(generated)
+        questions = plan.reused + generated
+        if not questions:
+            raise ValueError("LLM zwrócił pustą listę pytań.")
 
-            final_title = (llm_title or "").strip() or base_title
+        return self._store_generated(
+            owner_id=owner_id,
+            title=(llm_title or "").strip() or source.title,
+            questions=questions,
+            plan=plan,
+        )
 
-            test = TestDomain(
-                id=None,
+    async def agenerate_test_from_input(
+        self,
+        *,
+        request: GenerationSource,
+        owner_id: int,
+        bulk: bool = False,
+    ) -> TestGenerateResponse:
+        """Async variant: the LLM call is awaited, blocking DB/OCR work runs in threads."""
+        async with self._arecorded_run(request, owner_id) as run:
+            run.response = await self._agenerate(
+                request=request, owner_id=owner_id, bulk=bulk, run=run
+            )
+            return run.response
+
+    async def _agenerate(
+        self,
+        *,
+        request: GenerationSource,
+        owner_id: int,
+        bulk: bool,
+        run: RunRecord,
+    ) -> TestGenerateResponse:
+        source, plan = await asyncio.to_thread(
+            self._load_source, request=request, owner_id=owner_id
+        )
+        run.source_chars = len(source.text)
+
+        llm_title: Optional[str] = None
+        generated: List[QuestionDomain] = []
+        if plan.shortfall is not None:
+            try:
+                with llm_caller(owner_id, bulk=bulk):
+                    llm_title, generated = await agenerate_questions(
+                        self._question_generator,
+                        source_text=source.text,
+                        params=plan.shortfall,
+                        surplus=plan.surplus,
+                    )
+            except LLMUnavailableError as exc:
+                raise self._unavailable(exc) from exc
+            except ValueError as exc:
+                raise HTTPException(status_code=400, detail=str(exc)) from exc
+            except Exception as exc:
+                raise HTTPException(status_code=500, detail=f"LLM error: {exc}") from exc
+
+        run.questions_returned = len(generated)
+        questions = plan.reused + generated
+        if not questions:
+            raise ValueError("LLM zwrócił pustą listę pytań.")
+
+        return await asyncio.to_thread(
+            self._store_generated,
+            owner_id=owner_id,
+            title=(llm_title or "").strip() or source.title,
+            questions=questions,
+            plan=plan,
+        )
+
+    async def agenerate_batch(
+        self,
+        *,
+        request: TestBatchGenerateRequest,
+        owner_id: int,
+    ) -> TestBatchGenerateResponse:
+        """Generate one test per item concurrently; each item succeeds or fails on its own.
+
+        Items are persisted in separate transactions as they finish, so a
+        failing item never rolls back the others. LLM concurrency is bounded
+        by the provider's global limit, not per batch.
+        """
+        if len(request.items) > self._max_batch_items:
+            raise ValueError(f"A batch may contain at most {self._max_batch_items} items")
+
+        results = await asyncio.gather(
+            *(
+                self._agenerate_batch_item(index=index, item=item, owner_id=owner_id)
+                for index, item in enumerate(request.items)
+            )
+        )
+        succeeded = sum(1 for result in results if result.status == "ok")
+        return TestBatchGenerateResponse(
+            results=list(results),
+            succeeded=succeeded,
+            failed=len(results) - succeeded,
+        )
+
+    async def _agenerate_batch_item(
+        self,
+        *,
+        index: int,
+        item: BatchGenerateItem,
+        owner_id: int,
+    ) -> BatchItemResult:
+        try:
+            response = await self.agenerate_test_from_input(
+                request=item, owner_id=owner_id, bulk=True
+            )
+        except HTTPException as exc:
+            return BatchItemResult(
+                index=index, status="error", status_code=exc.status_code, error=str(exc.detail)
+            )
+        except ValueError as exc:
+            return BatchItemResult(index=index, status="error", status_code=400, error=str(exc))
+        except Exception:  # noqa: BLE001 - one broken item must not fail the batch
+            logger.exception("Batch item %d failed", index)
+            return BatchItemResult(
+                index=index, status="error", status_code=500, error="Generation failed"
+            )
+
+        return BatchItemResult(
+            index=index,
+            status="ok",
+            test_id=response.test_id,
+            num_questions=response.num_questions,
+            reused_from_bank=response.reused_from_bank,
+            repeated_question_ids=response.repeated_question_ids,
+        )
+
+    def estimate_generation(
+        self,
+        *,
+        request: TestGenerateRequest,
+        owner_id: int,
+    ) -> GenerationEstimateOut:
+        """Dry run: token, cost and latency estimate without calling the LLM."""
+        if self._generation_estimator is None:
+            raise ValueError("Generation estimates are not available")
+
+        with self._uow_factory() as uow:
+            source = self._resolve_source(uow, request=request, owner_id=owner_id)
+
+        estimate = self._generation_estimator.estimate(source_text=source.text, params=request)
+        return GenerationEstimateOut(
+            source_tokens=estimate.source_tokens,
+            prompt_tokens=estimate.prompt_tokens,
+            output_tokens=estimate.output_tokens,
+            trimmed=estimate.trimmed,
+            estimated_cost_usd=round(estimate.estimated_cost_usd, 6),
+            estimated_latency_seconds=round(estimate.estimated_latency_seconds, 2),
+        )
+
+    def stream_test_from_input(
+        self,
+        *,
+        request: TestGenerateRequest,
+        owner_id: int,
+    ) -> Iterator[Dict[str, Any]]:
+        """Resolve the source eagerly, then return a generator of stream events.
+
+        Events are ``{"event": ..., "data": ...}`` dicts: ``title``, one
+        ``question`` per question as the LLM produces it, then ``done`` with the
+        persisted ``test_id`` (or ``error``). Questions reused from the question
+        bank are sent first, before the LLM is called for the rest.
+        """
+        if self._streaming_generator is None:
+            raise ValueError("Streaming generation is not available")
+
+        run = RunRecord.start(request, owner_id)
+        try:
+            with tracing(run.trace):
+                source, plan = self._load_source(request=request, owner_id=owner_id)
+        except BaseException as exc:
+            run.fail(exc)
+            self._save_run(run)
+            raise
+        run.source_chars = len(source.text)
+
+        return self._recorded_stream(
+            self._stream_events(source=source, plan=plan, owner_id=owner_id, run=run), run
+        )
+
+    def _recorded_stream(
+        self, events: Iterator[Dict[str, Any]], run: RunRecord
+    ) -> Iterator[Dict[str, Any]]:
+        try:
+            for event in events:
+                if event["event"] == "error":
+                    run.status = "error"
+                yield event
+        except BaseException as exc:
+            run.fail(exc)
+            raise
+        finally:
+            events.close()
+            self._save_run(run)
+
+    def _stream_events(
+        self,
+        *,
+        source: ResolvedSource,
+        plan: BankPlan,
+        owner_id: int,
+        run: RunRecord,
+    ) -> Iterator[Dict[str, Any]]:
+        llm_title: Optional[str] = None
+        questions: List[QuestionDomain] = []
+        # Drop near-duplicates before the client sees them; history repeats are flagged on save.
+        seen = self._deduplicator.new_index() if self._deduplicator is not None else None
+        skipped = 0
+
+        # Banked questions are ready immediately; only the shortfall is streamed from the LLM.
+        for question in plan.reused:
+            if seen is not None:
+                seen.add(len(questions), question_fingerprint_text(question))
+            payload = dto.to_question_dict(question)
+            payload["index"] = len(questions)
+            questions.append(question)
+            yield {"event": "question", "data": payload}
+
+        events = (
+            self._streaming_generator.stream(source_text=source.text, params=plan.shortfall)
+            if plan.shortfall is not None
+            else iter(())
+        )
+        try:
+            for kind, value in self._as_caller(events, owner_id, run.trace):
+                if kind == "title":
+                    llm_title = value
+                    yield {"event": "title", "data": {"title": value}}
+                elif kind == "question":
+                    if seen is not None:
+                        fingerprint = question_fingerprint_text(value)
+                        if seen.best_match(fingerprint) is not None:
+                            skipped += 1
+                            continue
+                        seen.add(len(questions), fingerprint)
+                    payload = dto.to_question_dict(value)
+                    payload["index"] = len(questions)
+                    questions.append(value)
+                    run.questions_returned += 1
+                    yield {"event": "question", "data": payload}
+        except Exception as exc:  # noqa: BLE001 - the stream is already open, report in-band
+            logger.warning("Streaming generation failed: %s", exc)
+            run.fail(exc)
+            yield {"event": "error", "data": {"detail": f"LLM error: {exc}"}}
+            return
+
+        if not questions:
+            run.error_class = "EmptyResult"
+            yield {"event": "error", "data": {"detail": "LLM zwrócił pustą listę pytań."}}
+            return
+
+        with tracing(run.trace):
+            response = self._store_generated(
                 owner_id=owner_id,
-                title=final_title,
+                title=(llm_title or "").strip() or source.title,
+                questions=questions,
+                plan=plan,
+            )
+        response.duplicates_removed += skipped
+        run.response = response
+        yield {"event": "done", "data": response.model_dump()}
+
+    @staticmethod
+    def _as_caller(
+        events: Iterator[Any], owner_id: int, trace: Optional[GenerationTrace] = None
+    ) -> Iterator[Any]:
+        # Each step of a streamed response may run in a different worker thread
+        # and context, so the caller and the trace are re-attached around every pull.
+        iterator = iter(events)
+        try:
+            while True:
+                with llm_caller(owner_id), tracing(trace):
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        return
+                yield item
+        finally:
+            # Release the provider slot promptly if the client goes away mid-stream.
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+    @contextmanager
+    def _recorded_run(self, request: GenerationSource, owner_id: int) -> Iterator[RunRecord]:
+        run = RunRecord.start(request, owner_id)
+        try:
+            with tracing(run.trace):
+                yield run
+        except BaseException as exc:
+            run.fail(exc)
+            raise
+        finally:
+            self._save_run(run)
+
+    @asynccontextmanager
+    async def _arecorded_run(
+        self, request: GenerationSource, owner_id: int
+    ) -> AsyncIterator[RunRecord]:
+        run = RunRecord.start(request, owner_id)
+        try:
+            with tracing(run.trace):
+                yield run
+        except BaseException as exc:
+            run.fail(exc)
+            raise
+        finally:
+            if self._telemetry_enabled:
+                await asyncio.to_thread(self._save_run, run)
+
+    def _save_run(self, run: RunRecord) -> None:
+        if not self._telemetry_enabled:
+            return
+        try:
+            with self._uow_factory() as uow:
+                uow.generation_runs.add(run.to_domain())
+        except Exception:  # noqa: BLE001 - telemetry must never fail a generation
+            logger.exception("Failed to record generation run")
+
+    @staticmethod
+    def _unavailable(exc: LLMUnavailableError) -> HTTPException:
+        return HTTPException(
+            status_code=503,
+            detail=str(exc),
+            headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+        )
+
+    def _load_source(
+        self, *, request: GenerationSource, owner_id: int
+    ) -> Tuple[ResolvedSource, BankPlan]:
+        with self._uow_factory() as uow:
+            with trace_stage(STAGE_SOURCE):
+                source = self._resolve_source(uow, request=request, owner_id=owner_id)
+            return source, self._plan_from_bank(uow, source=source, params=request)
+
+    def _plan_from_bank(
+        self,
+        uow: UnitOfWork,
+        *,
+        source: ResolvedSource,
+        params: GenerationSource,
+    ) -> BankPlan:
+        """Fill as much of the request as possible from questions banked for this source."""
+        if not self._question_bank_enabled:
+            return BankPlan(shortfall=params)
+
+        banked = uow.question_bank.list_for_source(
+            source.checksum, limit=self._question_bank_fetch_limit
+        )
+        # Least used first, so regenerations rotate through the bank.
+        selected, _ = select_questions(banked, params)
+        plan = BankPlan(checksum=source.checksum, shortfall=compute_shortfall(selected, params))
+        for question in selected:
+            # Reused questions are copied into the new test, not moved.
+            copy = dataclasses.replace(question, id=None)
+            plan.entry_ids[id(copy)] = question.id
+            plan.reused.append(copy)
+        if plan.reused:
+            logger.info(
+                "Question bank supplied %d of the requested questions", len(plan.reused)
             )
-            persisted_test = uow.tests.create(test)
+        return plan
 
-            for question in questions:
-                uow.tests.add_question(persisted_test.id, question)
+    def _store_generated(
+        self,
+        *,
+        owner_id: int,
+        title: str,
+        questions: List[QuestionDomain],
+        plan: Optional[BankPlan] = None,
+    ) -> TestGenerateResponse:
+        duplicates_removed = 0
+        repeats: Dict[int, int] = {}
+        generated = list(questions)
+
+        with trace_stage(STAGE_STORE), self._uow_factory() as uow:
+            if self._deduplicator is not None:
+                existing = (
+                    uow.tests.list_questions_for_user(owner_id, limit=self._dedup_history_limit)
+                    if self._dedup_history_limit > 0
+                    else ()
+                )
+                result = self._deduplicator.dedupe(questions, existing=existing)
+                if result.dropped:
+                    logger.info("Dropped %d near-duplicate questions", len(result.dropped))
+                questions = result.unique
+                duplicates_removed = len(result.dropped)
+                repeats = result.repeats
 
-            TestGenerated.create(
-                test_id=persisted_test.id,
+            persisted_test = self._persist_test(
+                uow,
                 owner_id=owner_id,
-                question_count=len(questions),
+                title=title,
+                questions=questions,
             )
+            reused = self._update_bank(uow, plan=plan, kept=questions, generated=generated)
+
+        return TestGenerateResponse(
+            test_id=persisted_test.id,
+            num_questions=len(questions),
+            reused_from_bank=reused,
+            duplicates_removed=duplicates_removed,
+            repeated_question_ids=[persisted_test.questions[i].id for i in sorted(repeats)],
+        )
+
+    @staticmethod
+    def _update_bank(
+        uow: UnitOfWork,
+        *,
+        plan: Optional[BankPlan],
+        kept: List[QuestionDomain],
+        generated: List[QuestionDomain],
+    ) -> int:
+        """Bank fresh questions and count reuse; returns how many saved questions came from the bank."""
+        if plan is None or plan.checksum is None:
+            return 0
+
+        kept_ids = {id(question) for question in kept}
+        reused_ids = [plan.entry_ids[id(q)] for q in kept if id(q) in plan.entry_ids]
+        fresh = [q for q in generated if id(q) not in plan.entry_ids]
+        try:
+            uow.question_bank.mark_used(reused_ids)
+            uow.question_bank.add_many(
+                plan.checksum, [q for q in fresh if id(q) in kept_ids], used=True
+            )
+            # Near-duplicates dropped from this test may still suit a later one.
+            uow.question_bank.add_many(
+                plan.checksum, [q for q in fresh if id(q) not in kept_ids] + plan.surplus
+            )
+        except Exception:  # noqa: BLE001 - the test is already saved; the bank is best effort
+            logger.exception("Failed to update the question bank")
+            uow.rollback()
+        return len(reused_ids)
+
+    def _resolve_source(
+        self,
+        uow: UnitOfWork,
+        *,
+        request: GenerationSource,
+        owner_id: int,
+    ) -> ResolvedSource:
+        material_id = getattr(request, "material_id", None)
+        if material_id is not None:
+            material = uow.materials.get(material_id)
+            if not material or material.owner_id != owner_id:
+                raise ValueError("Material not found")
+            if material.status == ProcessingStatus.PENDING:
+                raise ValueError("Material is still being processed")
+            if not self._has_text(material):
+                raise ValueError("Material has no extracted text")
+            return self._material_source(material)
+
+        text = getattr(request, "text", None)
+        normalized_text = text.strip() if text else ""
 
-            return TestGenerateResponse(
-                test_id=persisted_test.id,
-                num_questions=len(questions),
+        if normalized_text:
+            if request.file_id is not None:
+                source_file = uow.files.get(request.file_id)
+                if not source_file or source_file.owner_id != owner_id:
+                    raise ValueError("File not found")
+                return ResolvedSource(
+                    normalized_text, source_file.filename, self._text_checksum(normalized_text)
+                )
+            return ResolvedSource(
+                normalized_text, "From raw text", self._text_checksum(normalized_text)
             )
 
+        if request.file_id is None:
+            raise ValueError("file_id is required when text is not provided")
+        source_file = uow.files.get(request.file_id)
+        if not source_file or source_file.owner_id != owner_id:
+            raise ValueError("File not found")
+        # Files uploaded as materials were already extracted; reuse that text.
+        material = uow.materials.get_by_file(source_file.id)
+        if material is not None and self._has_text(material):
+            return self._material_source(material)
+        source_text = self._ocr_service.extract_text(
+            file_path=str(source_file.stored_path)
+        )
+        return ResolvedSource(
+            source_text, source_file.filename, self._text_checksum(source_text)
+        )
+
+    @staticmethod
+    def _has_text(material: MaterialDomain) -> bool:
+        return material.status == ProcessingStatus.DONE and bool((material.extracted_text or "").strip())
+
+    def _material_source(self, material: MaterialDomain) -> ResolvedSource:
+        """Source from a material's stored text, compacted once and then served from cache."""
+        raw = material.extracted_text or ""
+        text: Optional[str] = None
+        key: Optional[str] = None
+        if self._material_text_cache is not None:
+            # Edits to the stored text change the key, so stale entries are never served.
+            key = make_cache_key("material-text", material.id, len(raw), hash(raw))
+            text = self._material_text_cache.get(key)
+        if text is None:
+            text = compact_text(raw) or raw.strip()
+            if key is not None:
+                self._material_text_cache.set(key, text)
+        return ResolvedSource(
+            text=text,
+            title=material.file.filename,
+            checksum=material.checksum or self._text_checksum(raw),
+        )
 
+    @staticmethod
+    def _text_checksum(text: str) -> str:
+        return hashlib.sha256(normalize_source_text(text).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _persist_test(
+        uow: UnitOfWork,
+        *,
+        owner_id: int,
+        title: str,
+        questions: List[QuestionDomain],
+    ) -> TestDomain:
+        test = TestDomain(
+            id=None,
+            owner_id=owner_id,
+            title=title,
+        )
+        persisted_test = uow.tests.create(test)
+
+        for question in questions:
+            persisted_test.questions.append(uow.tests.add_question(persisted_test.id, question))
+
+        TestGenerated.create(
+            test_id=persisted_test.id,
+            owner_id=owner_id,
+            question_count=len(questions),
+        )
+        return persisted_test
 
     def get_test_detail(self, *, owner_id: int, test_id: int) -> TestDetailOut:
         with self._uow_factory() as uow:
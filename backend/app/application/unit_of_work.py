@@ -7,13 +7,17 @@ from sqlalchemy.orm import Session
 
 from app.domain.repositories import (
     FileRepository,
+    GenerationRunRepository,
     MaterialRepository,
+    QuestionBankRepository,
     TestRepository,
     UserRepository,
 )
 from app.infrastructure.persistence.sqlmodel import (
     SqlModelFileRepository,
+    SqlModelGenerationRunRepository,
     SqlModelMaterialRepository,
+    SqlModelQuestionBankRepository,
     SqlModelTestRepository,
     SqlModelUserRepository,
 )
@@ -27,6 +31,8 @@ class SqlAlchemyUnitOfWork(AbstractContextManager):
         self.tests: Optional[TestRepository] = None
         self.files: Optional[FileRepository] = None
         self.materials: Optional[MaterialRepository] = None
+        self.question_bank: Optional[QuestionBankRepository] = None
+        self.generation_runs: Optional[GenerationRunRepository] = None
 
     def __enter__(self) -> "SqlAlchemyUnitOfWork":
         self.session = self._session_factory()
@@ -35,6 +41,8 @@ class SqlAlchemyUnitOfWork(AbstractContextManager):
         self.tests = SqlModelTestRepository(self.session)
         self.files = SqlModelFileRepository(self.session)
         self.materials = SqlModelMaterialRepository(self.session)
+        self.question_bank = SqlModelQuestionBankRepository(self.session)
+        self.generation_runs = SqlModelGenerationRunRepository(self.session)
         return self
 
     def __exit__(self, exc_type, exc, tb) -> None:
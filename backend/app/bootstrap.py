@@ -1,26 +1,66 @@
 import logging
+from datetime import timedelta
 from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.application.services import AuthService, FileService, MaterialService, TestService, UserService
+from app.application.services import (
+    AuthService,
+    FileService,
+    GenerationJobService,
+    MaterialService,
+    MonitoringService,
+    TestService,
+    UserService,
+)
+from app.application.dedup import QuestionDeduplicator
 from app.application.unit_of_work import SqlAlchemyUnitOfWork
 from app.core.config import Settings, get_settings
 from app.db.session import get_session_factory, init_db
+from app.domain.services import (
+    GenerationJobQueue,
+    MaterialProcessingQueue,
+    OCRProgress,
+    OCRService,
+    QuestionGenerator,
+)
 from app.infrastructure import (
+    PROMPT_VERSION,
+    AsyncGeminiQuestionGenerator,
+    CachingOCRService,
+    CachingQuestionGenerator,
+    ChunkedQuestionGenerator,
+    CircuitBreaker,
     DefaultOCRService,
-    GeminiQuestionGenerator,
+    FairScheduledQuestionGenerator,
+    FairScheduler,
+    FakeQuestionGenerator,
+    HybridPdfExtractor,
+    ImagePreprocessor,
+    OCRWorkerPool,
+    PdfPageOCR,
+    PreprocessingConfig,
+    ResilientQuestionGenerator,
+    RetryPolicy,
     LocalFileStorage,
     SqlModelFileRepository,
     SqlModelMaterialRepository,
+    SqlModelQuestionBankRepository,
     SqlModelTestRepository,
     SqlModelUserRepository,
 )
-from app.api.routers import auth, files, materials, tests, users
+from app.api.routers import auth, files, materials, monitoring, tests, users
+from app.infrastructure.caching import DiskCacheStore, TwoTierCache
 from app.infrastructure.extractors import extract_text_from_file
+from app.infrastructure.llm.token_budget import CostModel, TokenBudget, truncate_to_tokens
+from app.infrastructure.jobs import InProcessJobQueue, InProcessMaterialQueue
+from app.infrastructure.ocr.engine import require_tesserocr
+
+if TYPE_CHECKING:
+    from app.infrastructure.llm.salience import PassageSelector
 
 try:  # pragma: no cover - optional dependency
     import magic
@@ -33,11 +73,27 @@ class AppContainer:
 
     def __init__(self, settings: Settings):
         self._settings = settings
-        self._question_generator = GeminiQuestionGenerator()
-        self._ocr_service = DefaultOCRService()
+        self._passage_selector = self._build_passage_selector()
+        self._llm_provider = self._build_llm_provider()
+        self._llm_scheduler = self._build_llm_scheduler()
+        self._llm_resilience = self._build_llm_resilience()
+        self._llm_scheduled = self._build_llm_scheduled()
+        self._generation_cache = self._build_generation_cache()
+        self._question_generator = self._build_question_generator()
+        # Process-wide, since a TestService is built per request.
+        self._material_text_cache = TwoTierCache(memory_size=settings.MATERIAL_TEXT_CACHE_SIZE)
+        self._deduplicator = (
+            QuestionDeduplicator(threshold=settings.DEDUP_SIMILARITY_THRESHOLD)
+            if settings.DEDUP_ENABLED
+            else None
+        )
+        self._pdf_extractor = self._build_pdf_extractor()
+        self._ocr_service = self._build_ocr_service()
         self._file_storage = LocalFileStorage()
         self._materials_storage = LocalFileStorage(base_dir=Path("uploads/materials"))
         self._session_factory = get_session_factory(settings)
+        self._job_queue = self._build_job_queue()
+        self._material_queue = self._build_material_queue()
 
     @property
     def settings(self) -> Settings:
@@ -48,10 +104,10 @@ class AppContainer:
 
         return get_session
 
-    def provide_question_generator(self) -> GeminiQuestionGenerator:
+    def provide_question_generator(self) -> QuestionGenerator:
         return self._question_generator
 
-    def provide_ocr_service(self) -> DefaultOCRService:
+    def provide_ocr_service(self) -> OCRService:
         return self._ocr_service
 
     def provide_file_storage(self) -> LocalFileStorage:
@@ -69,6 +125,9 @@ class AppContainer:
     def provide_material_repository(self, session) -> SqlModelMaterialRepository:
         return SqlModelMaterialRepository(session)
 
+    def provide_question_bank_repository(self, session) -> SqlModelQuestionBankRepository:
+        return SqlModelQuestionBankRepository(session)
+
     def provide_unit_of_work(self) -> SqlAlchemyUnitOfWork:
         return SqlAlchemyUnitOfWork(self._session_factory)
 
@@ -80,8 +139,39 @@ class AppContainer:
             lambda: self.provide_unit_of_work(),
             question_generator=self._question_generator,
             ocr_service=self._ocr_service,
+            streaming_generator=self._llm_scheduled,
+            generation_estimator=self._question_generator,
+            max_batch_items=self._settings.GENERATION_BATCH_MAX_ITEMS,
+            deduplicator=self._deduplicator,
+            dedup_history_limit=self._settings.DEDUP_HISTORY_LIMIT,
+            question_bank_enabled=self._settings.QUESTION_BANK_ENABLED,
+            question_bank_fetch_limit=self._settings.QUESTION_BANK_FETCH_LIMIT,
+            material_text_cache=self._material_text_cache,
+            telemetry_enabled=self._settings.GENERATION_TELEMETRY_ENABLED,
+        )
+
+    def provide_generation_job_queue(self) -> GenerationJobQueue:
+        return self._job_queue
+
+    def provide_generation_job_service(self) -> GenerationJobService:
+        return GenerationJobService(job_queue=self._job_queue)
+
+    def provide_monitoring_service(self) -> MonitoringService:
+        ocr_cache = self._ocr_service if isinstance(self._ocr_service, CachingOCRService) else None
+        return MonitoringService(
+            llm_resilience=self._llm_resilience,
+            llm_scheduler=self._llm_scheduler,
+            llm_cache=self._generation_cache,
+            ocr_cache=ocr_cache,
+            uow_factory=lambda: self.provide_unit_of_work(),
+            generation_stats_max_runs=self._settings.GENERATION_STATS_MAX_RUNS,
         )
 
+    def shutdown(self) -> None:
+        self._job_queue.shutdown()
+        self._material_queue.shutdown()
+        self._ocr_service.shutdown()
+
     def provide_file_service(self) -> FileService:
         return FileService(
             lambda: self.provide_unit_of_work(),
@@ -97,8 +187,213 @@ class AppContainer:
         return MaterialService(
             lambda: self.provide_unit_of_work(),
             storage=self._materials_storage,
-            text_extractor=extract_text_from_file,
+            text_extractor=self._extract_material_text,
             mime_detector=self._detect_mime,
+            processing_queue=self._material_queue,
+            status_stream_timeout=self._settings.MATERIAL_STATUS_STREAM_TIMEOUT_SECONDS,
+            status_poll_interval=self._settings.MATERIAL_STATUS_POLL_SECONDS,
+        )
+
+    def _extract_material_text(
+        self,
+        path: Path,
+        mime_type: Optional[str],
+        *,
+        max_chars: Optional[int] = None,
+        progress: Optional[OCRProgress] = None,
+    ) -> Optional[str]:
+        return extract_text_from_file(
+            path,
+            mime_type,
+            max_chars=max_chars,
+            pdf_reader=lambda pdf: self._pdf_extractor.iter_pages(str(pdf), progress=progress),
+        )
+
+    def _build_passage_selector(self) -> Optional["PassageSelector"]:
+        if not self._settings.LLM_PASSAGE_SELECTION_ENABLED:
+            return None
+        from app.infrastructure.llm.salience import PassageSelector  # requires numpy
+
+        return PassageSelector(
+            target_tokens=self._settings.LLM_PASSAGE_SELECTION_MAX_TOKENS,
+            passage_tokens=self._settings.LLM_PASSAGE_TOKENS,
+            sections=self._settings.LLM_PASSAGE_SECTIONS,
+        )
+
+    def _build_token_budget(self) -> TokenBudget:
+        selector = self._passage_selector
+        return TokenBudget(
+            max_prompt_tokens=self._settings.LLM_MAX_PROMPT_TOKENS,
+            context_window_tokens=self._settings.LLM_CONTEXT_WINDOW_TOKENS,
+            output_tokens_per_question=self._settings.LLM_OUTPUT_TOKENS_PER_QUESTION,
+            cost_model=CostModel(
+                input_usd_per_mtok=self._settings.LLM_INPUT_USD_PER_MTOK,
+                output_usd_per_mtok=self._settings.LLM_OUTPUT_USD_PER_MTOK,
+                output_tokens_per_second=self._settings.LLM_OUTPUT_TOKENS_PER_SECOND,
+                base_latency_seconds=self._settings.LLM_BASE_LATENCY_SECONDS,
+            ),
+            trimmer=selector or truncate_to_tokens,
+            source_target_tokens=selector.target_tokens if selector is not None else None,
+        )
+
+    def _build_llm_provider(self) -> AsyncGeminiQuestionGenerator | FakeQuestionGenerator:
+        if self._settings.LLM_PROVIDER == "fake":
+            return FakeQuestionGenerator(
+                latency_median=self._settings.FAKE_LLM_LATENCY_MEDIAN_SECONDS,
+                latency_sigma=self._settings.FAKE_LLM_LATENCY_SIGMA,
+                failure_rate=self._settings.FAKE_LLM_FAILURE_RATE,
+                malformed_rate=self._settings.FAKE_LLM_MALFORMED_RATE,
+                seed=self._settings.FAKE_LLM_SEED,
+                token_budget=self._build_token_budget(),
+            )
+
+        return AsyncGeminiQuestionGenerator(
+            max_concurrency=self._settings.LLM_MAX_CONCURRENCY,
+            request_timeout=self._settings.LLM_REQUEST_TIMEOUT_SECONDS,
+            max_topup_rounds=self._settings.LLM_TOPUP_ROUNDS,
+            token_budget=self._build_token_budget(),
+        )
+
+    def _build_llm_scheduler(self) -> Optional[FairScheduler]:
+        if not self._settings.LLM_SCHEDULER_ENABLED:
+            return None
+        return FairScheduler(
+            max_in_flight=self._settings.LLM_SCHEDULER_MAX_IN_FLIGHT,
+            interactive_weight=self._settings.LLM_SCHEDULER_INTERACTIVE_WEIGHT,
+            max_queue_seconds=self._settings.LLM_SCHEDULER_MAX_QUEUE_SECONDS or None,
+        )
+
+    def _build_llm_resilience(self) -> ResilientQuestionGenerator:
+        return ResilientQuestionGenerator(
+            self._llm_provider,
+            breaker=CircuitBreaker(
+                "gemini",
+                failure_rate_threshold=self._settings.LLM_BREAKER_FAILURE_RATE,
+                minimum_calls=self._settings.LLM_BREAKER_MIN_CALLS,
+                window_seconds=self._settings.LLM_BREAKER_WINDOW_SECONDS,
+                open_seconds=self._settings.LLM_BREAKER_OPEN_SECONDS,
+                half_open_max_calls=self._settings.LLM_BREAKER_HALF_OPEN_PROBES,
+            ),
+            retry_policy=RetryPolicy(
+                max_attempts=self._settings.LLM_RETRY_MAX_ATTEMPTS,
+                base_delay=self._settings.LLM_RETRY_BASE_DELAY_SECONDS,
+                max_delay=self._settings.LLM_RETRY_MAX_DELAY_SECONDS,
+            ),
+        )
+
+    def _build_llm_scheduled(self) -> QuestionGenerator:
+        # Outside the breaker: a full queue is local saturation, not a provider failure.
+        if self._llm_scheduler is None:
+            return self._llm_resilience
+        return FairScheduledQuestionGenerator(self._llm_resilience, self._llm_scheduler)
+
+    def _build_question_generator(self) -> ChunkedQuestionGenerator:
+        return ChunkedQuestionGenerator(
+            self._generation_cache or self._llm_scheduled,
+            chunk_chars=self._settings.LLM_CHUNK_CHARS,
+            overlap_chars=self._settings.LLM_CHUNK_OVERLAP_CHARS,
+            max_concurrency=self._settings.LLM_CHUNK_CONCURRENCY,
+            preselector=self._passage_selector.preselect if self._passage_selector else None,
+            estimator=self._llm_provider,
+        )
+
+    def _build_generation_cache(self) -> Optional[CachingQuestionGenerator]:
+        if not self._settings.LLM_CACHE_ENABLED:
+            return None
+        cache = TwoTierCache(
+            memory_size=self._settings.LLM_CACHE_MEMORY_SIZE,
+            disk=DiskCacheStore(
+                self._settings.LLM_CACHE_DIR,
+                ttl_seconds=self._settings.LLM_CACHE_TTL_SECONDS,
+                max_bytes=self._settings.LLM_CACHE_MAX_BYTES,
+            ),
+        )
+        return CachingQuestionGenerator(
+            self._llm_scheduled,
+            cache,
+            model_name=self._llm_provider.model_name,
+            prompt_version=PROMPT_VERSION,
+        )
+
+    def _build_pdf_extractor(self) -> HybridPdfExtractor:
+        page_ocr = (
+            PdfPageOCR(
+                language=self._settings.OCR_LANGUAGE,
+                dpi=self._settings.OCR_PDF_DPI,
+                max_pages=self._settings.OCR_PDF_MAX_PAGES,
+                max_workers=self._settings.OCR_PDF_WORKERS or None,
+            )
+            if self._settings.OCR_PDF_ENABLED
+            else None
+        )
+        return HybridPdfExtractor(
+            page_ocr=page_ocr, min_page_chars=self._settings.OCR_PDF_TEXT_LAYER_MIN_CHARS
+        )
+
+    def _build_ocr_service(self) -> OCRService:
+        if self._settings.OCR_ENGINE == "tesserocr":
+            # Asked for explicitly: fail now rather than fall back to a process per image.
+            require_tesserocr(self._settings.OCR_LANGUAGE)
+        preprocessor = (
+            ImagePreprocessor(
+                PreprocessingConfig(
+                    target_dpi=self._settings.OCR_PREPROCESS_TARGET_DPI,
+                    binarize=self._settings.OCR_PREPROCESS_BINARIZE,
+                    deskew=self._settings.OCR_PREPROCESS_DESKEW,
+                    crop_borders=self._settings.OCR_PREPROCESS_CROP_BORDERS,
+                )
+            )
+            if self._settings.OCR_PREPROCESSING_ENABLED
+            else None
+        )
+        worker_pool = (
+            OCRWorkerPool(
+                language=self._settings.OCR_LANGUAGE,
+                preprocessor=preprocessor,
+                size=self._settings.OCR_POOL_SIZE,
+                timeout=self._settings.OCR_POOL_TIMEOUT_SECONDS,
+                healthcheck_interval=self._settings.OCR_POOL_HEALTHCHECK_SECONDS,
+                max_jobs_per_worker=self._settings.OCR_POOL_MAX_JOBS_PER_WORKER,
+            )
+            if self._settings.OCR_ENGINE in ("pool", "tesserocr")
+            else None
+        )
+        service: OCRService = DefaultOCRService(
+            language=self._settings.OCR_LANGUAGE,
+            pdf_extractor=self._pdf_extractor,
+            worker_pool=worker_pool,
+            preprocessor=preprocessor,
+        )
+        if not self._settings.OCR_CACHE_ENABLED:
+            return service
+        cache = TwoTierCache(
+            memory_size=self._settings.OCR_CACHE_MEMORY_SIZE,
+            disk=DiskCacheStore(
+                self._settings.OCR_CACHE_DIR,
+                ttl_seconds=self._settings.OCR_CACHE_TTL_SECONDS,
+                max_bytes=self._settings.OCR_CACHE_MAX_BYTES,
+            ),
+        )
+        return CachingOCRService(service, cache)
+
+    def _build_job_queue(self) -> GenerationJobQueue:
+        if self._settings.GENERATION_JOB_BACKEND == "celery":
+            from app.infrastructure.jobs.celery_queue import CeleryJobQueue  # requires a broker
+
+            return CeleryJobQueue()
+
+        return InProcessJobQueue(
+            lambda request, owner_id: self.provide_test_service().generate_test_from_input(
+                request=request, owner_id=owner_id, bulk=True
+            ),
+            max_workers=self._settings.GENERATION_JOB_WORKERS,
+            retention=timedelta(seconds=self._settings.GENERATION_JOB_RETENTION_SECONDS),
+        )
+
+    def _build_material_queue(self) -> MaterialProcessingQueue:
+        return InProcessMaterialQueue(
+            lambda material_id: self.provide_material_service().process_material(material_id),
+            max_workers=self._settings.MATERIAL_PROCESSING_WORKERS,
         )
 
     @staticmethod
@@ -151,6 +446,14 @@ def create_app(settings_override: Optional[Settings] = None) -> FastAPI:
             init_db(create_tables=True)
         else:
             logger.info("Skipping auto table creation (AUTO_CREATE_TABLES=False)")
+        try:
+            container.provide_material_service().resume_pending()
+        except Exception:  # noqa: BLE001 - the app still serves; materials stay pending
+            logger.exception("Could not resume pending material processing")
+
+    @app.on_event("shutdown")
+    def on_shutdown() -> None:
+        container.shutdown()
 
     @app.get("/ping")
     def pong():
@@ -161,6 +464,7 @@ def create_app(settings_override: Optional[Settings] = None) -> FastAPI:
     app.include_router(files.router, prefix="/files", tags=["files"])
     app.include_router(tests.router, prefix="/tests", tags=["tests"])
     app.include_router(materials.router)
+    app.include_router(monitoring.router, prefix="/monitoring", tags=["monitoring"])
 
     return app
 
@@ -1,5 +1,5 @@
 from functools import lru_cache
-from typing import List
+from typing import List, Literal
 
 from pydantic import Field
 from pydantic_settings import BaseSettings
@@ -17,10 +17,114 @@ class Settings(BaseSettings):
             "http://127.0.0.1:5173",
         ]
     )
+    ADMIN_EMAILS: List[str] = Field(default_factory=list)
     LOG_LEVEL: str = "INFO"
     AUTO_CREATE_TABLES: bool = True
     SQL_ECHO: bool = True
 
+    LLM_PROVIDER: Literal["gemini", "fake"] = "gemini"
+    LLM_MAX_CONCURRENCY: int = 64
+    LLM_REQUEST_TIMEOUT_SECONDS: float = 120.0
+    # Fair scheduling of provider calls across users (deficit round-robin).
+    LLM_SCHEDULER_ENABLED: bool = True
+    LLM_SCHEDULER_MAX_IN_FLIGHT: int = 32
+    LLM_SCHEDULER_INTERACTIVE_WEIGHT: int = 4
+    LLM_SCHEDULER_MAX_QUEUE_SECONDS: float = 120.0  # 0 waits indefinitely
+    LLM_TOPUP_ROUNDS: int = 1
+    LLM_RETRY_MAX_ATTEMPTS: int = 3
+    LLM_RETRY_BASE_DELAY_SECONDS: float = 0.5
+    LLM_RETRY_MAX_DELAY_SECONDS: float = 8.0
+    LLM_BREAKER_FAILURE_RATE: float = 0.5
+    LLM_BREAKER_MIN_CALLS: int = 10
+    LLM_BREAKER_WINDOW_SECONDS: float = 60.0
+    LLM_BREAKER_OPEN_SECONDS: float = 30.0
+    LLM_BREAKER_HALF_OPEN_PROBES: int = 2
+    LLM_MAX_PROMPT_TOKENS: int = 200_000
+    LLM_CONTEXT_WINDOW_TOKENS: int = 1_048_576
+    LLM_OUTPUT_TOKENS_PER_QUESTION: int = 120
+    LLM_INPUT_USD_PER_MTOK: float = 0.10
+    LLM_OUTPUT_USD_PER_MTOK: float = 0.40
+    LLM_OUTPUT_TOKENS_PER_SECOND: float = 150.0
+    LLM_BASE_LATENCY_SECONDS: float = 0.8
+
+    # Send only the most salient passages of long sources (BM25 over the text itself).
+    LLM_PASSAGE_SELECTION_ENABLED: bool = False
+    LLM_PASSAGE_SELECTION_MAX_TOKENS: int = 8_000
+    LLM_PASSAGE_TOKENS: int = 200
+    LLM_PASSAGE_SECTIONS: int = 8
+
+    # Only used with LLM_PROVIDER=fake (load tests, offline development).
+    FAKE_LLM_LATENCY_MEDIAN_SECONDS: float = 1.0
+    FAKE_LLM_LATENCY_SIGMA: float = 0.5
+    FAKE_LLM_FAILURE_RATE: float = 0.0
+    FAKE_LLM_MALFORMED_RATE: float = 0.0
+    FAKE_LLM_SEED: int = 0
+
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MEMORY_SIZE: int = 256
+    LLM_CACHE_DIR: str = "cache/llm"
+    LLM_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    LLM_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+
+    LLM_CHUNK_CHARS: int = 60_000
+    LLM_CHUNK_OVERLAP_CHARS: int = 1_000
+    LLM_CHUNK_CONCURRENCY: int = 4
+
+    GENERATION_BATCH_MAX_ITEMS: int = 50
+
+    DEDUP_ENABLED: bool = True
+    DEDUP_SIMILARITY_THRESHOLD: float = 0.8
+    DEDUP_HISTORY_LIMIT: int = 2000
+
+    QUESTION_BANK_ENABLED: bool = True
+    QUESTION_BANK_FETCH_LIMIT: int = 200
+
+    OCR_LANGUAGE: str = "pol"
+    # "pool" keeps OCR_POOL_SIZE worker processes with the language model loaded
+    # (tesserocr if installed); "tesserocr" is the same pool but refuses to start
+    # unless tesserocr can load OCR_LANGUAGE; "pytesseract" starts tesseract for
+    # every image.
+    OCR_ENGINE: Literal["pytesseract", "pool", "tesserocr"] = "pytesseract"
+    OCR_POOL_SIZE: int = 2
+    OCR_POOL_TIMEOUT_SECONDS: float = 120.0
+    OCR_POOL_HEALTHCHECK_SECONDS: float = 30.0
+    OCR_POOL_MAX_JOBS_PER_WORKER: int = 500
+    # Image normalisation before OCR (EXIF rotation, downscale and grayscale always run).
+    OCR_PREPROCESSING_ENABLED: bool = True
+    OCR_PREPROCESS_TARGET_DPI: int = 300
+    OCR_PREPROCESS_BINARIZE: bool = True
+    OCR_PREPROCESS_DESKEW: bool = True
+    OCR_PREPROCESS_CROP_BORDERS: bool = True
+    # Scanned PDFs: pages are rasterized and OCRed in parallel worker processes.
+    OCR_PDF_ENABLED: bool = True
+    OCR_PDF_DPI: int = 300
+    OCR_PDF_MAX_PAGES: int = 100
+    OCR_PDF_WORKERS: int = 0  # 0 uses one worker per CPU
+    # Pages whose text layer has fewer visible characters are OCRed instead.
+    OCR_PDF_TEXT_LAYER_MIN_CHARS: int = 32
+    OCR_CACHE_ENABLED: bool = True
+    OCR_CACHE_MEMORY_SIZE: int = 64
+    OCR_CACHE_DIR: str = "cache/ocr"
+    OCR_CACHE_TTL_SECONDS: int = 30 * 24 * 3600
+    OCR_CACHE_MAX_BYTES: int = 128 * 1024 * 1024
+
+    # Compacted material texts kept in memory for repeat generations.
+    MATERIAL_TEXT_CACHE_SIZE: int = 64
+
+    # One generation_run row per generation, summarised at /monitoring/generation.
+    GENERATION_TELEMETRY_ENABLED: bool = True
+    GENERATION_STATS_MAX_RUNS: int = 20_000
+
+    GENERATION_JOB_BACKEND: Literal["inprocess", "celery"] = "inprocess"
+    GENERATION_JOB_WORKERS: int = 4
+    GENERATION_JOB_RETENTION_SECONDS: int = 3600
+    # Uploaded materials are extracted in the background by this many threads.
+    MATERIAL_PROCESSING_WORKERS: int = 2
+    MATERIAL_STATUS_STREAM_TIMEOUT_SECONDS: float = 300.0
+    MATERIAL_STATUS_POLL_SECONDS: float = 5.0
+    CELERY_BROKER_URL: str = "redis://redis:6379/0"
+    CELERY_RESULT_BACKEND: str = "redis://redis:6379/1"
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
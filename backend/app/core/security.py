@@ -68,3 +68,13 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
 
     return user
 
+
+
+def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
+    admin_emails = {email.lower() for email in get_settings().ADMIN_EMAILS}
+    if current_user.email.lower() not in admin_emails:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required",
+        )
+    return current_user
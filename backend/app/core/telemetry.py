@@ -0,0 +1,133 @@
+"""Per-generation timing and usage trace, carried in a context variable.
+
+The application layer opens a trace around a generation; infrastructure
+code (providers, OCR) adds stage timings and LLM usage to whatever trace is
+current without the trace being threaded through every call. Worker
+threads see the trace as long as they run in a copy of the caller's
+context (``asyncio.to_thread`` and the chunked generator's pool do).
+"""
+
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, Optional
+
+STAGE_SOURCE = "source"
+STAGE_PROMPT = "prompt"
+STAGE_LLM = "llm"
+STAGE_PARSE = "parse"
+STAGE_STORE = "store"
+
+
+@dataclass
+class GenerationTrace:
+    """Accumulated timings and LLM usage of one generation.
+
+    Stage times are summed over all calls, so concurrent chunk calls can
+    add up to more than the wall-clock time.
+    """
+
+    started_at: float = field(default_factory=time.perf_counter)
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+    model_name: Optional[str] = None
+    llm_calls: int = 0
+    prompt_chars: int = 0
+    response_chars: int = 0
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    total_tokens: int = 0
+    cost_usd: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    def add_stage(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + seconds
+
+    def add_llm_call(
+        self,
+        *,
+        model_name: str,
+        prompt_chars: int,
+        response_chars: int,
+        prompt_tokens: int,
+        output_tokens: int,
+        total_tokens: Optional[int] = None,
+        cost_usd: float = 0.0,
+    ) -> None:
+        with self._lock:
+            self.model_name = model_name
+            self.llm_calls += 1
+            self.prompt_chars += prompt_chars
+            self.response_chars += response_chars
+            self.prompt_tokens += prompt_tokens
+            self.output_tokens += output_tokens
+            self.total_tokens += (
+                total_tokens if total_tokens is not None else prompt_tokens + output_tokens
+            )
+            self.cost_usd += cost_usd
+
+    def stage_ms(self, name: str) -> float:
+        with self._lock:
+            return self.stage_seconds.get(name, 0.0) * 1000
+
+
+_current_trace: contextvars.ContextVar[Optional[GenerationTrace]] = contextvars.ContextVar(
+    "generation_trace", default=None
+)
+
+
+def current_trace() -> Optional[GenerationTrace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def tracing(trace: Optional[GenerationTrace]) -> Iterator[Optional[GenerationTrace]]:
+    """Make ``trace`` current for the block (``None`` disables recording)."""
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def trace_stage(name: str) -> Iterator[None]:
+    """Add the block's duration to stage ``name`` of the current trace, if any."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add_stage(name, time.perf_counter() - started)
+
+
+def record_llm_call(**usage) -> None:
+    """Add one LLM call's usage to the current trace (see ``GenerationTrace.add_llm_call``)."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_llm_call(**usage)
+
+
+__all__ = [
+    "GenerationTrace",
+    "STAGE_LLM",
+    "STAGE_PARSE",
+    "STAGE_PROMPT",
+    "STAGE_SOURCE",
+    "STAGE_STORE",
+    "current_trace",
+    "record_llm_call",
+    "trace_stage",
+    "tracing",
+]
@@ -3,7 +3,7 @@ from datetime import datetime
 from sqlmodel import SQLModel, Field, Relationship
 from enum import Enum
 from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy import Column, ForeignKey, Integer
+from sqlalchemy import Column, ForeignKey, Integer, UniqueConstraint
 
 class User(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -86,4 +86,62 @@ class Material(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
 
     owner: Optional[User] = Relationship(back_populates="materials")
-    file: Optional[File] = Relationship(back_populates="material")
\ No newline at end of file
+    file: Optional[File] = Relationship(back_populates="material")
+
+
+class QuestionBankEntry(SQLModel, table=True):
+    __tablename__ = "question_bank"
+    __table_args__ = (
+        UniqueConstraint("source_checksum", "fingerprint", name="uq_question_bank_source_fingerprint"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    source_checksum: str = Field(index=True, max_length=64)
+    fingerprint: str = Field(max_length=64)
+    question_type: str = Field(max_length=20)
+    text: str
+    is_closed: bool = Field(default=True)
+    difficulty: int = Field(default=1)
+    choices: Optional[List[str]] = Field(
+        default=None, sa_column=Column(JSONB)
+    )
+    correct_choices: Optional[List[str]] = Field(
+        default=None, sa_column=Column(JSONB)
+    )
+    times_used: int = Field(default=0)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    last_used_at: Optional[datetime] = None
+
+
+class GenerationRun(SQLModel, table=True):
+    __tablename__ = "generation_run"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    owner_id: Optional[int] = Field(
+        default=None,
+        sa_column=Column(Integer, ForeignKey("user.id", ondelete="SET NULL"), index=True),
+    )
+    test_id: Optional[int] = None
+    source_kind: str = Field(max_length=20)
+    status: str = Field(max_length=20)
+    error_class: Optional[str] = Field(default=None, max_length=120)
+    model_name: Optional[str] = Field(default=None, max_length=120)
+    questions_requested: int = 0
+    questions_returned: int = 0
+    questions_saved: int = 0
+    reused_from_bank: int = 0
+    source_chars: int = 0
+    prompt_chars: int = 0
+    response_chars: int = 0
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    total_tokens: int = 0
+    llm_calls: int = 0
+    cost_usd: float = 0.0
+    source_ms: float = 0.0
+    prompt_ms: float = 0.0
+    llm_ms: float = 0.0
+    parse_ms: float = 0.0
+    store_ms: float = 0.0
+    total_ms: float = 0.0
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
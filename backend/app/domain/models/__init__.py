@@ -1,14 +1,20 @@
-from .enums import ProcessingStatus, QuestionDifficulty
+from .enums import JobStatus, ProcessingStatus, QuestionDifficulty, QuestionType
 from .file import File
+from .generation_job import GenerationJob
+from .generation_run import GenerationRun
 from .material import Material
 from .question import Question
 from .test import Test
 from .user import User
 
 __all__ = [
+    "JobStatus",
     "ProcessingStatus",
     "QuestionDifficulty",
+    "QuestionType",
     "File",
+    "GenerationJob",
+    "GenerationRun",
     "Material",
     "Question",
     "Test",
@@ -9,16 +9,30 @@ class QuestionDifficulty(Enum):
     HARD = 3
 
 
+class QuestionType(Enum):
+    TRUE_FALSE = "true_false"
+    SINGLE_CHOICE = "single_choice"
+    MULTI_CHOICE = "multi_choice"
+    OPEN = "open"
+
+
 class ProcessingStatus(Enum):
     PENDING = "pending"
     DONE = "done"
     FAILED = "failed"
 
 
+class JobStatus(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
 class MaterialType(Enum):
     FILE = "file"
     TEXT = "text"
 
 
-__all__ = ["QuestionDifficulty", "ProcessingStatus", "MaterialType"]
+__all__ = ["QuestionDifficulty", "QuestionType", "ProcessingStatus", "JobStatus", "MaterialType"]
 
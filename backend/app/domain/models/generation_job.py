@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from .enums import JobStatus
+
+
+@dataclass(slots=True)
+class GenerationJob:
+    """Domain entity tracking an asynchronous test generation request."""
+
+    id: str
+    owner_id: int
+    status: JobStatus = JobStatus.QUEUED
+    test_id: Optional[int] = None
+    num_questions: Optional[int] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (JobStatus.DONE, JobStatus.FAILED)
+
+    def mark_running(self) -> None:
+        self.status = JobStatus.RUNNING
+
+    def mark_done(self, *, test_id: int, num_questions: int) -> None:
+        self.status = JobStatus.DONE
+        self.test_id = test_id
+        self.num_questions = num_questions
+        self.error = None
+        self.finished_at = datetime.utcnow()
+
+    def mark_failed(self, error: str) -> None:
+        self.status = JobStatus.FAILED
+        self.error = error
+        self.finished_at = datetime.utcnow()
+
+
+__all__ = ["GenerationJob"]
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+
+@dataclass(slots=True)
+class GenerationRun:
+    """Telemetry of one test generation: where the time went and what it cost."""
+
+    id: Optional[int]
+    owner_id: Optional[int]
+    source_kind: str
+    status: str
+    test_id: Optional[int] = None
+    error_class: Optional[str] = None
+    model_name: Optional[str] = None
+    questions_requested: int = 0
+    questions_returned: int = 0
+    questions_saved: int = 0
+    reused_from_bank: int = 0
+    source_chars: int = 0
+    prompt_chars: int = 0
+    response_chars: int = 0
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    total_tokens: int = 0
+    llm_calls: int = 0
+    cost_usd: float = 0.0
+    source_ms: float = 0.0
+    prompt_ms: float = 0.0
+    llm_ms: float = 0.0
+    parse_ms: float = 0.0
+    store_ms: float = 0.0
+    total_ms: float = 0.0
+    created_at: Optional[datetime] = None
+
+
+__all__ = ["GenerationRun"]
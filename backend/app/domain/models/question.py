@@ -3,7 +3,9 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import List, Optional
 
-from .enums import QuestionDifficulty
+from .enums import QuestionDifficulty, QuestionType
+
+_TRUE_FALSE_CHOICES = {"prawda", "fałsz", "falsz", "true", "false", "tak", "nie"}
 
 
 @dataclass(slots=True)
@@ -27,6 +29,18 @@ class Question:
             self.choices = []
             self.correct_choices = []
 
+    @property
+    def kind(self) -> QuestionType:
+        """Best-effort question type inferred from the choices."""
+        if not self.is_closed:
+            return QuestionType.OPEN
+        normalized = {choice.strip().casefold() for choice in self.choices}
+        if len(self.choices) == 2 and normalized <= _TRUE_FALSE_CHOICES:
+            return QuestionType.TRUE_FALSE
+        if len(self.correct_choices) > 1:
+            return QuestionType.MULTI_CHOICE
+        return QuestionType.SINGLE_CHOICE
+
     def _validate_choices(self) -> None:
         if not self.choices:
             raise ValueError("Closed question must define choices")
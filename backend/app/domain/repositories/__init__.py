@@ -1,11 +1,15 @@
 from .file_repository import FileRepository
+from .generation_run_repository import GenerationRunRepository
 from .material_repository import MaterialRepository
+from .question_bank_repository import QuestionBankRepository
 from .test_repository import TestRepository
 from .user_repository import UserRepository
 
 __all__ = [
     "FileRepository",
+    "GenerationRunRepository",
     "MaterialRepository",
+    "QuestionBankRepository",
     "TestRepository",
     "UserRepository",
 ]
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List
+
+from app.domain.models import GenerationRun
+
+
+class GenerationRunRepository(ABC):
+    @abstractmethod
+    def add(self, run: GenerationRun) -> GenerationRun:
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_since(self, since: datetime, *, limit: int) -> List[GenerationRun]:
+        """Most recent runs created at or after ``since``, newest first."""
+        raise NotImplementedError
+
+
+__all__ = ["GenerationRunRepository"]
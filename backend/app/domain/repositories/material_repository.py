@@ -4,6 +4,7 @@ from abc import ABC, abstractmethod
 from typing import Iterable
 
 from app.domain.models import Material
+from app.domain.models.enums import ProcessingStatus
 
 
 class MaterialRepository(ABC):
@@ -15,10 +16,18 @@ class MaterialRepository(ABC):
     def get(self, material_id: int) -> Material | None:
         raise NotImplementedError
 
+    @abstractmethod
+    def get_by_file(self, file_id: int) -> Material | None:
+        raise NotImplementedError
+
     @abstractmethod
     def list_for_user(self, user_id: int) -> Iterable[Material]:
         raise NotImplementedError
 
+    @abstractmethod
+    def list_by_status(self, status: ProcessingStatus) -> Iterable[Material]:
+        raise NotImplementedError
+
     @abstractmethod
     def update(self, material: Material) -> Material:
         raise NotImplementedError
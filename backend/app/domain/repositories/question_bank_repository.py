@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Iterable, List
+
+from app.domain.models import Question
+
+
+class QuestionBankRepository(ABC):
+    """Generated questions kept per source checksum for reuse by later generations."""
+
+    @abstractmethod
+    def add_many(self, checksum: str, questions: Iterable[Question], *, used: bool = False) -> int:
+        """Store questions not yet banked for ``checksum``; returns how many were added."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_for_source(self, checksum: str, *, limit: int) -> List[Question]:
+        """Banked questions for ``checksum``, least used first; ids are bank entry ids."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def mark_used(self, entry_ids: Iterable[int]) -> None:
+        raise NotImplementedError
+
+
+__all__ = ["QuestionBankRepository"]
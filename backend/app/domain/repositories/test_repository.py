@@ -27,6 +27,11 @@ class TestRepository(ABC):
     def list_for_user(self, user_id: int) -> Iterable[Test]:
         raise NotImplementedError
 
+    @abstractmethod
+    def list_questions_for_user(self, user_id: int, *, limit: int) -> Iterable[Question]:
+        """Most recent ``limit`` questions across all of the user's tests."""
+        raise NotImplementedError
+
     @abstractmethod
     def remove(self, test_id: int) -> None:
         raise NotImplementedError
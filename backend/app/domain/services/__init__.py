@@ -1,10 +1,31 @@
 from .file_storage import FileStorage
-from .ocr_service import OCRService
-from .question_generator import QuestionGenerator
+from .job_queue import GenerationJobQueue, MaterialProcessingQueue
+from .ocr_service import OCRProgress, OCRService
+from .question_generator import (
+    AsyncQuestionGenerator,
+    GenerationEstimate,
+    GenerationEstimator,
+    LLMProviderError,
+    LLMUnavailableError,
+    QuestionGenerator,
+    StreamEvent,
+    StreamingQuestionGenerator,
+    agenerate_questions,
+)
 
 __all__ = [
+    "AsyncQuestionGenerator",
     "FileStorage",
+    "GenerationEstimate",
+    "GenerationEstimator",
+    "GenerationJobQueue",
+    "LLMProviderError",
+    "LLMUnavailableError",
+    "MaterialProcessingQueue",
+    "OCRProgress",
     "OCRService",
     "QuestionGenerator",
+    "StreamEvent",
+    "StreamingQuestionGenerator",
+    "agenerate_questions",
 ]
-
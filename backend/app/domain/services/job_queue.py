@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from typing import Optional, Protocol, Tuple
+
+from app.api.schemas.tests import TestGenerateRequest
+from app.domain.models import GenerationJob
+
+
+class GenerationJobQueue(Protocol):
+    def enqueue(self, *, owner_id: int, request: TestGenerateRequest) -> GenerationJob:
+        """Schedule a test generation and return the freshly queued job."""
+
+        ...
+
+    def get(self, job_id: str) -> Optional[GenerationJob]:
+        ...
+
+    def shutdown(self) -> None:
+        ...
+
+
+class MaterialProcessingQueue(Protocol):
+    def enqueue(self, material_id: int) -> None:
+        """Schedule text extraction for a material saved as pending."""
+
+        ...
+
+    async def await_update(self, material_id: int, timeout: float) -> bool:
+        """Wait until processing of the material finishes here, or ``timeout`` passes.
+
+        Returns ``False`` on timeout. Work done by another process is not
+        seen, so callers re-read the material either way.
+        """
+
+        ...
+
+    def report_progress(self, material_id: int, done: int, total: int) -> None:
+        """Record ``done`` of ``total`` pages extracted and wake ``await_update`` callers."""
+
+        ...
+
+    def progress(self, material_id: int) -> Optional[Tuple[int, int]]:
+        """Last ``(done, total)`` reported for a material still being processed here."""
+
+        ...
+
+    def shutdown(self) -> None:
+        ...
+
+
+__all__ = ["GenerationJobQueue", "MaterialProcessingQueue"]
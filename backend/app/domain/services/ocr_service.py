@@ -1,12 +1,21 @@
 from __future__ import annotations
 
-from typing import Protocol
+from typing import Callable, List, Optional, Protocol
+
+# Called as ``progress(pages_done, pages_total)`` while a multi-page document is OCRed.
+OCRProgress = Callable[[int, int], None]
 
 
 class OCRService(Protocol):
-    def extract_text(self, *, file_path: str) -> str:
+    def extract_text(
+        self,
+        *,
+        file_path: str,
+        progress: Optional[OCRProgress] = None,
+        failed_pages: Optional[List[int]] = None,
+    ) -> str:
+        """Text of the file; 1-based numbers of pages that could not be read go to ``failed_pages``."""
         ...
 
 
-__all__ = ["OCRService"]
-
+__all__ = ["OCRProgress", "OCRService"]
@@ -1,15 +1,108 @@
 from __future__ import annotations
 
-from typing import List, Protocol
+import asyncio
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Protocol, Tuple, Union
 
 from app.domain.models import Question
 from app.api.schemas.tests import GenerateParams
 
 
+class LLMProviderError(RuntimeError):
+    """A provider call failed; ``retryable`` marks transient failures worth retrying."""
+
+    def __init__(self, message: str, *, retryable: bool = False) -> None:
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class LLMUnavailableError(LLMProviderError):
+    """Raised without calling the provider while its circuit breaker is open."""
+
+    def __init__(self, message: str, *, retry_after: float) -> None:
+        super().__init__(message, retryable=False)
+        self.retry_after = retry_after
+
+
 class QuestionGenerator(Protocol):
-    def generate(self, *, source_text: str, params: GenerateParams) -> List[Question]:
+    """Generates ``(title, questions)`` matching ``params`` from ``source_text``.
+
+    When a ``surplus`` list is passed, valid questions produced beyond the
+    requested mix are appended to it instead of being discarded.
+    """
+
+    def generate(
+        self,
+        *,
+        source_text: str,
+        params: GenerateParams,
+        surplus: Optional[List[Question]] = None,
+    ) -> Tuple[Optional[str], List[Question]]:
+        ...
+
+
+class AsyncQuestionGenerator(Protocol):
+    async def agenerate(
+        self,
+        *,
+        source_text: str,
+        params: GenerateParams,
+        surplus: Optional[List[Question]] = None,
+    ) -> Tuple[Optional[str], List[Question]]:
+        ...
+
+
+async def agenerate_questions(
+    generator: QuestionGenerator,
+    *,
+    source_text: str,
+    params: GenerateParams,
+    surplus: Optional[List[Question]] = None,
+) -> Tuple[Optional[str], List[Question]]:
+    """Await ``agenerate`` when the generator has one, else run ``generate`` in a thread."""
+    agenerate = getattr(generator, "agenerate", None)
+    if agenerate is not None:
+        return await agenerate(source_text=source_text, params=params, surplus=surplus)
+    return await asyncio.to_thread(
+        generator.generate, source_text=source_text, params=params, surplus=surplus
+    )
+
+
+# ("title", str) or ("question", Question), in the order the provider produces them.
+StreamEvent = Tuple[str, Union[str, Question]]
+
+
+class StreamingQuestionGenerator(Protocol):
+    def stream(self, *, source_text: str, params: GenerateParams) -> Iterator[StreamEvent]:
+        ...
+
+
+@dataclass(frozen=True, slots=True)
+class GenerationEstimate:
+    """Dry-run size, cost and latency estimate for a generation request."""
+
+    source_tokens: int
+    prompt_tokens: int
+    output_tokens: int
+    trimmed: bool
+    estimated_cost_usd: float
+    estimated_latency_seconds: float
+
+
+class GenerationEstimator(Protocol):
+    def estimate(self, *, source_text: str, params: GenerateParams) -> GenerationEstimate:
         ...
 
 
-__all__ = ["QuestionGenerator"]
+__all__ = [
+    "AsyncQuestionGenerator",
+    "GenerationEstimate",
+    "GenerationEstimator",
+    "LLMProviderError",
+    "LLMUnavailableError",
+    "QuestionGenerator",
+    "StreamEvent",
+    "StreamingQuestionGenerator",
+    "agenerate_questions",
+]
 
@@ -1,8 +1,30 @@
-from .llm import GeminiQuestionGenerator
-from .ocr import DefaultOCRService
+from .llm import (
+    PROMPT_VERSION,
+    AsyncGeminiQuestionGenerator,
+    CachingQuestionGenerator,
+    ChunkedQuestionGenerator,
+    CircuitBreaker,
+    FairScheduledQuestionGenerator,
+    FairScheduler,
+    FakeQuestionGenerator,
+    GeminiQuestionGenerator,
+    ResilientQuestionGenerator,
+    RetryPolicy,
+)
+from .ocr import (
+    CachingOCRService,
+    DefaultOCRService,
+    HybridPdfExtractor,
+    ImagePreprocessor,
+    OCRWorkerPool,
+    PdfPageOCR,
+    PreprocessingConfig,
+)
 from .persistence.sqlmodel import (
     SqlModelFileRepository,
+    SqlModelGenerationRunRepository,
     SqlModelMaterialRepository,
+    SqlModelQuestionBankRepository,
     SqlModelTestRepository,
     SqlModelUserRepository,
 )
@@ -10,10 +32,28 @@ from .storage import LocalFileStorage
 from .exporting import compile_tex_to_pdf, render_test_to_tex, test_to_xml_bytes
 
 __all__ = [
+    "AsyncGeminiQuestionGenerator",
+    "CachingQuestionGenerator",
+    "ChunkedQuestionGenerator",
+    "CircuitBreaker",
+    "FairScheduledQuestionGenerator",
+    "FairScheduler",
+    "FakeQuestionGenerator",
     "GeminiQuestionGenerator",
+    "PROMPT_VERSION",
+    "ResilientQuestionGenerator",
+    "RetryPolicy",
+    "CachingOCRService",
     "DefaultOCRService",
+    "HybridPdfExtractor",
+    "ImagePreprocessor",
+    "OCRWorkerPool",
+    "PdfPageOCR",
+    "PreprocessingConfig",
     "SqlModelFileRepository",
+    "SqlModelGenerationRunRepository",
     "SqlModelMaterialRepository",
+    "SqlModelQuestionBankRepository",
     "SqlModelTestRepository",
     "SqlModelUserRepository",
     "LocalFileStorage",
@@ -0,0 +1,3 @@
+from .store import CacheStats, DiskCacheStore, TwoTierCache, make_cache_key
+
+__all__ = ["CacheStats", "DiskCacheStore", "TwoTierCache", "make_cache_key"]
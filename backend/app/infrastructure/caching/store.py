@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+from cachetools import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Stable sha256 key for JSON-serialisable parts."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DiskCacheStore:
+    """JSON-file cache with TTL and size-bounded eviction.
+
+    Entries are written atomically, so several worker processes can share the
+    same directory. Reads refresh the file mtime, which makes eviction
+    (oldest mtime first) behave like LRU.
+    """
+
+    def __init__(
+        self,
+        base_dir: Path | str,
+        *,
+        ttl_seconds: Optional[int] = None,
+        max_bytes: int = 256 * 1024 * 1024,
+    ) -> None:
+        self._base_dir = Path(base_dir)
+        self._base_dir.mkdir(parents=True, exist_ok=True)
+        self._ttl_seconds = ttl_seconds
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._approx_bytes: Optional[int] = None
+
+    def get(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            raw = path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+        except OSError as exc:
+            logger.warning("Cache read failed for %s: %s", path, exc)
+            return None
+
+        try:
+            entry = json.loads(raw)
+        except json.JSONDecodeError:
+            path.unlink(missing_ok=True)
+            return None
+
+        if self._is_expired(entry.get("stored_at", 0)):
+            path.unlink(missing_ok=True)
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry.get("value")
+
+    def set(self, key: str, value: Any) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = json.dumps(
+            {"stored_at": time.time(), "value": value},
+            ensure_ascii=False,
+        ).encode("utf-8")
+
+        try:
+            fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+            os.replace(tmp_name, path)
+        except OSError as exc:
+            logger.warning("Cache write failed for %s: %s", path, exc)
+            return
+
+        with self._lock:
+            if self._approx_bytes is None:
+                self._approx_bytes = self._scan_size()
+            else:
+                self._approx_bytes += len(data)
+            if self._approx_bytes > self._max_bytes:
+                self._evict()
+
+    def _path(self, key: str) -> Path:
+        return self._base_dir / key[:2] / f"{key}.json"
+
+    def _is_expired(self, stored_at: float) -> bool:
+        return bool(self._ttl_seconds) and time.time() - stored_at > self._ttl_seconds
+
+    def _entries(self):
+        for path in self._base_dir.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            yield path, stat
+
+    def _scan_size(self) -> int:
+        return sum(stat.st_size for _, stat in self._entries())
+
+    def _evict(self) -> None:
+        # Trim to 90% of the budget so eviction does not run on every write.
+        target = int(self._max_bytes * 0.9)
+        now = time.time()
+        entries = sorted(self._entries(), key=lambda item: item[1].st_mtime)
+        total = sum(stat.st_size for _, stat in entries)
+
+        for path, stat in entries:
+            expired = bool(self._ttl_seconds) and now - stat.st_mtime > self._ttl_seconds
+            if total <= target and not expired:
+                continue
+            path.unlink(missing_ok=True)
+            total -= stat.st_size
+
+        self._approx_bytes = total
+
+
+@dataclass(slots=True)
+class CacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hit_ratio, 4),
+        }
+
+
+class TwoTierCache:
+    """In-memory LRU in front of an optional persistent ``DiskCacheStore``."""
+
+    def __init__(self, *, memory_size: int = 256, disk: Optional[DiskCacheStore] = None) -> None:
+        self._memory: LRUCache = LRUCache(maxsize=memory_size)
+        self._disk = disk
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._stats.memory_hits += 1
+                return value
+
+        value = self._disk.get(key) if self._disk else None
+
+        with self._lock:
+            if value is None:
+                self._stats.misses += 1
+                return None
+            self._stats.disk_hits += 1
+            self._memory[key] = value
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._memory[key] = value
+        if self._disk:
+            self._disk.set(key, value)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats.as_dict(), "memory_entries": len(self._memory)}
+
+
+__all__ = ["CacheStats", "DiskCacheStore", "TwoTierCache", "make_cache_key"]
@@ -1,3 +1,3 @@
-from .text import extract_text_from_file
+from .text import extract_text_from_file, iter_text_from_file
 
-__all__ = ["extract_text_from_file"]
+__all__ = ["extract_text_from_file", "iter_text_from_file"]
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import codecs
+import logging
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Longest BOMs first: the UTF-32-LE BOM starts with the UTF-16-LE one.
+_BOMS: Tuple[Tuple[bytes, str], ...] = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+DEFAULT_SAMPLE_SIZE = 64 * 1024
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+def _is_utf8(sample: bytes, *, complete: bool) -> bool:
+    # An incremental decode tolerates a multi-byte character cut at the sample's end.
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=complete)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def _chardet(sample: bytes) -> Optional[str]:
+    try:
+        import chardet
+    except ImportError:
+        return None
+    encoding = chardet.detect(sample)["encoding"]
+    if not encoding:
+        return None
+    try:
+        return codecs.lookup(encoding).name
+    except LookupError:
+        return None
+
+
+def detect_encoding(sample: bytes, *, complete: bool = False) -> str:
+    """Encoding of a file judged from its first bytes.
+
+    A BOM decides outright; otherwise a sample that is valid UTF-8 is
+    taken as UTF-8 (which covers ASCII) and only the rest goes to chardet.
+    ``complete`` says the sample is the whole file.
+    """
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+    if _is_utf8(sample, complete=complete):
+        return "utf-8"
+    return _chardet(sample) or "utf-8"
+
+
+def iter_decoded(
+    path: Path,
+    *,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[str]:
+    """Decode a text file in chunks, detecting its encoding from the first ``sample_size`` bytes.
+
+    Memory stays at about one chunk whatever the file size. When the
+    sample looked like UTF-8 (an ASCII header, say) but a later chunk is
+    not, the encoding is detected again from that chunk and decoding
+    continues with it; everything decoded so far was ASCII-compatible.
+    Undecodable bytes are dropped.
+    """
+    with open(path, "rb") as handle:
+        sample = handle.read(sample_size)
+        encoding = detect_encoding(sample, complete=len(sample) < sample_size)
+        yield from _decode_chunks(handle, sample, encoding, chunk_size)
+
+
+def _decode_chunks(handle: BinaryIO, first: bytes, encoding: str, chunk_size: int) -> Iterator[str]:
+    # Strict while UTF-8 is only a guess from the sample, so a mismatch can be caught.
+    tentative = encoding == "utf-8"
+    decoder = codecs.getincrementaldecoder(encoding)(errors="strict" if tentative else "ignore")
+    chunk = first
+    while chunk:
+        if tentative:
+            pending = decoder.getstate()[0]
+            try:
+                text = decoder.decode(chunk)
+            except UnicodeDecodeError:
+                data = pending + chunk
+                encoding = _chardet(data[:DEFAULT_SAMPLE_SIZE]) or "utf-8"
+                logger.debug("%s is not UTF-8 past the sample, switching to %s", handle.name, encoding)
+                decoder = codecs.getincrementaldecoder(encoding)(errors="ignore")
+                tentative = False
+                text = decoder.decode(data)
+        else:
+            text = decoder.decode(chunk)
+        if text:
+            yield text
+        chunk = handle.read(chunk_size)
+    tail = _finish(decoder)
+    if tail:
+        yield tail
+
+
+def _finish(decoder: codecs.IncrementalDecoder) -> str:
+    try:
+        return decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        # A truncated UTF-8 character at the very end of the file.
+        return ""
+
+
+__all__ = ["DEFAULT_CHUNK_SIZE", "DEFAULT_SAMPLE_SIZE", "detect_encoding", "iter_decoded"]
@@ -1,44 +1,104 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterable, Iterator, List, Optional
 
+from .charset import iter_decoded
 
-def _read_txt(path: Path) -> str:
-    try:
-        import chardet
+# Alternative PDF reader yielding text page by page, e.g. one that OCRs
+# pages without a text layer.
+PdfReaderFn = Callable[[Path], Iterable[str]]
+
+_TEXT_EXTENSIONS = (".txt", ".md", ".csv")
 
-        data = path.read_bytes()
-        encoding = chardet.detect(data)["encoding"] or "utf-8"
-        return data.decode(encoding, errors="ignore")
-    except Exception:
-        return path.read_text(errors="ignore")
 
+def _read_txt(path: Path) -> Iterator[str]:
+    # Decoded chunks are bounded in size whether or not the file has line breaks.
+    return iter_decoded(path)
 
-def _read_pdf(path: Path) -> str:
+
+def _read_pdf(path: Path) -> Iterator[str]:
     from pypdf import PdfReader
 
+    # Pages are parsed on access, so stopping early skips the rest of the file.
     reader = PdfReader(str(path))
-    return "\n".join((page.extract_text() or "") for page in reader.pages)
+    for page in reader.pages:
+        yield page.extract_text() or ""
 
 
-def _read_docx(path: Path) -> str:
+def _read_docx(path: Path) -> Iterator[str]:
     import docx
 
     document = docx.Document(str(path))
-    return "\n".join(paragraph.text for paragraph in document.paragraphs)
+    for paragraph in document.paragraphs:
+        yield paragraph.text
+
+
+def _newline_joined(pieces: Iterable[str]) -> Iterator[str]:
+    """``pieces`` with a newline between each, as ``"\\n".join`` would place them."""
+    iterator = iter(pieces)
+    try:
+        for index, piece in enumerate(iterator):
+            if index:
+                yield "\n"
+            yield piece
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+
 
+def iter_text_from_file(
+    path: Path, mime: Optional[str], *, pdf_reader: Optional[PdfReaderFn] = None
+) -> Optional[Iterable[str]]:
+    """Text of ``path`` in pieces, or ``None`` for unsupported types.
 
-def extract_text_from_file(path: Path, mime: Optional[str]) -> Optional[str]:
+    Pieces are pages (PDF) or paragraphs (docx) separated by newline
+    pieces, or decoded chunks of a text file; concatenated, they give the
+    whole text. They are produced lazily: nothing past the last one pulled
+    is read.
+    """
     extension = path.suffix.lower()
+    if extension in _TEXT_EXTENSIONS:
+        return _read_txt(path)
+    if extension == ".pdf":
+        return _newline_joined((pdf_reader or _read_pdf)(path))
+    if extension == ".docx":
+        return _newline_joined(_read_docx(path))
+    # Image OCR (jpg/png) is not handled here – fallback to dedicated OCR service
+    return None
+
+
+def extract_text_from_file(
+    path: Path,
+    mime: Optional[str],
+    *,
+    pdf_reader: Optional[PdfReaderFn] = None,
+    max_chars: Optional[int] = None,
+) -> Optional[str]:
+    """Text of ``path`` (see ``iter_text_from_file``), cut to ``max_chars``.
+
+    Pieces stop being pulled once ``max_chars`` is reached, so extraction
+    time and memory follow the length kept rather than the file size.
+    """
+    pieces: List[str] = []
     try:
-        if extension in [".txt", ".md", ".csv"]:
-            return _read_txt(path)
-        if extension == ".pdf":
-            return _read_pdf(path)
-        if extension == ".docx":
-            return _read_docx(path)
-        # Image OCR (jpg/png) is not handled here – fallback to dedicated OCR service
-        return None
+        source = iter_text_from_file(path, mime, pdf_reader=pdf_reader)
+        if source is None:
+            return None
+        length = 0
+        iterator = iter(source)
+        try:
+            for piece in iterator:
+                pieces.append(piece)
+                length += len(piece)
+                if max_chars is not None and length >= max_chars:
+                    break
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
     except Exception:
         return None
+    text = "".join(pieces)
+    return text[:max_chars] if max_chars is not None else text
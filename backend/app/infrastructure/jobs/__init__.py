@@ -0,0 +1,7 @@
+from .in_process import InProcessJobQueue
+from .material_processing import InProcessMaterialQueue
+
+# CeleryJobQueue is imported lazily from ``.celery_queue`` so the broker client
+# is only configured when the celery backend is selected.
+
+__all__ = ["InProcessJobQueue", "InProcessMaterialQueue"]
@@ -0,0 +1,72 @@
+"""Celery application running generation jobs.
+
+Start a worker with ``celery -A app.infrastructure.jobs.celery_app worker``.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from celery import Celery
+from celery.exceptions import Ignore
+
+from app.api.schemas.tests import TestGenerateRequest
+from app.core.config import get_settings
+
+from .in_process import describe_job_error
+
+# Custom states keep owner metadata in ``AsyncResult.info`` for every phase.
+STATE_QUEUED = "QUEUED"
+STATE_RUNNING = "RUNNING"
+STATE_FAILED = "JOB_FAILED"
+
+_settings = get_settings()
+
+celery_app = Celery(
+    "inquizitor",
+    broker=_settings.CELERY_BROKER_URL,
+    backend=_settings.CELERY_RESULT_BACKEND,
+)
+celery_app.conf.update(
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],
+    result_expires=_settings.GENERATION_JOB_RETENTION_SECONDS,
+    worker_prefetch_multiplier=1,
+    task_acks_late=True,
+)
+
+
+@celery_app.task(bind=True, name="tests.generate")
+def generate_test_task(self, *, owner_id: int, request: dict, created_at: str) -> dict:
+    from app.bootstrap import get_container  # late import: worker builds its own container
+
+    meta = {"owner_id": owner_id, "created_at": created_at}
+    self.update_state(state=STATE_RUNNING, meta=meta)
+
+    try:
+        response = get_container().provide_test_service().generate_test_from_input(
+            request=TestGenerateRequest.model_validate(request),
+            owner_id=owner_id,
+            bulk=True,
+        )
+    except Exception as exc:  # noqa: BLE001 - reported through the job state
+        self.update_state(
+            state=STATE_FAILED,
+            meta={
+                **meta,
+                "error": describe_job_error(exc),
+                "finished_at": datetime.utcnow().isoformat(),
+            },
+        )
+        raise Ignore() from exc
+
+    return {
+        **meta,
+        "test_id": response.test_id,
+        "num_questions": response.num_questions,
+        "finished_at": datetime.utcnow().isoformat(),
+    }
+
+
+__all__ = ["celery_app", "generate_test_task", "STATE_QUEUED", "STATE_RUNNING", "STATE_FAILED"]
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from celery import states
+from celery.result import AsyncResult
+
+from app.api.schemas.tests import TestGenerateRequest
+from app.domain.models import GenerationJob, JobStatus
+from app.domain.services import GenerationJobQueue
+
+from .celery_app import STATE_FAILED, STATE_QUEUED, STATE_RUNNING, celery_app, generate_test_task
+
+_STATUS_BY_STATE = {
+    STATE_QUEUED: JobStatus.QUEUED,
+    states.PENDING: JobStatus.QUEUED,
+    states.RECEIVED: JobStatus.QUEUED,
+    STATE_RUNNING: JobStatus.RUNNING,
+    states.STARTED: JobStatus.RUNNING,
+    states.RETRY: JobStatus.RUNNING,
+    states.SUCCESS: JobStatus.DONE,
+    STATE_FAILED: JobStatus.FAILED,
+    states.FAILURE: JobStatus.FAILED,
+    states.REVOKED: JobStatus.FAILED,
+}
+
+
+def _parse_timestamp(value) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class CeleryJobQueue(GenerationJobQueue):
+    """Dispatches generation jobs to Celery workers through the configured broker."""
+
+    def enqueue(self, *, owner_id: int, request: TestGenerateRequest) -> GenerationJob:
+        job_id = uuid.uuid4().hex
+        created_at = datetime.utcnow()
+        meta = {"owner_id": owner_id, "created_at": created_at.isoformat()}
+
+        # Store ownership before dispatch so the job is visible while still queued.
+        celery_app.backend.store_result(job_id, meta, STATE_QUEUED)
+        generate_test_task.apply_async(
+            kwargs={
+                "owner_id": owner_id,
+                "request": request.model_dump(mode="json"),
+                "created_at": meta["created_at"],
+            },
+            task_id=job_id,
+        )
+
+        return GenerationJob(id=job_id, owner_id=owner_id, created_at=created_at)
+
+    def get(self, job_id: str) -> Optional[GenerationJob]:
+        result = AsyncResult(job_id, app=celery_app)
+        info = result.info if isinstance(result.info, dict) else None
+        if info is None or "owner_id" not in info:
+            return None
+
+        status = _STATUS_BY_STATE.get(result.state, JobStatus.QUEUED)
+        error = info.get("error")
+        if status is JobStatus.FAILED and not error:
+            error = "Generation job failed"
+
+        return GenerationJob(
+            id=job_id,
+            owner_id=int(info["owner_id"]),
+            status=status,
+            test_id=info.get("test_id"),
+            num_questions=info.get("num_questions"),
+            error=error,
+            created_at=_parse_timestamp(info.get("created_at")),
+            finished_at=_parse_timestamp(info.get("finished_at")),
+        )
+
+    def shutdown(self) -> None:
+        return None
+
+
+__all__ = ["CeleryJobQueue"]
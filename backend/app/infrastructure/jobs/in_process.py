@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+
+from app.api.schemas.tests import TestGenerateRequest, TestGenerateResponse
+from app.domain.models import GenerationJob
+from app.domain.services import GenerationJobQueue
+
+logger = logging.getLogger(__name__)
+
+JobRunner = Callable[[TestGenerateRequest, int], TestGenerateResponse]
+
+
+def describe_job_error(exc: Exception) -> str:
+    detail = getattr(exc, "detail", None)
+    return str(detail or exc) or exc.__class__.__name__
+
+
+class InProcessJobQueue(GenerationJobQueue):
+    """Runs generation jobs on a local thread pool; no broker required.
+
+    Job state lives in memory, so it is only visible to the process that
+    accepted the job. Finished jobs are dropped after ``retention``.
+    """
+
+    def __init__(
+        self,
+        runner: JobRunner,
+        *,
+        max_workers: int = 4,
+        retention: timedelta = timedelta(hours=1),
+    ) -> None:
+        self._runner = runner
+        self._retention = retention
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="generation-job",
+        )
+        self._jobs: Dict[str, GenerationJob] = {}
+        self._lock = threading.Lock()
+
+    def enqueue(self, *, owner_id: int, request: TestGenerateRequest) -> GenerationJob:
+        job = GenerationJob(
+            id=uuid.uuid4().hex,
+            owner_id=owner_id,
+            created_at=datetime.utcnow(),
+        )
+        with self._lock:
+            self._prune_finished()
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job.id, request)
+        return self._snapshot(job)
+
+    def get(self, job_id: str) -> Optional[GenerationJob]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._snapshot(job) if job else None
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job_id: str, request: TestGenerateRequest) -> None:
+        with self._lock:
+            job = self._jobs[job_id]
+            job.mark_running()
+            owner_id = job.owner_id
+
+        try:
+            response = self._runner(request, owner_id)
+        except Exception as exc:  # noqa: BLE001 - job failures are reported via status
+            logger.warning("Generation job %s failed: %s", job_id, exc)
+            with self._lock:
+                job.mark_failed(describe_job_error(exc))
+            return
+
+        with self._lock:
+            job.mark_done(test_id=response.test_id, num_questions=response.num_questions)
+
+    def _prune_finished(self) -> None:
+        threshold = datetime.utcnow() - self._retention
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.is_finished and job.finished_at and job.finished_at < threshold
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    @staticmethod
+    def _snapshot(job: GenerationJob) -> GenerationJob:
+        return GenerationJob(
+            id=job.id,
+            owner_id=job.owner_id,
+            status=job.status,
+            test_id=job.test_id,
+            num_questions=job.num_questions,
+            error=job.error,
+            created_at=job.created_at,
+            finished_at=job.finished_at,
+        )
+
+
+__all__ = ["InProcessJobQueue", "JobRunner", "describe_job_error"]
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.domain.services import MaterialProcessingQueue
+
+logger = logging.getLogger(__name__)
+
+MaterialRunner = Callable[[int], None]
+
+
+class InProcessMaterialQueue(MaterialProcessingQueue):
+    """Extracts uploaded materials on a local thread pool.
+
+    ``runner`` does the work and persists the outcome; the queue only
+    schedules it and wakes ``await_update`` callers when it returns, or
+    when the runner reports page progress through ``report_progress``.
+    Completion signals for the last ``remember`` materials are kept, so a
+    watcher that starts waiting just after processing finished returns at
+    once instead of sitting out its timeout.
+    """
+
+    def __init__(self, runner: MaterialRunner, *, max_workers: int = 2, remember: int = 1024) -> None:
+        self._runner = runner
+        self._remember = max(1, remember)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers),
+            thread_name_prefix="material-processing",
+        )
+        self._lock = threading.Lock()
+        self._done: "OrderedDict[int, threading.Event]" = OrderedDict()
+        self._queued: Dict[int, int] = {}
+        self._waiters: Dict[int, List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]]] = {}
+        self._progress: Dict[int, Tuple[int, int]] = {}
+
+    def enqueue(self, material_id: int) -> None:
+        with self._lock:
+            self._event(material_id).clear()
+            self._queued[material_id] = self._queued.get(material_id, 0) + 1
+        self._executor.submit(self._run, material_id)
+
+    async def await_update(self, material_id: int, timeout: float) -> bool:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        with self._lock:
+            event = self._done.get(material_id)
+            if event is not None:
+                if event.is_set():
+                    return True
+                self._waiters.setdefault(material_id, []).append((loop, future))
+        if event is None:
+            # Not processed by this process (or long forgotten): nothing to wait on.
+            await asyncio.sleep(timeout)
+            return False
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                waiters = self._waiters.get(material_id)
+                if waiters and (loop, future) in waiters:
+                    waiters.remove((loop, future))
+                    if not waiters:
+                        del self._waiters[material_id]
+
+    def report_progress(self, material_id: int, done: int, total: int) -> None:
+        with self._lock:
+            if material_id not in self._queued or self._progress.get(material_id) == (done, total):
+                return
+            self._progress[material_id] = (done, total)
+            self._wake(material_id)
+
+    def progress(self, material_id: int) -> Optional[Tuple[int, int]]:
+        with self._lock:
+            return self._progress.get(material_id)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, material_id: int) -> None:
+        try:
+            self._runner(material_id)
+        except Exception:  # noqa: BLE001 - the runner records failures on the material
+            logger.exception("Processing of material %s failed", material_id)
+        finally:
+            with self._lock:
+                remaining = self._queued.get(material_id, 1) - 1
+                if remaining > 0:
+                    self._queued[material_id] = remaining
+                else:
+                    self._queued.pop(material_id, None)
+                    self._progress.pop(material_id, None)
+                    self._event(material_id).set()
+                    self._wake(material_id)
+
+    def _event(self, material_id: int) -> threading.Event:
+        """Completion event of a material; expects ``self._lock`` to be held."""
+        event = self._done.get(material_id)
+        if event is None:
+            event = self._done[material_id] = threading.Event()
+            while len(self._done) > self._remember:
+                oldest, oldest_event = next(iter(self._done.items()))
+                if oldest in self._queued:
+                    break
+                del self._done[oldest]
+                oldest_event.set()
+                self._wake(oldest)
+        else:
+            self._done.move_to_end(material_id)
+        return event
+
+    def _wake(self, material_id: int) -> None:
+        """Resolve waiting ``await_update`` calls; expects ``self._lock`` to be held."""
+        for loop, future in self._waiters.pop(material_id, []):
+            loop.call_soon_threadsafe(_resolve, future)
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+__all__ = ["InProcessMaterialQueue", "MaterialRunner"]
@@ -1,4 +1,21 @@
-from .gemini import GeminiQuestionGenerator
-
-__all__ = ["GeminiQuestionGenerator"]
+from .cache import CachingQuestionGenerator
+from .chunking import ChunkedQuestionGenerator
+from .fake import FakeQuestionGenerator
+from .gemini import PROMPT_VERSION, GeminiQuestionGenerator
+from .gemini_async import AsyncGeminiQuestionGenerator
+from .resilience import CircuitBreaker, ResilientQuestionGenerator, RetryPolicy
+from .scheduling import FairScheduledQuestionGenerator, FairScheduler
 
+__all__ = [
+    "AsyncGeminiQuestionGenerator",
+    "CachingQuestionGenerator",
+    "ChunkedQuestionGenerator",
+    "CircuitBreaker",
+    "FairScheduledQuestionGenerator",
+    "FairScheduler",
+    "FakeQuestionGenerator",
+    "GeminiQuestionGenerator",
+    "PROMPT_VERSION",
+    "ResilientQuestionGenerator",
+    "RetryPolicy",
+]
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.api.schemas.tests import GenerateParams
+from app.domain.models import Question
+from app.domain.models.enums import QuestionDifficulty
+from app.domain.services import QuestionGenerator, agenerate_questions
+from app.infrastructure.caching import TwoTierCache, make_cache_key
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_source_text(text: str) -> str:
+    """Canonical form of source text: NFC, collapsed whitespace, no padding."""
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFC", text or "")).strip()
+
+
+def params_fingerprint(params: GenerateParams) -> Dict[str, Any]:
+    # Requests subclass GenerateParams; only the generation knobs belong in the key.
+    return params.model_dump(mode="json", include=set(GenerateParams.model_fields))
+
+
+def _question_to_payload(question: Question) -> Dict[str, Any]:
+    return {
+        "text": question.text,
+        "is_closed": question.is_closed,
+        "difficulty": question.difficulty.value,
+        "choices": list(question.choices or []),
+        "correct_choices": list(question.correct_choices or []),
+    }
+
+
+def _question_from_payload(payload: Dict[str, Any]) -> Question:
+    return Question(
+        id=None,
+        text=payload["text"],
+        is_closed=payload["is_closed"],
+        difficulty=QuestionDifficulty(payload["difficulty"]),
+        choices=list(payload.get("choices") or []),
+        correct_choices=list(payload.get("correct_choices") or []),
+    )
+
+
+class CachingQuestionGenerator(QuestionGenerator):
+    """Content-addressed cache in front of another ``QuestionGenerator``.
+
+    The key covers the normalised source text, generation params, model name
+    and prompt version, so any change to one of them produces a fresh call.
+    """
+
+    def __init__(
+        self,
+        inner: QuestionGenerator,
+        cache: TwoTierCache,
+        *,
+        model_name: str,
+        prompt_version: str,
+    ) -> None:
+        self._inner = inner
+        self._cache = cache
+        self._model_name = model_name
+        self._prompt_version = prompt_version
+
+    def cache_key(self, *, source_text: str, params: GenerateParams) -> str:
+        text_digest = hashlib.sha256(
+            normalize_source_text(source_text).encode("utf-8")
+        ).hexdigest()
+        return make_cache_key(
+            text_digest,
+            params_fingerprint(params),
+            self._model_name,
+            self._prompt_version,
+        )
+
+    def generate(
+        self,
+        *,
+        source_text: str,
+        params: GenerateParams,
+        surplus: Optional[List[Question]] = None,
+    ) -> Tuple[Optional[str], List[Question]]:
+        key = self.cache_key(source_text=source_text, params=params)
+        cached = self._lookup(key, surplus)
+        if cached is not None:
+            return cached
+
+        spare: List[Question] = []
+        title, questions = self._inner.generate(
+            source_text=source_text, params=params, surplus=spare
+        )
+        self._store(key, title, questions, spare)
+        if surplus is not None:
+            surplus.extend(spare)
+        return title, questions
+
+    async def agenerate(
+        self,
+        *,
+        source_text: str,
+        params: GenerateParams,
+        surplus: Optional[List[Question]] = None,
+    ) -> Tuple[Optional[str], List[Question]]:
+        key = self.cache_key(source_text=source_text, params=params)
+        cached = self._lookup(key, surplus)
+        if cached is not None:
+            return cached
+
+        spare: List[Question] = []
+        title, questions = await agenerate_questions(
+            self._inner, source_text=source_text, params=params, surplus=spare
+        )
+        self._store(key, title, questions, spare)
+        if surplus is not None:
+            surplus.extend(spare)
+        return title, questions
+
+    def _lookup(
+        self, key: str, surplus: Optional[List[Question]]
+    ) -> Optional[Tuple[Optional[str], List[Question]]]:
+        cached = self._cache.get(key)
+        if cached is None:
+            return None
+        try:
+            questions = [_question_from_payload(q) for q in cached["questions"]]
+            # Entries written before surplus was cached simply have none.
+            spare = [_question_from_payload(q) for q in cached.get("surplus") or []]
+        except (KeyError, TypeError, ValueError) as exc:
+            logger.warning("Discarding malformed LLM cache entry %s: %s", key, exc)
+            return None
+        if surplus is not None:
+            surplus.extend(spare)
+        return cached.get("title"), questions
+
+    def _store(
+        self,
+        key: str,
+        title: Optional[str],
+        questions: List[Question],
+        surplus: List[Question],
+    ) -> None:
+        if questions:
+            self._cache.set(
+                key,
+                {
+                    "title": title,
+                    "questions": [_question_to_payload(q) for q in questions],
+                    "surplus": [_question_to_payload(q) for q in surplus],
+                },
+            )
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+__all__ = ["CachingQuestionGenerator", "normalize_source_text", "params_fingerprint"]
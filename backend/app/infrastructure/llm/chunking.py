@@ -0,0 +1,366 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import heapq
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.api.schemas.tests import ClosedBreakdown, GenerateParams
+from app.domain.models import Question
+from app.domain.services import (
+    GenerationEstimate,
+    GenerationEstimator,
+    QuestionGenerator,
+    agenerate_questions,
+)
+
+from .token_budget import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+_PARAGRAPH_SPLIT_RE = re.compile(r"\n\s*\n")
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?…])\s+")
+_HEADING_RE = re.compile(
+    r"^(#{1,6}\s+\S|(rozdział|część|chapter|section)\b|\d+(\.\d+)*\.?\s+\S)",
+    re.IGNORECASE,
+)
+_QUESTION_KEY_RE = re.compile(r"[^\w]+", re.UNICODE)
+
+_CLOSED_TYPES = ("true_false", "single_choice", "multi_choice")
+_DIFFICULTIES = ("easy", "medium", "hard")
+
+
+def _is_heading(block: str) -> bool:
+    first_line = block.strip().split("\n", 1)[0].strip()
+    if not first_line or len(first_line) > 120:
+        return False
+    if _HEADING_RE.match(first_line):
+        return True
+    letters = [ch for ch in first_line if ch.isalpha()]
+    return len(letters) >= 3 and all(ch.isupper() for ch in letters)
+
+
+def _split_oversized(block: str, max_chars: int) -> List[str]:
+    pieces: List[str] = []
+    current = ""
+    for sentence in _SENTENCE_SPLIT_RE.split(block):
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > max_chars // 2 else max_chars
+            pieces.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}".strip()
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def _overlap_tail(text: str, overlap_chars: int) -> str:
+    if overlap_chars <= 0 or len(text) <= overlap_chars:
+        return ""
+    tail = text[-overlap_chars:]
+    # Start the overlap on a sentence (or at least word) boundary.
+    boundary = _SENTENCE_SPLIT_RE.search(tail)
+    if boundary:
+        return tail[boundary.end():]
+    space = tail.find(" ")
+    return tail[space + 1:] if space != -1 else tail
+
+
+def split_into_chunks(text: str, *, max_chars: int, overlap_chars: int = 0) -> List[str]:
+    """Split text into overlapping chunks, preferring to cut at section headings."""
+    text = (text or "").strip()
+    if len(text) <= max_chars:
+        return [text] if text else []
+
+    blocks: List[str] = []
+    for block in _PARAGRAPH_SPLIT_RE.split(text):
+        block = block.strip()
+        if not block:
+            continue
+        blocks.extend(_split_oversized(block, max_chars) if len(block) > max_chars else [block])
+
+    chunks: List[str] = []
+    current: List[str] = []
+    current_len = 0
+    for block in blocks:
+        starts_section = _is_heading(block) and current_len >= max_chars // 2
+        if current and (current_len + len(block) + 2 > max_chars or starts_section):
+            chunks.append("\n\n".join(current))
+            current, current_len = [], 0
+        current.append(block)
+        current_len += len(block) + 2
+    if current:
+        chunks.append("\n\n".join(current))
+
+    if overlap_chars <= 0:
+        return chunks
+
+    overlapped = [chunks[0]]
+    for previous, chunk in zip(chunks, chunks[1:]):
+        tail = _overlap_tail(previous, overlap_chars)
+        overlapped.append(f"{tail}\n\n{chunk}" if tail else chunk)
+    return overlapped
+
+
+def _largest_remainder(total: int, weights: Sequence[float]) -> List[int]:
+    weight_sum = sum(weights)
+    if total <= 0 or weight_sum <= 0:
+        return [0] * len(weights)
+    exact = [total * w / weight_sum for w in weights]
+    shares = [int(x) for x in exact]
+    order = sorted(range(len(weights)), key=lambda i: exact[i] - shares[i], reverse=True)
+    for i in order[: total - sum(shares)]:
+        shares[i] += 1
+    return shares
+
+
+def _interleave(counts: Dict[str, int]) -> List[str]:
+    """Labels ordered so every prefix mixes the kinds proportionally."""
+    positioned = [
+        ((i + 0.5) / count, label)
+        for label, count in counts.items()
+        for i in range(count)
+    ]
+    return [label for _, label in sorted(positioned)]
+
+
+def distribute_params(params: GenerateParams, weights: Sequence[float]) -> List[Optional[GenerateParams]]:
+    """Spread question counts over chunks proportionally to ``weights``.
+
+    Each chunk gets a valid ``GenerateParams`` (type and difficulty totals
+    match) or ``None`` when it receives no questions.
+    """
+    closed_counts = {name: getattr(params.closed, name) for name in _CLOSED_TYPES}
+    type_labels = _interleave({**closed_counts, "open": params.num_open})
+    difficulty_labels = _interleave({name: getattr(params, name) for name in _DIFFICULTIES})
+    shares = _largest_remainder(len(type_labels), weights)
+
+    result: List[Optional[GenerateParams]] = []
+    offset = 0
+    for share in shares:
+        if share == 0:
+            result.append(None)
+            continue
+        types = type_labels[offset: offset + share]
+        difficulties = difficulty_labels[offset: offset + share]
+        offset += share
+        result.append(
+            GenerateParams(
+                closed=ClosedBreakdown(**{name: types.count(name) for name in _CLOSED_TYPES}),
+                num_open=types.count("open"),
+                **{name: difficulties.count(name) for name in _DIFFICULTIES},
+            )
+        )
+    return result
+
+
+def _makespan(durations: Sequence[float], lanes: int) -> float:
+    """Wall time of running ``durations`` in order on ``lanes`` parallel workers."""
+    finish = [0.0] * min(max(1, lanes), max(1, len(durations)))
+    for duration in durations:
+        heapq.heapreplace(finish, finish[0] + duration)
+    return max(finish)
+
+
+def question_key(question: Question) -> str:
+    return _QUESTION_KEY_RE.sub(" ", question.text.casefold()).strip()
+
+
+def merge_questions(batches: Sequence[List[Question]]) -> List[Question]:
+    seen = set()
+    merged: List[Question] = []
+    for batch in batches:
+        for question in batch:
+            key = question_key(question)
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(question)
+    return merged
+
+
+class ChunkedQuestionGenerator(QuestionGenerator):
+    """Map-reduce generation for sources longer than a single prompt should hold.
+
+    Short sources go straight to ``inner``. Longer ones are split into
+    overlapping chunks, the requested counts are spread across them, chunks
+    are generated concurrently (at most ``max_concurrency`` at a time) and the
+    results are merged with duplicate questions removed. An optional
+    ``preselector`` shrinks the source first (e.g. to its most salient
+    passages), which usually leaves a single chunk.
+
+    ``estimate`` prices the same plan through ``estimator`` (normally the
+    provider ``inner`` ends in): one estimate per chunk prompt, summed.
+    """
+
+    def __init__(
+        self,
+        inner: QuestionGenerator,
+        *,
+        chunk_chars: int = 60_000,
+        overlap_chars: int = 1_000,
+        max_concurrency: int = 4,
+        preselector: Optional[Callable[[str], str]] = None,
+        estimator: Optional[GenerationEstimator] = None,
+    ) -> None:
+        self._inner = inner
+        self._estimator = estimator
+        self._preselector = preselector
+        self._chunk_chars = chunk_chars
+        self._overlap_chars = overlap_chars
+        self._max_concurrency = max(1, max_concurrency)
+
+    def generate(
+        self,
+        *,
+        source_text: str,
+        params: GenerateParams,
+        surplus: Optional[List[Question]] = None,
+    ) -> Tuple[Optional[str], List[Question]]:
+        source_text = self._preselect(source_text)
+        plan = self._plan(source_text, params)
+        if plan is None:
+            return self._inner.generate(source_text=source_text, params=params, surplus=surplus)
+        if not plan:
+            # No chunk was given any questions; match the async path instead of
+            # starting an executor with no workers.
+            return None, []
+
+        spares: List[List[Question]] = [[] for _ in plan]
+        with ThreadPoolExecutor(max_workers=min(self._max_concurrency, len(plan))) as executor:
+            # Each chunk runs in a copy of the caller's context (LLM scheduling, tracing).
+            futures = [
+                executor.submit(
+                    contextvars.copy_context().run,
+                    self._inner.generate,
+                    source_text=chunk,
+                    params=chunk_params,
+                    surplus=spare,
+                )
+                for (chunk, chunk_params), spare in zip(plan, spares)
+            ]
+
+        outcomes: List[object] = []
+        for future in futures:
+            try:
+                outcomes.append(future.result())
+            except Exception as exc:  # noqa: BLE001 - keep the chunks that succeeded
+                outcomes.append(exc)
+        return self._reduce(outcomes, spares, surplus)
+
+    async def agenerate(
+        self,
+        *,
+        source_text: str,
+        params: GenerateParams,
+        surplus: Optional[List[Question]] = None,
+    ) -> Tuple[Optional[str], List[Question]]:
+        source_text = await asyncio.to_thread(self._preselect, source_text)
+        plan = self._plan(source_text, params)
+        if plan is None:
+            return await agenerate_questions(
+                self._inner, source_text=source_text, params=params, surplus=surplus
+            )
+
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+        spares: List[List[Question]] = [[] for _ in plan]
+
+        async def run(chunk: str, chunk_params: GenerateParams, spare: List[Question]):
+            async with semaphore:
+                return await agenerate_questions(
+                    self._inner, source_text=chunk, params=chunk_params, surplus=spare
+                )
+
+        outcomes = await asyncio.gather(
+            *(run(chunk, chunk_params, spare) for (chunk, chunk_params), spare in zip(plan, spares)),
+            return_exceptions=True,
+        )
+        return self._reduce(list(outcomes), spares, surplus)
+
+    def estimate(self, *, source_text: str, params: GenerateParams) -> GenerationEstimate:
+        if self._estimator is None:
+            raise ValueError("Generation estimates are not available")
+        source_tokens = estimate_tokens(source_text)
+        selected = self._preselect(source_text)
+        plan = self._plan(selected, params) or [(selected, params)]
+        estimates = [
+            self._estimator.estimate(source_text=chunk, params=chunk_params)
+            for chunk, chunk_params in plan
+        ]
+        return GenerationEstimate(
+            source_tokens=source_tokens,
+            prompt_tokens=sum(e.prompt_tokens for e in estimates),
+            output_tokens=sum(e.output_tokens for e in estimates),
+            trimmed=selected != source_text or any(e.trimmed for e in estimates),
+            estimated_cost_usd=sum(e.estimated_cost_usd for e in estimates),
+            estimated_latency_seconds=_makespan(
+                [e.estimated_latency_seconds for e in estimates], self._max_concurrency
+            ),
+        )
+
+    def _preselect(self, source_text: str) -> str:
+        return self._preselector(source_text) if self._preselector is not None else source_text
+
+    def _plan(
+        self, source_text: str, params: GenerateParams
+    ) -> Optional[List[Tuple[str, GenerateParams]]]:
+        chunks = split_into_chunks(
+            source_text,
+            max_chars=self._chunk_chars,
+            overlap_chars=self._overlap_chars,
+        )
+        if len(chunks) <= 1:
+            return None
+
+        plan = [
+            (chunk, chunk_params)
+            for chunk, chunk_params in zip(chunks, distribute_params(params, [len(c) for c in chunks]))
+            if chunk_params is not None
+        ]
+        logger.debug("Planned %d chunks (%d with questions)", len(chunks), len(plan))
+        return plan
+
+    @staticmethod
+    def _reduce(
+        outcomes: List[object],
+        spares: List[List[Question]],
+        surplus: Optional[List[Question]],
+    ) -> Tuple[Optional[str], List[Question]]:
+        titles: List[str] = []
+        batches: List[List[Question]] = []
+        errors: List[BaseException] = []
+        for index, outcome in enumerate(outcomes):
+            if isinstance(outcome, BaseException):
+                logger.warning("Chunk %d generation failed: %s", index, outcome)
+                errors.append(outcome)
+                continue
+            title, questions = outcome
+            if title:
+                titles.append(title)
+            batches.append(questions)
+
+        if not batches and errors:
+            raise errors[0]
+
+        merged = merge_questions(batches)
+        if surplus is not None:
+            known = {question_key(q) for q in merged}
+            surplus.extend(q for q in merge_questions(spares) if question_key(q) not in known)
+        return (titles[0] if titles else None), merged
+
+
+__all__ = [
+    "ChunkedQuestionGenerator",
+    "distribute_params",
+    "merge_questions",
+    "question_key",
+    "split_into_chunks",
+]
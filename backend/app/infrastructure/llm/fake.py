@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.api.schemas.tests import GenerateParams
+from app.core.telemetry import STAGE_LLM, STAGE_PARSE, STAGE_PROMPT, trace_stage
+from app.domain.models import Question
+from app.domain.services import (
+    GenerationEstimate,
+    LLMProviderError,
+    QuestionGenerator,
+    StreamEvent,
+)
+
+from .cache import params_fingerprint
+from .gemini import _build_prompt, _record_usage
+from .parsing import IncrementalQuestionParser, parse_llm_response
+from .selection import QuestionQuota, select_questions
+from .token_budget import TokenBudget
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+_MALFORMED_MODES = ("truncated", "repairable", "garbage")
+
+
+@dataclass(frozen=True, slots=True)
+class _CallPlan:
+    latency: float
+    fail: bool
+    malformed: Optional[str]
+
+
+class FakeQuestionGenerator(QuestionGenerator):
+    """Offline stand-in for the Gemini provider, meant for load tests and local runs.
+
+    Questions are built from sentences of the source text and match the
+    requested type and difficulty breakdown. The content depends only on
+    ``seed``, the source text and the params, so repeated calls return the
+    same test. Per-call behaviour is drawn from a seeded RNG: latency is
+    log-normal around ``latency_median`` (``latency_sigma`` is the sigma of
+    the underlying normal), ``failure_rate`` of calls raise a retryable
+    ``LLMProviderError`` and ``malformed_rate`` of responses are truncated,
+    need JSON repair, or are not JSON at all. Responses go through the same
+    tolerant parser as real provider output.
+    """
+
+    def __init__(
+        self,
+        *,
+        latency_median: float = 1.0,
+        latency_sigma: float = 0.5,
+        failure_rate: float = 0.0,
+        malformed_rate: float = 0.0,
+        seed: int = 0,
+        stream_chunk_chars: int = 256,
+        token_budget: Optional[TokenBudget] = None,
+    ) -> None:
+        self._latency_median = max(0.0, latency_median)
+        self._latency_sigma = max(0.0, latency_sigma)
+        self._failure_rate = failure_rate
+        self._malformed_rate = malformed_rate
+        self._seed = seed
+        self._stream_chunk_chars = max(1, stream_chunk_chars)
+        self._token_budget = token_budget or TokenBudget()
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    @property
+    def model_name(self) -> str:
+        return "fake"
+
+    def estimate(self, *, source_text: str, params: GenerateParams) -> GenerationEstimate:
+        return self._token_budget.estimate(source_text, params, prompt_builder=_build_prompt)
+
+    def generate(
+        self,
+        *,
+        source_text: str,
+        params: GenerateParams,
+        surplus: Optional[List[Question]] = None,
+    ) -> Tuple[Optional[str], List[Question]]:
+        plan = self._plan()
+        with trace_stage(STAGE_LLM):
+            time.sleep(plan.latency)
+        return self._respond(plan, source_text, params, surplus)
+
+    async def agenerate(
+        self,
+        *,
+        source_text: str,
+        params: GenerateParams,
+        surplus: Optional[List[Question]] = None,
+    ) -> Tuple[Optional[str], List[Question]]:
+        plan = self._plan()
+        with trace_stage(STAGE_LLM):
+            await asyncio.sleep(plan.latency)
+        return self._respond(plan, source_text, params, surplus)
+
+    def stream(self, *, source_text: str, params: GenerateParams) -> Iterator[StreamEvent]:
+        plan = self._plan()
+        raw = self._render(source_text, params, plan.malformed)
+        chunks = [
+            raw[i : i + self._stream_chunk_chars]
+            for i in range(0, len(raw), self._stream_chunk_chars)
+        ]
+        with trace_stage(STAGE_LLM):
+            # A fifth of the latency before the first token, the rest spread over the chunks.
+            time.sleep(plan.latency * 0.2)
+            if plan.fail:
+                raise self._failure()
+
+            self._record(source_text, params, raw)
+            parser = IncrementalQuestionParser()
+            quota = QuestionQuota(params)
+            per_chunk = plan.latency * 0.8 / max(1, len(chunks))
+            for chunk in chunks:
+                time.sleep(per_chunk)
+                for kind, value in parser.feed(chunk):
+                    if kind == "title":
+                        yield "title", value
+                    elif quota.take(value):
+                        yield "question", value
+                if quota.full:
+                    return
+            parser.finish()
+
+    def _plan(self) -> _CallPlan:
+        with self._rng_lock:
+            latency = (
+                self._rng.lognormvariate(0.0, self._latency_sigma) * self._latency_median
+                if self._latency_median
+                else 0.0
+            )
+            fail = self._rng.random() < self._failure_rate
+            malformed = (
+                self._rng.choice(_MALFORMED_MODES)
+                if self._rng.random() < self._malformed_rate
+                else None
+            )
+        return _CallPlan(latency=latency, fail=fail, malformed=malformed)
+
+    def _respond(
+        self,
+        plan: _CallPlan,
+        source_text: str,
+        params: GenerateParams,
+        surplus: Optional[List[Question]],
+    ) -> Tuple[Optional[str], List[Question]]:
+        if plan.fail:
+            raise self._failure()
+        raw = self._render(source_text, params, plan.malformed)
+        self._record(source_text, params, raw)
+        with trace_stage(STAGE_PARSE):
+            title, questions = parse_llm_response(raw)
+        selected, spare = select_questions(questions, params, lenient=True)
+        if surplus is not None:
+            surplus.extend(spare)
+        return title, selected
+
+    def _record(self, source_text: str, params: GenerateParams, raw: str) -> None:
+        with trace_stage(STAGE_PROMPT):
+            prompt = _build_prompt(source_text, params)
+        _record_usage(self.model_name, self._token_budget, prompt, raw)
+
+    @staticmethod
+    def _failure() -> LLMProviderError:
+        return LLMProviderError("Fake provider failure (simulated)", retryable=True)
+
+    def _render(self, source_text: str, params: GenerateParams, malformed: Optional[str]) -> str:
+        raw = json.dumps(self._payload(source_text, params), ensure_ascii=False, indent=2)
+        if malformed == "truncated":
+            return raw[: max(1, int(len(raw) * 0.7))]
+        if malformed == "repairable":
+            return "```json\n" + raw.replace("\n  ]\n}", ",\n  ]\n}") + "\n```"
+        if malformed == "garbage":
+            return "Przepraszam, nie mogę teraz przygotować testu."
+        return raw
+
+    def _payload(self, source_text: str, params: GenerateParams) -> Dict[str, Any]:
+        digest = hashlib.sha256(
+            json.dumps(
+                [self._seed, source_text, params_fingerprint(params)],
+                ensure_ascii=False,
+                sort_keys=True,
+            ).encode("utf-8")
+        ).digest()
+        rng = random.Random(digest)
+        sentences = _sentences(source_text)
+
+        kinds = (
+            ["true_false"] * params.closed.true_false
+            + ["single_choice"] * params.closed.single_choice
+            + ["multi_choice"] * params.closed.multi_choice
+            + ["open"] * params.num_open
+        )
+        difficulties = [1] * params.easy + [2] * params.medium + [3] * params.hard
+        rng.shuffle(difficulties)
+
+        questions = [
+            _question(kind, difficulty, index, sentences, rng)
+            for index, (kind, difficulty) in enumerate(zip(kinds, difficulties), start=1)
+        ]
+        topic = " ".join(sentences[0].split()[:6]).rstrip(".,;:!?")
+        return {"title": f"Test: {topic}", "questions": questions}
+
+
+def _sentences(text: str) -> List[str]:
+    flat = " ".join(text.split())
+    sentences = [s.strip() for s in _SENTENCE_RE.split(flat) if len(s.strip()) > 20]
+    return sentences or [flat[:200] or "Brak treści materiału."]
+
+
+def _question(
+    kind: str, difficulty: int, index: int, sentences: List[str], rng: random.Random
+) -> Dict[str, Any]:
+    sentence = rng.choice(sentences).rstrip(".!?")
+    if kind == "open":
+        return {
+            "text": f"{index}. Wyjaśnij własnymi słowami: „{sentence}”.",
+            "is_closed": False,
+            "difficulty": difficulty,
+            "choices": None,
+            "correct_choices": None,
+        }
+    if kind == "true_false":
+        return {
+            "text": f"{index}. Prawda czy fałsz: {sentence}.",
+            "is_closed": True,
+            "difficulty": difficulty,
+            "choices": ["Prawda", "Fałsz"],
+            "correct_choices": [rng.choice(["Prawda", "Fałsz"])],
+        }
+
+    correct_count = 2 if kind == "multi_choice" else 1
+    choices = [f"Odpowiedź {letter} do pytania {index}" for letter in "ABCD"]
+    correct = sorted(rng.sample(range(len(choices)), correct_count))
+    return {
+        "text": f"{index}. Które odpowiedzi są zgodne z fragmentem: „{sentence}”?",
+        "is_closed": True,
+        "difficulty": difficulty,
+        "choices": choices,
+        # Mix index and string answers, as real responses do.
+        "correct_choices": correct if rng.random() < 0.5 else [choices[i] for i in correct],
+    }
+
+
+__all__ = ["FakeQuestionGenerator"]
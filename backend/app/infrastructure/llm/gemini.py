@@ -1,16 +1,85 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import logging
+from contextlib import nullcontext
 from functools import lru_cache
-from typing import List, Any
+from typing import Any, ContextManager, Generator, Iterator, List, Optional
 
+import httpx
 from google import genai
+from google.genai import errors as genai_errors
 
 from app.api.schemas.tests import GenerateParams
 from app.core.config import get_settings
+from app.core.telemetry import (
+    STAGE_LLM,
+    STAGE_PARSE,
+    STAGE_PROMPT,
+    record_llm_call,
+    trace_stage,
+)
 from app.domain.models import Question
-from app.domain.models.enums import QuestionDifficulty
-from app.domain.services import QuestionGenerator
+from app.domain.services import (
+    GenerationEstimate,
+    LLMProviderError,
+    QuestionGenerator,
+    StreamEvent,
+)
+
+from .chunking import question_key
+from .parsing import IncrementalQuestionParser, parse_llm_response
+from .selection import QuestionQuota, compute_shortfall, select_questions
+from .token_budget import TokenBudget, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+
+# Bump whenever _build_prompt changes so cached generations are invalidated.
+PROMPT_VERSION = "2025-11-2"
+
+
+# Rate limiting, request timeouts and server-side failures are worth retrying;
+# other 4xx responses (bad key, invalid request) will fail the same way again.
+_RETRYABLE_STATUS_CODES = frozenset({408, 429})
+
+
+def _provider_error(exc: Exception) -> LLMProviderError:
+    if isinstance(exc, genai_errors.APIError):
+        retryable = exc.code in _RETRYABLE_STATUS_CODES or exc.code >= 500
+    else:
+        retryable = isinstance(
+            exc, (httpx.TransportError, asyncio.TimeoutError, TimeoutError, ConnectionError)
+        )
+    detail = str(exc) or exc.__class__.__name__
+    return LLMProviderError(f"Gemini request failed: {detail}", retryable=retryable)
+
+
+def _record_usage(
+    model_name: str,
+    token_budget: TokenBudget,
+    prompt: str,
+    response_text: str,
+    usage: Any = None,
+) -> None:
+    """Report one call to the current generation trace.
+
+    Token counts come from the provider's ``usage_metadata`` when present and
+    fall back to the local estimate otherwise.
+    """
+    prompt_tokens = getattr(usage, "prompt_token_count", None) or estimate_tokens(prompt)
+    output_tokens = getattr(usage, "candidates_token_count", None) or estimate_tokens(
+        response_text
+    )
+    record_llm_call(
+        model_name=model_name,
+        prompt_chars=len(prompt),
+        response_chars=len(response_text),
+        prompt_tokens=prompt_tokens,
+        output_tokens=output_tokens,
+        total_tokens=getattr(usage, "total_token_count", None),
+        cost_usd=token_budget.cost_model.cost(prompt_tokens, output_tokens),
+    )
 
 
 def _build_prompt(text: str, params: GenerateParams) -> str:
@@ -57,10 +126,52 @@ def _build_prompt(text: str, params: GenerateParams) -> str:
     return "\n".join(parts)
 
 
+def _build_topup_prompt(text: str, params: GenerateParams, exclude: List[str]) -> str:
+    """Short follow-up prompt asking only for the questions still missing."""
+    c_tf = params.closed.true_false
+    c_sc = params.closed.single_choice
+    c_mc = params.closed.multi_choice
+
+    parts = [
+        "Pracujesz jako ekspert dydaktyczny języka polskiego.",
+        "Uzupełnij istniejący test o brakujące pytania na podstawie poniższego tekstu.",
+        "Każde pytanie i wszystkie odpowiedzi muszą być w języku polskim.",
+        f"Utwórz dokładnie: {c_tf} × prawda/fałsz, {c_sc} × jednokrotnego wyboru, "
+        f"{c_mc} × wielokrotnego wyboru oraz {params.num_open} pytań otwartych.",
+        f"Poziomy trudności: {params.easy} łatwych, {params.medium} średnich, {params.hard} trudnych.",
+        "- Pytania prawda/fałsz mają dokładnie dwie odpowiedzi: \"Prawda\" i \"Fałsz\".",
+        "- Pytania wielokrotnego wyboru mają co najmniej dwie poprawne odpowiedzi.",
+    ]
+    if exclude:
+        parts.append("Nie powtarzaj ani nie parafrazuj poniższych pytań, które już są w teście:")
+        parts.extend(f"- {question[:200]}" for question in exclude)
+    parts.extend(
+        [
+            "",
+            'Zwróć WYŁĄCZNIE poprawny JSON: {"questions": [{"text": "...", "is_closed": true | false, '
+            '"difficulty": 1 | 2 | 3, "choices": [...] lub null, "correct_choices": [...] lub null}]}',
+            "",
+            f"Tekst źródłowy:\n{text}\n",
+        ]
+    )
+    return "\n".join(parts)
+
 
 class GeminiQuestionGenerator(QuestionGenerator):
-    def __init__(self, model_name: str = "gemini-2.0-flash") -> None:
+    def __init__(
+        self,
+        model_name: str = "gemini-2.0-flash",
+        *,
+        max_topup_rounds: int = 1,
+        token_budget: Optional[TokenBudget] = None,
+    ) -> None:
         self._model_name = model_name
+        self._max_topup_rounds = max_topup_rounds
+        self._token_budget = token_budget or TokenBudget()
+
+    @property
+    def model_name(self) -> str:
+        return self._model_name
 
     @staticmethod
     @lru_cache()
@@ -68,131 +179,169 @@ class GeminiQuestionGenerator(QuestionGenerator):
         settings = get_settings()
         return genai.Client(api_key=settings.GEMINI_API_KEY)
 
+    def estimate(self, *, source_text: str, params: GenerateParams) -> GenerationEstimate:
+        return self._token_budget.estimate(source_text, params, prompt_builder=_build_prompt)
+
     def generate(
-        self, *, source_text: str, params: GenerateParams
+        self,
+        *,
+        source_text: str,
+        params: GenerateParams,
+        surplus: Optional[List[Question]] = None,
     ) -> tuple[str | None, List[Question]]:
-        prompt = _build_prompt(source_text, params)
-
-        try:
-            response = self._client().models.generate_content(
-                model=self._model_name,
-                contents=prompt,
-            )
-        except Exception as exc:  # noqa: BLE001
-            raise RuntimeError(f"Gemini request failed: {exc}") from exc
+        steps = self._generation_steps(self._fit_source(source_text, params), params, surplus)
+        reply = self._request(next(steps))
+        while True:
+            try:
+                prompt = steps.send(reply)
+            except StopIteration as done:
+                return done.value
+            reply = self._try_request(prompt)
+
+    def _generation_steps(
+        self,
+        source_text: str,
+        params: GenerateParams,
+        surplus: Optional[List[Question]],
+    ) -> Generator[str, tuple[str | None, List[Question]], tuple[str | None, List[Question]]]:
+        """The request and top-up rounds of one generation, without the I/O.
+
+        Yields each prompt to send and expects the parsed reply back, so the
+        sync and async paths drive the same selection logic. The first prompt
+        is the full request; later ones are top-ups, whose failures the
+        driver turns into an empty reply.
+        """
+        title, questions = yield _build_prompt(source_text, params)
+        selected, spare = select_questions(questions, params)
 
-        raw_output = (response.text or "").strip()
+        for _ in range(self._max_topup_rounds):
+            missing = compute_shortfall(selected, params)
+            if missing is None:
+                break
+            _, answer = yield self._topup_prompt(source_text, missing, selected)
+            extra = self._drop_known(answer, selected)
+            if not extra:
+                break
+            selected, spare = select_questions(selected + extra + spare, params)
 
-        if raw_output.startswith("```"):
-            first_nl = raw_output.find("\n")
-            if first_nl != -1:
-                raw_output = raw_output[first_nl + 1 :].strip()
-            if raw_output.endswith("```"):
-                raw_output = raw_output[:-3].strip()
+        selected, spare = select_questions(selected + spare, params, lenient=True)
+        if surplus is not None:
+            surplus.extend(spare)
+        return title, selected
 
-        if raw_output.lower().startswith("json"):
-            raw_output = raw_output[4:].lstrip(":").strip()
+    def stream(
+        self, *, source_text: str, params: GenerateParams
+    ) -> Iterator[StreamEvent]:
+        """Yield ``("title", str)`` and ``("question", Question)`` as Gemini streams them."""
+        source_text = self._fit_source(source_text, params)
+        with trace_stage(STAGE_PROMPT):
+            prompt = _build_prompt(source_text, params)
+        parser = IncrementalQuestionParser()
+        quota = QuestionQuota(params)
+        accepted: List[Question] = []
+        response_chars: List[str] = []
+        usage = None
 
         try:
-            parsed = json.loads(raw_output)
-        except json.JSONDecodeError as exc:
-            snippet = raw_output[:800]
-            raise ValueError(
-                "Nie udało się sparsować odpowiedzi LLM jako JSON. "
-                f"Fragment odpowiedzi:\n{snippet}"
-            ) from exc
-
-        title: str | None = None
-
-        if isinstance(parsed, dict):
-            title = parsed.get("title") or None
-            questions_payload = parsed.get("questions")
-            if not isinstance(questions_payload, list):
-                raise ValueError(
-                    "Odpowiedź LLM zawiera obiekt, ale pole 'questions' nie jest listą."
+            # Parsing is interleaved with the stream, so it counts as LLM time here.
+            with self._provider_slot(), trace_stage(STAGE_LLM):
+                response_stream = self._client().models.generate_content_stream(
+                    model=self._model_name,
+                    contents=prompt,
                 )
-        elif isinstance(parsed, list):
-            questions_payload = parsed
-        else:
-            raise ValueError(
-                "Nieoczekiwany format odpowiedzi LLM. "
-                "Spodziewano listy pytań lub obiektu z polem 'questions'."
+                for chunk in response_stream:
+                    usage = getattr(chunk, "usage_metadata", None) or usage
+                    response_chars.append(chunk.text or "")
+                    for kind, value in parser.feed(chunk.text or ""):
+                        if kind == "title":
+                            yield "title", value
+                        elif quota.take(value):
+                            accepted.append(value)
+                            yield "question", value
+                    if quota.full:
+                        break
+                parser.finish()
+        except Exception as exc:  # noqa: BLE001
+            raise _provider_error(exc) from exc
+        finally:
+            _record_usage(
+                self._model_name, self._token_budget, prompt, "".join(response_chars), usage
             )
 
-        questions: List[Question] = []
-
-        for item in questions_payload:
-            if not isinstance(item, dict):
-                raise ValueError("Element listy pytań nie jest obiektem JSON.")
-
-            missing = {"text", "is_closed", "difficulty"} - item.keys()
-            if missing:
-                raise ValueError(f"Brak wymaganych pól w pytaniu: {missing}")
-
-            text = str(item["text"])
-            is_closed = bool(item["is_closed"])
-            difficulty = QuestionDifficulty(int(item["difficulty"]))
-
-            raw_choices = item.get("choices") or []
-            raw_correct = item.get("correct_choices") or []
-
-            choices: List[str] = []
-            if is_closed and raw_choices:
-                if not isinstance(raw_choices, list):
-                    raise ValueError("Pole 'choices' musi być listą.")
-                choices = [str(c) for c in raw_choices]
-
-            correct_choices: List[str] = []
-            if is_closed and raw_correct:
-                if isinstance(raw_correct, list) and all(
-                    isinstance(c, int) for c in raw_correct
-                ):
-                    for idx in raw_correct:
-                        if 0 <= idx < len(choices):
-                            correct_choices.append(choices[idx])
-                else:
-                    if not isinstance(raw_correct, list):
-                        raise ValueError(
-                            "Pole 'correct_choices' musi być listą indeksów lub stringów."
-                        )
-                    correct_choices = [str(c) for c in raw_correct]
-
-            if not is_closed:
-                choices = []
-                correct_choices = []
-
-            questions.append(
-                Question(
-                    id=None,
-                    text=text,
-                    is_closed=is_closed,
-                    difficulty=difficulty,
-                    choices=choices or None,
-                    correct_choices=correct_choices or None,
-                )
+        missing = compute_shortfall(accepted, params) if self._max_topup_rounds else None
+        if missing is not None:
+            extra, _ = select_questions(
+                self._top_up(source_text, missing, accepted=accepted), missing
             )
-        need_closed = params.closed.true_false + params.closed.single_choice + params.closed.multi_choice
-        need_open = params.num_open
-
-        selected: List[Question] = []
-        got_closed = 0
-        got_open = 0
-
-        for q in questions:
-            if q.is_closed and got_closed < need_closed:
-                selected.append(q)
-                got_closed += 1
-            elif (not q.is_closed) and got_open < need_open:
-                selected.append(q)
-                got_open += 1
-            if got_closed >= need_closed and got_open >= need_open:
-                break
+            for question in extra:
+                yield "question", question
+
+    def _provider_slot(self) -> ContextManager[None]:
+        """Held around each provider call; subclasses use it to cap concurrency."""
+        return nullcontext()
+
+    def _fit_source(self, source_text: str, params: GenerateParams) -> str:
+        with trace_stage(STAGE_PROMPT):
+            fitted, _ = self._token_budget.fit(source_text, params, prompt_builder=_build_prompt)
+        return fitted
+
+    def _top_up(
+        self,
+        source_text: str,
+        missing: GenerateParams,
+        *,
+        accepted: List[Question],
+    ) -> List[Question]:
+        _, questions = self._try_request(self._topup_prompt(source_text, missing, accepted))
+        return self._drop_known(questions, accepted)
+
+    def _try_request(self, prompt: str) -> tuple[str | None, List[Question]]:
+        """Top-up request; failures keep what we already have."""
+        try:
+            return self._request(prompt)
+        except (RuntimeError, ValueError) as exc:
+            logger.warning("Top-up generation failed: %s", exc)
+            return None, []
+
+    @staticmethod
+    def _topup_prompt(source_text: str, missing: GenerateParams, accepted: List[Question]) -> str:
+        logger.info(
+            "Topping up %d missing questions (closed=%s, open=%d)",
+            missing.closed.total() + missing.num_open,
+            missing.closed.model_dump(),
+            missing.num_open,
+        )
+        return _build_topup_prompt(source_text, missing, [q.text for q in accepted])
+
+    @staticmethod
+    def _drop_known(questions: List[Question], accepted: List[Question]) -> List[Question]:
+        known = {question_key(q) for q in accepted}
+        return [q for q in questions if question_key(q) not in known]
 
-        questions = selected
+    def _request(self, prompt: str) -> tuple[str | None, List[Question]]:
+        try:
+            with self._provider_slot(), trace_stage(STAGE_LLM):
+                response = self._client().models.generate_content(
+                    model=self._model_name,
+                    contents=prompt,
+                )
+        except Exception as exc:  # noqa: BLE001
+            raise _provider_error(exc) from exc
 
-        return title, questions
+        return self._parse_response(prompt, response)
 
+    def _parse_response(self, prompt: str, response: Any) -> tuple[str | None, List[Question]]:
+        text = response.text or ""
+        _record_usage(
+            self._model_name,
+            self._token_budget,
+            prompt,
+            text,
+            getattr(response, "usage_metadata", None),
+        )
+        with trace_stage(STAGE_PARSE):
+            return parse_llm_response(text)
 
 
-__all__ = ["GeminiQuestionGenerator"]
+__all__ = ["GeminiQuestionGenerator", "PROMPT_VERSION"]
 
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from typing import ContextManager, List, Optional
+
+import httpx
+from google import genai
+from google.genai import types
+
+from app.api.schemas.tests import GenerateParams
+from app.core.config import get_settings
+from app.core.telemetry import STAGE_LLM, trace_stage
+from app.domain.models import Question
+from app.domain.services import AsyncQuestionGenerator
+
+from .gemini import GeminiQuestionGenerator, _provider_error
+from .scheduling import ConcurrencyLimiter
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncGeminiQuestionGenerator(GeminiQuestionGenerator, AsyncQuestionGenerator):
+    """Gemini generator with a native asyncio path.
+
+    ``agenerate`` awaits the provider's async client, so an event loop can keep
+    many generations in flight without a thread each. One
+    ``ConcurrencyLimiter`` caps provider calls across the async path and the
+    inherited sync ``generate``/``stream`` (the container holds a single
+    instance), one client keeps its HTTP connections alive between calls, and
+    each async call is bounded by ``request_timeout``.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "gemini-2.0-flash",
+        *,
+        max_concurrency: int = 64,
+        request_timeout: float = 120.0,
+        **kwargs,
+    ) -> None:
+        super().__init__(model_name, **kwargs)
+        self._max_concurrency = max_concurrency
+        self._request_timeout = request_timeout
+        self._limiter = ConcurrencyLimiter(max_concurrency)
+        self._client_lock = threading.Lock()
+        self._shared_client: Optional[genai.Client] = None
+
+    def _client(self) -> genai.Client:
+        if self._shared_client is None:
+            with self._client_lock:
+                if self._shared_client is None:
+                    self._shared_client = self._build_client()
+        return self._shared_client
+
+    def _build_client(self) -> genai.Client:
+        limits = httpx.Limits(
+            max_connections=self._max_concurrency,
+            max_keepalive_connections=self._max_concurrency,
+            keepalive_expiry=60.0,
+        )
+        return genai.Client(
+            api_key=get_settings().GEMINI_API_KEY,
+            http_options=types.HttpOptions(
+                timeout=int(self._request_timeout * 1000),
+                async_client_args={"limits": limits},
+            ),
+        )
+
+    def _provider_slot(self) -> ContextManager[None]:
+        return self._limiter.slot()
+
+    async def agenerate(
+        self,
+        *,
+        source_text: str,
+        params: GenerateParams,
+        surplus: Optional[List[Question]] = None,
+    ) -> tuple[str | None, List[Question]]:
+        # Token counting over a large source is CPU-bound; keep it off the loop.
+        source_text = await asyncio.to_thread(self._fit_source, source_text, params)
+        steps = self._generation_steps(source_text, params, surplus)
+        reply = await self._arequest(next(steps))
+        while True:
+            try:
+                prompt = steps.send(reply)
+            except StopIteration as done:
+                return done.value
+            reply = await self._atry_request(prompt)
+
+    async def _atry_request(self, prompt: str) -> tuple[str | None, List[Question]]:
+        try:
+            return await self._arequest(prompt)
+        except (RuntimeError, ValueError) as exc:
+            logger.warning("Top-up generation failed: %s", exc)
+            return None, []
+
+    async def _arequest(self, prompt: str) -> tuple[str | None, List[Question]]:
+        await self._limiter.acquire()
+        try:
+            with trace_stage(STAGE_LLM):
+                response = await asyncio.wait_for(
+                    self._client().aio.models.generate_content(
+                        model=self._model_name,
+                        contents=prompt,
+                    ),
+                    timeout=self._request_timeout,
+                )
+        except Exception as exc:  # noqa: BLE001
+            raise _provider_error(exc) from exc
+        finally:
+            self._limiter.release()
+
+        return self._parse_response(prompt, response)
+
+
+__all__ = ["AsyncGeminiQuestionGenerator"]
@@ -0,0 +1,357 @@
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Iterable, List, Optional, Tuple
+
+from app.domain.models import Question
+from app.domain.models.enums import QuestionDifficulty
+
+logger = logging.getLogger(__name__)
+
+ParserEvent = Tuple[str, Any]
+
+_SNIPPET_CHARS = 200
+
+
+@dataclass(slots=True)
+class ParseRejection:
+    """A question object the parser had to drop, with the reason why."""
+
+    index: int
+    reason: str
+    snippet: str = ""
+
+
+@dataclass(slots=True)
+class ParseResult:
+    title: Optional[str] = None
+    questions: List[Question] = field(default_factory=list)
+    rejections: List[ParseRejection] = field(default_factory=list)
+    found_questions: bool = False
+    truncated: bool = False
+
+
+def repair_json_fragment(raw: str) -> str:
+    """Drop ``//`` comments and trailing commas that sit outside string literals."""
+    out: List[str] = []
+    in_string = False
+    escape = False
+    i = 0
+    length = len(raw)
+
+    while i < length:
+        char = raw[i]
+        if in_string:
+            out.append(char)
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+            i += 1
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char == "/" and raw.startswith("//", i):
+            newline = raw.find("\n", i)
+            i = length if newline == -1 else newline
+            continue
+        elif char in "}]":
+            # Remove a dangling comma (and whitespace) before the closing bracket.
+            j = len(out) - 1
+            while j >= 0 and out[j].isspace():
+                j -= 1
+            if j >= 0 and out[j] == ",":
+                del out[j]
+        out.append(char)
+        i += 1
+
+    return "".join(out)
+
+
+def _decode_object(raw: str) -> Any:
+    try:
+        return json.loads(raw, strict=False)
+    except json.JSONDecodeError:
+        return json.loads(repair_json_fragment(raw), strict=False)
+
+
+def question_from_payload(item: Any) -> Question:
+    """Validate a single LLM question object into a domain ``Question``."""
+    if not isinstance(item, dict):
+        raise ValueError("Element listy pytań nie jest obiektem JSON.")
+
+    missing = {"text", "is_closed", "difficulty"} - item.keys()
+    if missing:
+        raise ValueError(f"Brak wymaganych pól w pytaniu: {missing}")
+
+    text = str(item["text"])
+    is_closed = bool(item["is_closed"])
+    difficulty = QuestionDifficulty(int(item["difficulty"]))
+
+    raw_choices = item.get("choices") or []
+    raw_correct = item.get("correct_choices") or []
+
+    choices: List[str] = []
+    if is_closed and raw_choices:
+        if not isinstance(raw_choices, list):
+            raise ValueError("Pole 'choices' musi być listą.")
+        choices = [str(c) for c in raw_choices]
+
+    correct_choices: List[str] = []
+    if is_closed and raw_correct:
+        if isinstance(raw_correct, list) and all(
+            isinstance(c, int) for c in raw_correct
+        ):
+            for idx in raw_correct:
+                if 0 <= idx < len(choices):
+                    correct_choices.append(choices[idx])
+        else:
+            if not isinstance(raw_correct, list):
+                raise ValueError(
+                    "Pole 'correct_choices' musi być listą indeksów lub stringów."
+                )
+            correct_choices = [str(c) for c in raw_correct]
+
+    if not is_closed:
+        choices = []
+        correct_choices = []
+
+    return Question(
+        id=None,
+        text=text,
+        is_closed=is_closed,
+        difficulty=difficulty,
+        choices=choices or None,
+        correct_choices=correct_choices or None,
+    )
+
+
+class IncrementalQuestionParser:
+    """Character-level scanner that emits questions as soon as their object closes.
+
+    Accepts either ``{"title": ..., "questions": [...]}`` or a bare list of
+    questions. Anything before the first ``{``/``[`` (code fences, a
+    ``json`` prefix, prose) is skipped. ``feed`` returns events of the form
+    ``("title", str)`` and ``("question", Question)``; objects that cannot be
+    repaired or validated are recorded in ``rejections`` instead of failing
+    the whole response. Call ``finish`` once the stream ends to detect
+    truncated output.
+    """
+
+    def __init__(self) -> None:
+        self.title: Optional[str] = None
+        self.rejections: List[ParseRejection] = []
+        self.found_questions = False
+        self.truncated = False
+        self._item_index = 0
+        self._stack: List[str] = []
+        self._started = False
+        self._closed = False
+        self._in_string = False
+        self._escape = False
+        self._expect_key = False
+        self._current_key: Optional[str] = None
+        self._root_string: Optional[List[str]] = None
+        self._questions_depth: Optional[int] = None
+        self._item: Optional[List[str]] = None
+
+    @property
+    def finished(self) -> bool:
+        return self._closed
+
+    def finish(self) -> List[ParserEvent]:
+        if self._item is not None:
+            self._reject("Obiekt pytania został ucięty (niekompletna odpowiedź).", "".join(self._item))
+            self._item = None
+        self.truncated = self._started and not self._closed
+        return []
+
+    def feed(self, chunk: str) -> List[ParserEvent]:
+        events: List[ParserEvent] = []
+        for char in chunk:
+            self._consume(char, events)
+        return events
+
+    def _consume(self, char: str, events: List[ParserEvent]) -> None:
+        if self._item is not None:
+            self._item.append(char)
+
+        if self._in_string:
+            self._consume_string(char, events)
+            return
+
+        if self._closed:
+            return
+
+        if not self._started:
+            if char == "{":
+                self._started = True
+                self._stack.append(char)
+                self._expect_key = True
+            elif char == "[":
+                self._started = True
+                self._stack.append(char)
+                self._questions_depth = 1
+                self.found_questions = True
+            return
+
+        if char == '"':
+            self._in_string = True
+            if self._at_root_object():
+                self._root_string = []
+            return
+
+        if char in "{[":
+            if self._at_root_object() and char == "[" and self._current_key == "questions":
+                self._stack.append(char)
+                self._questions_depth = len(self._stack)
+                self.found_questions = True
+                return
+            if char == "{" and self._item is None and self._in_questions_array():
+                self._item = [char]
+            self._stack.append(char)
+            return
+
+        if char in "}]":
+            if self._stack:
+                self._stack.pop()
+            if self._item is not None and char == "}" and self._in_questions_array():
+                self._emit_item("".join(self._item), events)
+                self._item = None
+            if self._questions_depth is not None and len(self._stack) < self._questions_depth:
+                self._questions_depth = None
+            if not self._stack:
+                self._closed = True
+            return
+
+        if self._at_root_object():
+            if char == ":":
+                self._expect_key = False
+            elif char == ",":
+                self._expect_key = True
+
+    def _consume_string(self, char: str, events: List[ParserEvent]) -> None:
+        if self._escape:
+            self._escape = False
+        elif char == "\\":
+            self._escape = True
+        elif char == '"':
+            self._in_string = False
+            if self._root_string is not None:
+                self._on_root_string("".join(self._root_string), events)
+                self._root_string = None
+            return
+
+        if self._root_string is not None:
+            self._root_string.append(char)
+
+    def _on_root_string(self, raw: str, events: List[ParserEvent]) -> None:
+        try:
+            value = json.loads(f'"{raw}"')
+        except json.JSONDecodeError:
+            value = raw
+        if self._expect_key:
+            self._current_key = value
+        elif self._current_key == "title" and value:
+            self.title = value
+            events.append(("title", value))
+
+    def _emit_item(self, raw: str, events: List[ParserEvent]) -> None:
+        try:
+            payload = _decode_object(raw)
+        except json.JSONDecodeError as exc:
+            self._reject(f"Niepoprawny JSON: {exc.msg}", raw)
+            return
+
+        try:
+            question = question_from_payload(payload)
+        except (ValueError, TypeError, KeyError) as exc:
+            self._reject(str(exc), raw)
+            return
+
+        self._item_index += 1
+        events.append(("question", question))
+
+    def _reject(self, reason: str, raw: str) -> None:
+        rejection = ParseRejection(
+            index=self._item_index,
+            reason=reason,
+            snippet=raw[:_SNIPPET_CHARS],
+        )
+        self._item_index += 1
+        self.rejections.append(rejection)
+        logger.warning("Rejected LLM question #%d: %s", rejection.index, reason)
+
+    def _at_root_object(self) -> bool:
+        return len(self._stack) == 1 and self._stack[0] == "{"
+
+    def _in_questions_array(self) -> bool:
+        return (
+            self._questions_depth is not None
+            and len(self._stack) == self._questions_depth
+            and self._stack[-1] == "["
+        )
+
+
+def parse_llm_output(chunks: Iterable[str] | str) -> ParseResult:
+    """Parse a complete (or truncated) LLM response, keeping every valid question."""
+    if isinstance(chunks, str):
+        chunks = (chunks,)
+
+    parser = IncrementalQuestionParser()
+    events: List[ParserEvent] = []
+    for chunk in chunks:
+        events.extend(parser.feed(chunk))
+    events.extend(parser.finish())
+
+    return ParseResult(
+        title=parser.title,
+        questions=[value for kind, value in events if kind == "question"],
+        rejections=parser.rejections,
+        found_questions=parser.found_questions,
+        truncated=parser.truncated,
+    )
+
+
+def parse_llm_response(raw_output: str) -> Tuple[Optional[str], List[Question]]:
+    """Title and valid questions of a complete response; raises when none survive."""
+    result = parse_llm_output(raw_output)
+
+    if not result.questions:
+        if result.rejections:
+            reasons = "; ".join(
+                f"#{r.index}: {r.reason}" for r in result.rejections[:5]
+            )
+            raise ValueError(f"Żadne pytanie z odpowiedzi LLM nie było poprawne ({reasons}).")
+        if not result.found_questions:
+            snippet = raw_output.strip()[:800]
+            raise ValueError(
+                "Nie udało się sparsować odpowiedzi LLM jako JSON. "
+                f"Fragment odpowiedzi:\n{snippet}"
+            )
+    elif result.rejections or result.truncated:
+        logger.warning(
+            "Kept %d LLM questions, rejected %d (truncated=%s)",
+            len(result.questions),
+            len(result.rejections),
+            result.truncated,
+        )
+
+    return result.title, result.questions
+
+
+__all__ = [
+    "IncrementalQuestionParser",
+    "ParseRejection",
+    "ParseResult",
+    "ParserEvent",
+    "parse_llm_output",
+    "parse_llm_response",
+    "question_from_payload",
+    "repair_json_fragment",
+]
@@ -0,0 +1,361 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Deque, Iterator, List, Optional, Tuple
+
+from app.api.schemas.tests import GenerateParams
+from app.domain.models import Question
+from app.domain.services import (
+    LLMProviderError,
+    LLMUnavailableError,
+    QuestionGenerator,
+    StreamEvent,
+    agenerate_questions,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+@dataclass(frozen=True, slots=True)
+class CircuitBreakerStats:
+    name: str
+    state: CircuitState
+    trips: int
+    rejected_calls: int
+    total_calls: int
+    total_failures: int
+    window_calls: int
+    window_failures: int
+    retry_after_seconds: float
+
+
+class CircuitBreaker:
+    """Error-rate circuit breaker over a sliding time window.
+
+    Closed: calls pass and their outcomes are recorded; once at least
+    ``minimum_calls`` fall inside ``window_seconds`` and the failure share
+    reaches ``failure_rate_threshold`` the breaker opens. Open: calls are
+    rejected with ``LLMUnavailableError`` for ``open_seconds``. Half-open: up
+    to ``half_open_max_calls`` probes go through; that many successes close
+    the breaker, a single failure opens it again.
+
+    ``acquire`` returns a generation token that must be passed back to
+    ``record_success``/``record_failure``; outcomes of calls admitted before
+    the last state change are counted but do not move the state.
+    """
+
+    def __init__(
+        self,
+        name: str = "llm",
+        *,
+        failure_rate_threshold: float = 0.5,
+        minimum_calls: int = 10,
+        window_seconds: float = 60.0,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 2,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._name = name
+        self._failure_rate_threshold = failure_rate_threshold
+        self._minimum_calls = max(1, minimum_calls)
+        self._window_seconds = window_seconds
+        self._open_seconds = open_seconds
+        self._half_open_max_calls = max(1, half_open_max_calls)
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._state = CircuitState.CLOSED
+        self._generation = 0
+        self._opened_at = 0.0
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+
+        self._trips = 0
+        self._rejected_calls = 0
+        self._total_calls = 0
+        self._total_failures = 0
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            self._advance()
+            return self._state
+
+    def acquire(self) -> int:
+        with self._lock:
+            self._advance()
+            if self._state is CircuitState.OPEN or (
+                self._state is CircuitState.HALF_OPEN
+                and self._probes_in_flight >= self._half_open_max_calls
+            ):
+                self._rejected_calls += 1
+                retry_after = self._retry_after()
+                raise LLMUnavailableError(
+                    f"LLM provider unavailable (circuit {self._name} is {self._state.value}), "
+                    f"retry in {retry_after:.0f}s",
+                    retry_after=retry_after,
+                )
+            if self._state is CircuitState.HALF_OPEN:
+                self._probes_in_flight += 1
+            self._total_calls += 1
+            return self._generation
+
+    def record_success(self, generation: int) -> None:
+        with self._lock:
+            if generation != self._generation:
+                return
+            if self._state is CircuitState.HALF_OPEN:
+                self._probes_in_flight -= 1
+                self._probe_successes += 1
+                if self._probe_successes >= self._half_open_max_calls:
+                    logger.info("Circuit %s closed after successful probes", self._name)
+                    self._transition(CircuitState.CLOSED)
+                return
+            self._record_outcome(failed=False)
+
+    def record_failure(self, generation: int) -> None:
+        with self._lock:
+            self._total_failures += 1
+            if generation != self._generation:
+                return
+            if self._state is CircuitState.HALF_OPEN:
+                logger.warning("Circuit %s probe failed, reopening", self._name)
+                self._trip()
+                return
+            self._record_outcome(failed=True)
+            calls = len(self._outcomes)
+            failures = sum(1 for _, failed in self._outcomes if failed)
+            if calls >= self._minimum_calls and failures / calls >= self._failure_rate_threshold:
+                logger.warning(
+                    "Circuit %s opened: %d/%d calls failed in the last %.0fs",
+                    self._name,
+                    failures,
+                    calls,
+                    self._window_seconds,
+                )
+                self._trip()
+
+    def stats(self) -> CircuitBreakerStats:
+        with self._lock:
+            self._advance()
+            self._evict(self._clock())
+            return CircuitBreakerStats(
+                name=self._name,
+                state=self._state,
+                trips=self._trips,
+                rejected_calls=self._rejected_calls,
+                total_calls=self._total_calls,
+                total_failures=self._total_failures,
+                window_calls=len(self._outcomes),
+                window_failures=sum(1 for _, failed in self._outcomes if failed),
+                retry_after_seconds=self._retry_after(),
+            )
+
+    # The helpers below expect ``self._lock`` to be held.
+
+    def _advance(self) -> None:
+        if (
+            self._state is CircuitState.OPEN
+            and self._clock() - self._opened_at >= self._open_seconds
+        ):
+            self._transition(CircuitState.HALF_OPEN)
+
+    def _trip(self) -> None:
+        self._trips += 1
+        self._opened_at = self._clock()
+        self._transition(CircuitState.OPEN)
+
+    def _transition(self, state: CircuitState) -> None:
+        self._state = state
+        self._generation += 1
+        self._outcomes.clear()
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+
+    def _record_outcome(self, *, failed: bool) -> None:
+        now = self._clock()
+        self._outcomes.append((now, failed))
+        self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        cutoff = now - self._window_seconds
+        while self._outcomes and self._outcomes[0][0] < cutoff:
+            self._outcomes.popleft()
+
+    def _retry_after(self) -> float:
+        if self._state is not CircuitState.OPEN:
+            return 0.0
+        return max(0.0, self._open_seconds - (self._clock() - self._opened_at))
+
+
+@dataclass(frozen=True, slots=True)
+class RetryPolicy:
+    """Exponential backoff with full jitter for retryable provider errors."""
+
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number ``attempt`` (0-based): uniform in [0, base * 2^attempt]."""
+        return random.uniform(0.0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+@dataclass(frozen=True, slots=True)
+class ResilienceStats:
+    breaker: CircuitBreakerStats
+    retries: int
+
+
+class ResilientQuestionGenerator(QuestionGenerator):
+    """Retries transient provider failures and fails fast while the provider is down.
+
+    Only ``LLMProviderError`` counts against the breaker; anything else (for
+    example a response that could not be parsed) means the provider answered
+    and is recorded as a success. A retry is attempted only for errors marked
+    ``retryable`` and never once the breaker has opened. Streams are retried
+    only if they failed before yielding anything.
+    """
+
+    def __init__(
+        self,
+        inner: QuestionGenerator,
+        *,
+        breaker: Optional[CircuitBreaker] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+    ) -> None:
+        self._inner = inner
+        self._breaker = breaker or CircuitBreaker()
+        self._retry_policy = retry_policy or RetryPolicy()
+        self._retries = 0
+        self._lock = threading.Lock()
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        return self._breaker
+
+    def stats(self) -> ResilienceStats:
+        with self._lock:
+            retries = self._retries
+        return ResilienceStats(breaker=self._breaker.stats(), retries=retries)
+
+    def generate(
+        self,
+        *,
+        source_text: str,
+        params: GenerateParams,
+        surplus: Optional[List[Question]] = None,
+    ) -> Tuple[Optional[str], List[Question]]:
+        attempt = 0
+        while True:
+            generation = self._breaker.acquire()
+            try:
+                result = self._inner.generate(
+                    source_text=source_text, params=params, surplus=surplus
+                )
+            except LLMProviderError as exc:
+                self._breaker.record_failure(generation)
+                time.sleep(self._next_delay(exc, attempt))
+                attempt += 1
+                continue
+            except BaseException:
+                # Not a provider failure; includes cancellation (CancelledError)
+                # when the client disconnects, which must still settle the call.
+                self._breaker.record_success(generation)
+                raise
+            self._breaker.record_success(generation)
+            return result
+
+    async def agenerate(
+        self,
+        *,
+        source_text: str,
+        params: GenerateParams,
+        surplus: Optional[List[Question]] = None,
+    ) -> Tuple[Optional[str], List[Question]]:
+        attempt = 0
+        while True:
+            generation = self._breaker.acquire()
+            try:
+                result = await agenerate_questions(
+                    self._inner, source_text=source_text, params=params, surplus=surplus
+                )
+            except LLMProviderError as exc:
+                self._breaker.record_failure(generation)
+                await asyncio.sleep(self._next_delay(exc, attempt))
+                attempt += 1
+                continue
+            except BaseException:
+                # Not a provider failure; includes cancellation (CancelledError)
+                # when the client disconnects, which must still settle the call.
+                self._breaker.record_success(generation)
+                raise
+            self._breaker.record_success(generation)
+            return result
+
+    def stream(self, *, source_text: str, params: GenerateParams) -> Iterator[StreamEvent]:
+        attempt = 0
+        while True:
+            generation = self._breaker.acquire()
+            started = False
+            try:
+                for event in self._inner.stream(source_text=source_text, params=params):
+                    started = True
+                    yield event
+            except LLMProviderError as exc:
+                self._breaker.record_failure(generation)
+                if started:
+                    raise
+                time.sleep(self._next_delay(exc, attempt))
+                attempt += 1
+                continue
+            except BaseException:
+                # Includes GeneratorExit when the client disconnects mid-stream.
+                self._breaker.record_success(generation)
+                raise
+            self._breaker.record_success(generation)
+            return
+
+    def _next_delay(self, exc: LLMProviderError, attempt: int) -> float:
+        """Backoff before the next attempt; re-raises ``exc`` when no retry is due."""
+        if (
+            not exc.retryable
+            or attempt + 1 >= self._retry_policy.max_attempts
+            or self._breaker.state is not CircuitState.CLOSED
+        ):
+            raise exc
+        delay = self._retry_policy.backoff(attempt)
+        with self._lock:
+            self._retries += 1
+        logger.warning(
+            "LLM call failed (attempt %d/%d), retrying in %.2fs: %s",
+            attempt + 1,
+            self._retry_policy.max_attempts,
+            delay,
+            exc,
+        )
+        return delay
+
+
+__all__ = [
+    "CircuitBreaker",
+    "CircuitBreakerStats",
+    "CircuitState",
+    "ResilienceStats",
+    "ResilientQuestionGenerator",
+    "RetryPolicy",
+]
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import logging
+import re
+from dataclasses import dataclass
+from typing import Dict, List
+
+import numpy as np
+
+from .token_budget import estimate_tokens, truncate_to_tokens
+
+logger = logging.getLogger(__name__)
+
+_PARAGRAPH_SPLIT_RE = re.compile(r"\n\s*\n")
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?…])\s+")
+_TERM_RE = re.compile(r"[^\W\d_]{3,}", re.UNICODE)
+
+
+@dataclass(frozen=True, slots=True)
+class Passage:
+    index: int
+    text: str
+    tokens: int
+
+
+def split_passages(text: str, *, target_tokens: int = 200) -> List[Passage]:
+    """Cut ``text`` into passages of roughly ``target_tokens``.
+
+    Paragraphs are kept whole where possible: short neighbours are merged,
+    paragraphs longer than twice the target are split at sentence ends.
+    """
+    pieces: List[str] = []
+    for paragraph in _PARAGRAPH_SPLIT_RE.split(text or ""):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if estimate_tokens(paragraph) <= 2 * target_tokens:
+            pieces.append(paragraph)
+            continue
+        current: List[str] = []
+        current_tokens = 0
+        for sentence in _SENTENCE_SPLIT_RE.split(paragraph):
+            sentence_tokens = estimate_tokens(sentence)
+            if current and current_tokens + sentence_tokens > target_tokens:
+                pieces.append(" ".join(current))
+                current, current_tokens = [], 0
+            current.append(sentence)
+            current_tokens += sentence_tokens
+        if current:
+            pieces.append(" ".join(current))
+
+    passages: List[Passage] = []
+    buffer: List[str] = []
+    buffer_tokens = 0
+    for piece in pieces:
+        piece_tokens = estimate_tokens(piece)
+        if buffer and buffer_tokens + piece_tokens > target_tokens:
+            passages.append(Passage(len(passages), "\n\n".join(buffer), buffer_tokens))
+            buffer, buffer_tokens = [], 0
+        buffer.append(piece)
+        buffer_tokens += piece_tokens
+    if buffer:
+        passages.append(Passage(len(passages), "\n\n".join(buffer), buffer_tokens))
+    return passages
+
+
+def _terms(text: str, stem_chars: int) -> List[str]:
+    # Prefix truncation is a crude stemmer, but it folds most Polish inflection.
+    return [word[:stem_chars] for word in _TERM_RE.findall(text.casefold())]
+
+
+def score_passages(
+    passages: List[Passage],
+    *,
+    k1: float = 1.2,
+    b: float = 0.75,
+    stem_chars: int = 6,
+) -> np.ndarray:
+    """BM25 salience of each passage against the document's own topic terms.
+
+    There is no user query, so the document stands in for one: terms that
+    recur across several passages are weighted by ``log(1 + frequency) *
+    idf``, which favours topical vocabulary over both boilerplate (present
+    everywhere, low idf) and one-off words (present once, dropped).
+    Scoring runs over the sparse (passage, term) pairs, so memory grows with
+    the text length rather than passages x vocabulary.
+    """
+    count = len(passages)
+    if count == 0:
+        return np.zeros(0)
+
+    vocabulary: Dict[str, int] = {}
+    rows: List[int] = []
+    cols: List[int] = []
+    for passage in passages:
+        for term in _terms(passage.text, stem_chars):
+            rows.append(passage.index)
+            cols.append(vocabulary.setdefault(term, len(vocabulary)))
+    if not vocabulary:
+        return np.zeros(count)
+
+    size = len(vocabulary)
+    pairs, tf = np.unique(
+        np.asarray(rows, dtype=np.int64) * size + np.asarray(cols, dtype=np.int64),
+        return_counts=True,
+    )
+    pair_rows = pairs // size
+    pair_cols = pairs % size
+    tf = tf.astype(np.float64)
+
+    lengths = np.bincount(pair_rows, weights=tf, minlength=count)
+    average_length = max(lengths.mean(), 1.0)
+    df = np.bincount(pair_cols, minlength=size).astype(np.float64)
+    collection_tf = np.bincount(pair_cols, weights=tf, minlength=size)
+    idf = np.log1p((count - df + 0.5) / (df + 0.5))
+    query = np.where(df >= 2, np.log1p(collection_tf) * idf, 0.0)
+
+    norm = k1 * (1.0 - b + b * lengths[pair_rows] / average_length)
+    weights = idf[pair_cols] * tf * (k1 + 1.0) / (tf + norm) * query[pair_cols]
+    return np.bincount(pair_rows, weights=weights, minlength=count)
+
+
+class PassageSelector:
+    """Keeps the most salient passages of a long source within a token budget.
+
+    The text is split into passages, each is scored with ``score_passages``
+    and the best ones are kept, in document order. To preserve coverage the
+    document is cut into ``sections`` of equal token mass and each section
+    gets a proportional share of the budget first; whatever is left goes to
+    the best remaining passages anywhere. Sources already under
+    ``target_tokens`` are returned unchanged.
+
+    Instances are callable with the ``SourceTrimmer`` signature, so they can
+    replace plain truncation in ``TokenBudget``.
+    """
+
+    def __init__(
+        self,
+        *,
+        target_tokens: int = 8_000,
+        passage_tokens: int = 200,
+        sections: int = 8,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ) -> None:
+        self._target_tokens = target_tokens
+        self._passage_tokens = max(20, passage_tokens)
+        self._sections = max(1, sections)
+        self._k1 = k1
+        self._b = b
+
+    @property
+    def target_tokens(self) -> int:
+        return self._target_tokens
+
+    def __call__(self, text: str, max_tokens: int) -> str:
+        return self.select(text, max_tokens)
+
+    def preselect(self, text: str) -> str:
+        """Reduce ``text`` to ``target_tokens`` if it is longer."""
+        if estimate_tokens(text) <= self._target_tokens:
+            return text
+        return self.select(text, self._target_tokens)
+
+    def select(self, text: str, max_tokens: int) -> str:
+        if max_tokens <= 0:
+            return ""
+        passages = split_passages(text, target_tokens=self._passage_tokens)
+        total = sum(passage.tokens for passage in passages)
+        if total <= max_tokens:
+            return text
+        if len(passages) <= 1:
+            return truncate_to_tokens(text, max_tokens)
+
+        scores = score_passages(passages, k1=self._k1, b=self._b)
+        chosen = self._choose(passages, scores, max_tokens)
+        if not chosen:
+            return truncate_to_tokens(text, max_tokens)
+
+        selected = "\n\n".join(passages[i].text for i in sorted(chosen))
+        logger.info(
+            "Kept %d of %d passages: ~%d -> ~%d tokens",
+            len(chosen),
+            len(passages),
+            total,
+            sum(passages[i].tokens for i in chosen),
+        )
+        return selected
+
+    def _choose(self, passages: List[Passage], scores: np.ndarray, max_tokens: int) -> List[int]:
+        tokens = np.fromiter((p.tokens for p in passages), dtype=np.int64, count=len(passages))
+        # Section boundaries by cumulative token mass, not passage count.
+        offsets = np.cumsum(tokens) - tokens
+        section_of = np.minimum(
+            (offsets * self._sections) // max(int(tokens.sum()), 1), self._sections - 1
+        )
+        # Best first; ties resolved towards earlier passages.
+        order = np.lexsort((np.arange(len(passages)), -scores))
+
+        chosen = np.zeros(len(passages), dtype=bool)
+        used = 0
+        for section in range(self._sections):
+            members = order[section_of[order] == section]
+            if not len(members):
+                continue
+            quota = max_tokens * int(tokens[members].sum()) // int(tokens.sum())
+            spent = 0
+            for i in members:
+                if spent + tokens[i] <= quota:
+                    chosen[i] = True
+                    spent += int(tokens[i])
+            used += spent
+
+        for i in order:
+            if not chosen[i] and used + tokens[i] <= max_tokens:
+                chosen[i] = True
+                used += int(tokens[i])
+        return [int(i) for i in np.flatnonzero(chosen)]
+
+
+__all__ = ["Passage", "PassageSelector", "score_passages", "split_passages"]
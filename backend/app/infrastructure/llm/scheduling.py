@@ -0,0 +1,430 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+from app.api.schemas.tests import GenerateParams
+from app.domain.models import Question
+from app.domain.services import (
+    LLMUnavailableError,
+    QuestionGenerator,
+    StreamEvent,
+    agenerate_questions,
+)
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+
+
+@dataclass(frozen=True, slots=True)
+class LLMCaller:
+    """Who an LLM call is made for; scheduling flows are keyed by this."""
+
+    owner: str
+    kind: str = INTERACTIVE
+
+    @property
+    def flow(self) -> str:
+        return f"{self.owner}:{self.kind}"
+
+
+_ANONYMOUS = LLMCaller(owner="anonymous", kind=BULK)
+_current_caller: contextvars.ContextVar[Optional[LLMCaller]] = contextvars.ContextVar(
+    "llm_caller", default=None
+)
+
+
+def current_llm_caller() -> Optional[LLMCaller]:
+    return _current_caller.get()
+
+
+@contextmanager
+def llm_caller(owner_id: object, *, bulk: bool = False) -> Iterator[LLMCaller]:
+    """Attribute LLM calls made inside the block to ``owner_id``."""
+    caller = LLMCaller(owner=f"user:{owner_id}", kind=BULK if bulk else INTERACTIVE)
+    token = _current_caller.set(caller)
+    try:
+        yield caller
+    finally:
+        _current_caller.reset(token)
+
+
+class _Waiter:
+    __slots__ = ("cost", "enqueued_at", "granted", "_event", "_loop", "_future")
+
+    def __init__(self, cost: int, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        self.cost = cost
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+        self._loop = loop
+        self._event = None if loop else threading.Event()
+        self._future: Optional[asyncio.Future] = loop.create_future() if loop else None
+
+    def grant(self) -> None:
+        self.granted = True
+        if self._event is not None:
+            self._event.set()
+        else:
+            self._loop.call_soon_threadsafe(_resolve, self._future)
+
+    def wait(self, timeout: Optional[float]) -> bool:
+        return self._event.wait(timeout)
+
+    async def await_grant(self, timeout: Optional[float]) -> None:
+        await asyncio.wait_for(asyncio.shield(self._future), timeout)
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+@dataclass(slots=True)
+class _Flow:
+    weight: int
+    queue: Deque[_Waiter] = field(default_factory=deque)
+    deficit: int = 0
+    # Whether the flow already received its quantum in the current DRR turn.
+    in_turn: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class FlowStats:
+    flow: str
+    queued: int
+    granted: int
+
+
+@dataclass(frozen=True, slots=True)
+class SchedulerStats:
+    max_in_flight: int
+    in_flight: int
+    queued: int
+    granted: int
+    timed_out: int
+    wait_p50_seconds: float
+    wait_p95_seconds: float
+    flows: List[FlowStats]
+
+
+class FairScheduler:
+    """Deficit round-robin admission for LLM calls, one queue per caller flow.
+
+    At most ``max_in_flight`` calls run at once. A call that cannot start
+    immediately joins its flow's queue; whenever a slot frees up, active
+    flows are visited round-robin and each turn a flow earns
+    ``quantum * weight`` credit, spent at ``cost`` per admitted call. A user
+    batch-generating dozens of tests therefore gets the same share of slots
+    as a user asking for one, instead of everything queued behind the batch.
+    Interactive flows get ``interactive_weight``, bulk flows weight 1.
+
+    Works for threads and coroutines alike; waiting longer than
+    ``max_queue_seconds`` raises ``LLMUnavailableError``. The scheduler
+    must wrap any circuit breaker rather than sit inside it, or a full
+    queue would count as provider failures.
+
+    Only flows with queued calls are kept; grant counts for the stats are
+    remembered for the ``tracked_flows`` most recently admitted flows.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_in_flight: int = 16,
+        quantum: int = 1,
+        interactive_weight: int = 4,
+        max_queue_seconds: Optional[float] = None,
+        wait_samples: int = 1024,
+        tracked_flows: int = 1024,
+    ) -> None:
+        self._max_in_flight = max(1, max_in_flight)
+        self._quantum = max(1, quantum)
+        self._interactive_weight = max(1, interactive_weight)
+        self._max_queue_seconds = max_queue_seconds
+        self._tracked_flows = max(1, tracked_flows)
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._flows: Dict[str, _Flow] = {}
+        self._flow_grants: "OrderedDict[str, int]" = OrderedDict()
+        self._active: Deque[str] = deque()
+        self._waits: Deque[float] = deque(maxlen=max(1, wait_samples))
+        self._granted = 0
+        self._timed_out = 0
+
+    @contextmanager
+    def slot(self, caller: Optional[LLMCaller] = None, *, cost: int = 1) -> Iterator[None]:
+        caller = caller or current_llm_caller() or _ANONYMOUS
+        waiter = self._enqueue(caller, cost, loop=None)
+        if waiter is not None and not waiter.wait(self._max_queue_seconds):
+            self._abandon(caller, waiter)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def aslot_acquire(self, caller: Optional[LLMCaller] = None, *, cost: int = 1) -> None:
+        """Async acquire; pair with ``release``."""
+        caller = caller or current_llm_caller() or _ANONYMOUS
+        waiter = self._enqueue(caller, cost, loop=asyncio.get_running_loop())
+        if waiter is None:
+            return
+        try:
+            await waiter.await_grant(self._max_queue_seconds)
+        except asyncio.TimeoutError:
+            self._abandon(caller, waiter)
+        except BaseException:
+            # Cancelled while queued, or granted just as the cancellation landed.
+            with self._lock:
+                granted = waiter.granted or not self._remove(caller, waiter)
+            if granted:
+                self.release()
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._dispatch()
+
+    def stats(self, *, max_flows: int = 20) -> SchedulerStats:
+        with self._lock:
+            waits = sorted(self._waits)
+            keys = set(self._flows) | set(self._flow_grants)
+            flows = sorted(
+                (
+                    FlowStats(
+                        flow=key,
+                        queued=len(self._flows[key].queue) if key in self._flows else 0,
+                        granted=self._flow_grants.get(key, 0),
+                    )
+                    for key in keys
+                ),
+                key=lambda item: (-item.queued, -item.granted, item.flow),
+            )[:max_flows]
+            return SchedulerStats(
+                max_in_flight=self._max_in_flight,
+                in_flight=self._in_flight,
+                queued=sum(len(flow.queue) for flow in self._flows.values()),
+                granted=self._granted,
+                timed_out=self._timed_out,
+                wait_p50_seconds=_percentile(waits, 50),
+                wait_p95_seconds=_percentile(waits, 95),
+                flows=flows,
+            )
+
+    def _enqueue(
+        self, caller: LLMCaller, cost: int, *, loop: Optional[asyncio.AbstractEventLoop]
+    ) -> Optional[_Waiter]:
+        """Admit right away (returns ``None``) or queue a waiter for the caller's flow."""
+        with self._lock:
+            if self._in_flight < self._max_in_flight and not self._active:
+                self._in_flight += 1
+                self._granted += 1
+                self._count_grant(caller.flow)
+                self._waits.append(0.0)
+                return None
+            flow = self._flows.get(caller.flow)
+            if flow is None:
+                weight = self._interactive_weight if caller.kind == INTERACTIVE else 1
+                flow = self._flows[caller.flow] = _Flow(weight=weight)
+            waiter = _Waiter(cost, loop)
+            if not flow.queue:
+                self._active.append(caller.flow)
+            flow.queue.append(waiter)
+            return waiter
+
+    def _abandon(self, caller: LLMCaller, waiter: _Waiter) -> None:
+        with self._lock:
+            if waiter.granted:
+                return  # granted right at the deadline; keep the slot
+            self._remove(caller, waiter)
+            self._timed_out += 1
+            waited = time.monotonic() - waiter.enqueued_at
+        raise LLMUnavailableError(
+            f"No LLM capacity: gave up after waiting {waited:.1f}s in the queue",
+            retry_after=self._max_queue_seconds or 1.0,
+        )
+
+    # The helpers below expect ``self._lock`` to be held.
+
+    def _remove(self, caller: LLMCaller, waiter: _Waiter) -> bool:
+        flow = self._flows.get(caller.flow)
+        if flow is None or waiter not in flow.queue:
+            return False
+        flow.queue.remove(waiter)
+        if not flow.queue:
+            self._deactivate(caller.flow, flow)
+        return True
+
+    def _deactivate(self, key: str, flow: _Flow) -> None:
+        # An idle flow has no state worth keeping: DRR resets its credit anyway.
+        try:
+            self._active.remove(key)
+        except ValueError:
+            pass
+        self._flows.pop(key, None)
+
+    def _count_grant(self, key: str) -> None:
+        self._flow_grants[key] = self._flow_grants.pop(key, 0) + 1
+        while len(self._flow_grants) > self._tracked_flows:
+            self._flow_grants.popitem(last=False)
+
+    def _dispatch(self) -> None:
+        while self._in_flight < self._max_in_flight and self._active:
+            key = self._active[0]
+            flow = self._flows[key]
+            if not flow.in_turn:
+                flow.deficit += self._quantum * flow.weight
+                flow.in_turn = True
+            head = flow.queue[0]
+            if head.cost > flow.deficit:
+                # Turn over: keep the remaining credit and move to the next flow.
+                flow.in_turn = False
+                self._active.rotate(-1)
+                continue
+
+            flow.queue.popleft()
+            flow.deficit -= head.cost
+            self._count_grant(key)
+            self._in_flight += 1
+            self._granted += 1
+            self._waits.append(time.monotonic() - head.enqueued_at)
+            head.grant()
+            if not flow.queue:
+                self._deactivate(key, flow)
+
+
+class ConcurrencyLimiter:
+    """FIFO cap on concurrent calls, shared by threads and coroutines.
+
+    Unlike ``asyncio.Semaphore`` it is not bound to one event loop, so the
+    sync and async paths of a provider draw from the same ``limit``.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self._limit = max(1, limit)
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._queue: Deque[_Waiter] = deque()
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        waiter = self._enqueue(loop=None)
+        if waiter is not None:
+            waiter.wait(None)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self) -> None:
+        """Async acquire; pair with ``release``."""
+        waiter = self._enqueue(loop=asyncio.get_running_loop())
+        if waiter is None:
+            return
+        try:
+            await waiter.await_grant(None)
+        except BaseException:
+            with self._lock:
+                granted = waiter.granted
+                if not granted:
+                    self._queue.remove(waiter)
+            if granted:
+                self.release()
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            if self._queue:
+                # Hand the slot straight to the next waiter.
+                self._queue.popleft().grant()
+            else:
+                self._in_use -= 1
+
+    def _enqueue(self, *, loop: Optional[asyncio.AbstractEventLoop]) -> Optional[_Waiter]:
+        with self._lock:
+            if self._in_use < self._limit and not self._queue:
+                self._in_use += 1
+                return None
+            waiter = _Waiter(1, loop)
+            self._queue.append(waiter)
+            return waiter
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class FairScheduledQuestionGenerator(QuestionGenerator):
+    """Admits calls to ``inner`` through a ``FairScheduler``.
+
+    The flow is taken from the ``llm_caller`` context of the calling code;
+    calls made outside one share a single anonymous bulk flow.
+    """
+
+    def __init__(self, inner: QuestionGenerator, scheduler: FairScheduler) -> None:
+        self._inner = inner
+        self._scheduler = scheduler
+
+    @property
+    def scheduler(self) -> FairScheduler:
+        return self._scheduler
+
+    def generate(
+        self,
+        *,
+        source_text: str,
+        params: GenerateParams,
+        surplus: Optional[List[Question]] = None,
+    ) -> Tuple[Optional[str], List[Question]]:
+        with self._scheduler.slot():
+            return self._inner.generate(source_text=source_text, params=params, surplus=surplus)
+
+    async def agenerate(
+        self,
+        *,
+        source_text: str,
+        params: GenerateParams,
+        surplus: Optional[List[Question]] = None,
+    ) -> Tuple[Optional[str], List[Question]]:
+        await self._scheduler.aslot_acquire()
+        try:
+            return await agenerate_questions(
+                self._inner, source_text=source_text, params=params, surplus=surplus
+            )
+        finally:
+            self._scheduler.release()
+
+    def stream(self, *, source_text: str, params: GenerateParams) -> Iterator[StreamEvent]:
+        with self._scheduler.slot():
+            yield from self._inner.stream(source_text=source_text, params=params)
+
+
+__all__ = [
+    "BULK",
+    "ConcurrencyLimiter",
+    "FairScheduledQuestionGenerator",
+    "FairScheduler",
+    "FlowStats",
+    "INTERACTIVE",
+    "LLMCaller",
+    "SchedulerStats",
+    "current_llm_caller",
+    "llm_caller",
+]
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.api.schemas.tests import ClosedBreakdown, GenerateParams
+from app.domain.models import Question, QuestionDifficulty, QuestionType
+
+_DIFFICULTY_FIELDS = {
+    QuestionDifficulty.EASY: "easy",
+    QuestionDifficulty.MEDIUM: "medium",
+    QuestionDifficulty.HARD: "hard",
+}
+
+
+def requested_types(params: GenerateParams) -> Dict[QuestionType, int]:
+    return {
+        QuestionType.TRUE_FALSE: params.closed.true_false,
+        QuestionType.SINGLE_CHOICE: params.closed.single_choice,
+        QuestionType.MULTI_CHOICE: params.closed.multi_choice,
+        QuestionType.OPEN: params.num_open,
+    }
+
+
+def requested_difficulties(params: GenerateParams) -> Dict[QuestionDifficulty, int]:
+    return {level: getattr(params, name) for level, name in _DIFFICULTY_FIELDS.items()}
+
+
+def _count(values: Iterable) -> Dict:
+    counts: Dict = {}
+    for value in values:
+        counts[value] = counts.get(value, 0) + 1
+    return counts
+
+
+class QuestionQuota:
+    """Tracks how many questions of each type (and difficulty) are still wanted."""
+
+    def __init__(self, params: GenerateParams) -> None:
+        self._types = requested_types(params)
+        self._difficulties = requested_difficulties(params)
+
+    @property
+    def full(self) -> bool:
+        return not any(self._types.values())
+
+    def accepts(self, question: Question, *, match_difficulty: bool = False) -> bool:
+        if self._types[question.kind] <= 0:
+            return False
+        return not match_difficulty or self._difficulties[question.difficulty] > 0
+
+    def take(self, question: Question, *, match_difficulty: bool = False) -> bool:
+        if not self.accepts(question, match_difficulty=match_difficulty):
+            return False
+        self._consume(question, question.kind)
+        return True
+
+    def take_closed(self, question: Question) -> bool:
+        """Fill any remaining closed slot, regardless of the inferred closed type."""
+        if not question.is_closed:
+            return False
+        for kind in (QuestionType.SINGLE_CHOICE, QuestionType.MULTI_CHOICE, QuestionType.TRUE_FALSE):
+            if self._types[kind] > 0:
+                self._consume(question, kind)
+                return True
+        return False
+
+    def _consume(self, question: Question, kind: QuestionType) -> None:
+        self._types[kind] -= 1
+        if self._difficulties[question.difficulty] > 0:
+            self._difficulties[question.difficulty] -= 1
+
+
+def select_questions(
+    questions: List[Question],
+    params: GenerateParams,
+    *,
+    lenient: bool = False,
+) -> Tuple[List[Question], List[Question]]:
+    """Pick questions matching the requested type/difficulty mix.
+
+    Returns ``(selected, surplus)`` in original order. Questions that match
+    both type and difficulty are preferred, then any of the right type.
+    With ``lenient`` the remaining closed slots accept closed questions of
+    another closed type, as the pre-top-up selection used to.
+    """
+    quota = QuestionQuota(params)
+    chosen = [False] * len(questions)
+
+    passes = [
+        lambda q: quota.take(q, match_difficulty=True),
+        lambda q: quota.take(q),
+    ]
+    if lenient:
+        passes.append(quota.take_closed)
+
+    for take in passes:
+        for index, question in enumerate(questions):
+            if not chosen[index] and take(question):
+                chosen[index] = True
+        if quota.full:
+            break
+
+    selected = [q for q, is_chosen in zip(questions, chosen) if is_chosen]
+    surplus = [q for q, is_chosen in zip(questions, chosen) if not is_chosen]
+    return selected, surplus
+
+
+def compute_shortfall(selected: List[Question], params: GenerateParams) -> Optional[GenerateParams]:
+    """Params describing exactly the questions still missing, or ``None``."""
+    got_types = _count(q.kind for q in selected)
+    missing_types = {
+        kind: max(0, wanted - got_types.get(kind, 0))
+        for kind, wanted in requested_types(params).items()
+    }
+    missing_total = sum(missing_types.values())
+    if missing_total == 0:
+        return None
+
+    got_difficulties = _count(q.difficulty for q in selected)
+    missing_difficulties = {
+        level: max(0, wanted - got_difficulties.get(level, 0))
+        for level, wanted in requested_difficulties(params).items()
+    }
+    # Over-delivered difficulties can leave more open difficulty slots than missing
+    # questions; trim from the hardest level down so the params stay consistent.
+    excess = sum(missing_difficulties.values()) - missing_total
+    for level in (QuestionDifficulty.HARD, QuestionDifficulty.MEDIUM, QuestionDifficulty.EASY):
+        if excess <= 0:
+            break
+        cut = min(excess, missing_difficulties[level])
+        missing_difficulties[level] -= cut
+        excess -= cut
+    if excess < 0:
+        missing_difficulties[QuestionDifficulty.MEDIUM] -= excess
+
+    return GenerateParams(
+        closed=ClosedBreakdown(
+            true_false=missing_types[QuestionType.TRUE_FALSE],
+            single_choice=missing_types[QuestionType.SINGLE_CHOICE],
+            multi_choice=missing_types[QuestionType.MULTI_CHOICE],
+        ),
+        num_open=missing_types[QuestionType.OPEN],
+        **{name: missing_difficulties[level] for level, name in _DIFFICULTY_FIELDS.items()},
+    )
+
+
+__all__ = [
+    "QuestionQuota",
+    "compute_shortfall",
+    "requested_difficulties",
+    "requested_types",
+    "select_questions",
+]
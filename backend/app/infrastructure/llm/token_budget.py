@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import logging
+import math
+import re
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+
+from app.api.schemas.tests import GenerateParams
+from app.domain.services import GenerationEstimate
+
+logger = logging.getLogger(__name__)
+
+PromptBuilder = Callable[[str, GenerateParams], str]
+SourceTrimmer = Callable[[str, int], str]
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+_BLANK_RUN_RE = re.compile(r"\n\s*\n(\s*\n)+")
+_INLINE_SPACE_RE = re.compile(r"[ \t\f\v]+")
+_PARAGRAPH_END_RE = re.compile(r"\n\s*\n|(?<=[.!?…])\s")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap local token estimate for SentencePiece-style tokenizers.
+
+    ASCII words average ~4 characters per token; Polish words with
+    diacritics split more aggressively (~3). Punctuation counts as one.
+    """
+    total = 0
+    for match in _TOKEN_RE.finditer(text or ""):
+        word = match.group()
+        if len(word) == 1:
+            total += 1
+        else:
+            total += math.ceil(len(word) / (4 if word.isascii() else 3))
+    return total
+
+
+def compact_text(text: str) -> str:
+    """Lossless-ish squeeze: whitespace runs, repeated page headers/footers, bare page numbers."""
+    lines = [_INLINE_SPACE_RE.sub(" ", line).strip() for line in text.splitlines()]
+
+    counts: dict = {}
+    for line in lines:
+        if line:
+            counts[line] = counts.get(line, 0) + 1
+
+    kept = []
+    for line in lines:
+        if line and not any(ch.isalpha() for ch in line) and len(line) <= 8:
+            continue  # page numbers and similar debris
+        if line and len(line) <= 80 and counts[line] >= 3:
+            continue  # running headers / footers repeated on every page
+        kept.append(line)
+
+    return _BLANK_RUN_RE.sub("\n\n", "\n".join(kept)).strip()
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut ``text`` at a paragraph or sentence boundary below ``max_tokens``."""
+    if max_tokens <= 0:
+        return ""
+    estimated = estimate_tokens(text)
+    if estimated <= max_tokens:
+        return text
+
+    limit = int(len(text) * max_tokens / estimated)
+    while limit > 0:
+        head = text[:limit]
+        boundary = None
+        for boundary in _PARAGRAPH_END_RE.finditer(head):
+            pass
+        if boundary and boundary.start() > limit // 2:
+            head = head[: boundary.start()]
+        if estimate_tokens(head) <= max_tokens:
+            return head.rstrip()
+        limit = int(limit * 0.9)
+    return ""
+
+
+@dataclass(frozen=True, slots=True)
+class CostModel:
+    input_usd_per_mtok: float = 0.10
+    output_usd_per_mtok: float = 0.40
+    output_tokens_per_second: float = 150.0
+    base_latency_seconds: float = 0.8
+
+    def cost(self, prompt_tokens: int, output_tokens: int) -> float:
+        return (
+            prompt_tokens * self.input_usd_per_mtok + output_tokens * self.output_usd_per_mtok
+        ) / 1_000_000
+
+    def latency(self, output_tokens: int) -> float:
+        return self.base_latency_seconds + output_tokens / self.output_tokens_per_second
+
+
+class TokenBudget:
+    """Keeps prompts within a token budget before they are sent.
+
+    The budget reserves room for the expected output (proportional to the
+    number of requested questions), compacts the source text and, if that is
+    not enough, hands it to ``trimmer`` to cut it down to the remaining space.
+    ``source_target_tokens`` lowers the source allowance below what the model
+    could take, for trimmers that select content rather than truncate it.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_prompt_tokens: int = 200_000,
+        context_window_tokens: int = 1_048_576,
+        output_tokens_per_question: int = 120,
+        output_overhead_tokens: int = 64,
+        cost_model: Optional[CostModel] = None,
+        trimmer: SourceTrimmer = truncate_to_tokens,
+        source_target_tokens: Optional[int] = None,
+    ) -> None:
+        self._max_prompt_tokens = max_prompt_tokens
+        self._context_window_tokens = context_window_tokens
+        self._output_tokens_per_question = output_tokens_per_question
+        self._output_overhead_tokens = output_overhead_tokens
+        self._cost_model = cost_model or CostModel()
+        self._trimmer = trimmer
+        self._source_target_tokens = source_target_tokens
+
+    @property
+    def cost_model(self) -> CostModel:
+        return self._cost_model
+
+    def expected_output_tokens(self, params: GenerateParams) -> int:
+        count = params.closed.total() + params.num_open
+        return self._output_overhead_tokens + count * self._output_tokens_per_question
+
+    def source_allowance(self, params: GenerateParams, prompt_builder: PromptBuilder) -> int:
+        overhead = estimate_tokens(prompt_builder("", params))
+        by_prompt_cap = self._max_prompt_tokens - overhead
+        by_context = self._context_window_tokens - overhead - self.expected_output_tokens(params)
+        allowance = min(by_prompt_cap, by_context)
+        if self._source_target_tokens is not None:
+            allowance = min(allowance, self._source_target_tokens)
+        return max(0, allowance)
+
+    def fit(
+        self,
+        source_text: str,
+        params: GenerateParams,
+        *,
+        prompt_builder: PromptBuilder,
+    ) -> Tuple[str, GenerationEstimate]:
+        allowance = self.source_allowance(params, prompt_builder)
+        original_tokens = estimate_tokens(source_text)
+        fitted = source_text
+
+        if original_tokens > allowance:
+            fitted = compact_text(source_text)
+            if estimate_tokens(fitted) > allowance:
+                fitted = self._trimmer(fitted, allowance)
+            logger.info(
+                "Source trimmed to fit token budget: ~%d -> ~%d tokens (allowance %d)",
+                original_tokens,
+                estimate_tokens(fitted),
+                allowance,
+            )
+
+        estimate = self._estimate(
+            fitted,
+            params,
+            prompt_builder,
+            source_tokens=original_tokens,
+            trimmed=original_tokens > allowance,
+        )
+        return fitted, estimate
+
+    def estimate(
+        self,
+        source_text: str,
+        params: GenerateParams,
+        *,
+        prompt_builder: PromptBuilder,
+    ) -> GenerationEstimate:
+        return self.fit(source_text, params, prompt_builder=prompt_builder)[1]
+
+    def _estimate(
+        self,
+        fitted: str,
+        params: GenerateParams,
+        prompt_builder: PromptBuilder,
+        *,
+        source_tokens: int,
+        trimmed: bool,
+    ) -> GenerationEstimate:
+        prompt_tokens = estimate_tokens(prompt_builder(fitted, params))
+        output_tokens = self.expected_output_tokens(params)
+        return GenerationEstimate(
+            source_tokens=source_tokens,
+            prompt_tokens=prompt_tokens,
+            output_tokens=output_tokens,
+            trimmed=trimmed,
+            estimated_cost_usd=self._cost_model.cost(prompt_tokens, output_tokens),
+            estimated_latency_seconds=self._cost_model.latency(output_tokens),
+        )
+
+
+__all__ = [
+    "CostModel",
+    "TokenBudget",
+    "compact_text",
+    "estimate_tokens",
+    "truncate_to_tokens",
+]
@@ -1,3 +1,16 @@
+from .cache import CachingOCRService
 from .default import DefaultOCRService
+from .hybrid import HybridPdfExtractor
+from .pdf import PdfPageOCR
+from .preprocessing import ImagePreprocessor, PreprocessingConfig
+from .workers import OCRWorkerPool
 
-__all__ = ["DefaultOCRService"]
+__all__ = [
+    "CachingOCRService",
+    "DefaultOCRService",
+    "HybridPdfExtractor",
+    "ImagePreprocessor",
+    "OCRWorkerPool",
+    "PdfPageOCR",
+    "PreprocessingConfig",
+]
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional
+
+from app.domain.services import OCRProgress, OCRService
+from app.infrastructure.caching import TwoTierCache, make_cache_key
+
+logger = logging.getLogger(__name__)
+
+_READ_CHUNK_BYTES = 1024 * 1024
+
+
+def file_digest(file_path: str) -> str:
+    """sha256 of the file contents, read in chunks so large scans are not loaded whole."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(_READ_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class CachingOCRService(OCRService):
+    """Content-addressed cache in front of another ``OCRService``.
+
+    The key covers the file bytes and the inner service's ``fingerprint``
+    (language, engine and preprocessing settings), so the same scan uploaded
+    again - under any name - skips OCR, while a settings change produces a
+    fresh pass. Empty results are not cached: the inner service returns ""
+    on failure too, and a failure may not repeat. Neither are results with
+    pages the inner service could not read.
+    """
+
+    def __init__(self, inner: OCRService, cache: TwoTierCache) -> None:
+        self._inner = inner
+        self._cache = cache
+
+    def cache_key(self, *, file_path: str) -> str:
+        return make_cache_key("ocr", file_digest(file_path), self.fingerprint)
+
+    @property
+    def fingerprint(self) -> Dict[str, Any]:
+        return dict(getattr(self._inner, "fingerprint", {}))
+
+    def extract_text(
+        self,
+        *,
+        file_path: str,
+        progress: Optional[OCRProgress] = None,
+        failed_pages: Optional[List[int]] = None,
+    ) -> str:
+        try:
+            key = self.cache_key(file_path=file_path)
+        except OSError as exc:
+            logger.warning("Cannot hash %s for the OCR cache: %s", file_path, exc)
+            return self._inner.extract_text(
+                file_path=file_path, progress=progress, failed_pages=failed_pages
+            )
+
+        cached = self._cache.get(key)
+        if isinstance(cached, str):
+            return cached
+
+        failed: List[int] = []
+        text = self._inner.extract_text(file_path=file_path, progress=progress, failed_pages=failed)
+        if failed:
+            logger.info("Not caching OCR of %s: %d pages failed", file_path, len(failed))
+        elif text.strip():
+            self._cache.set(key, text)
+        if failed_pages is not None:
+            failed_pages.extend(failed)
+        return text
+
+    def shutdown(self) -> None:
+        shutdown = getattr(self._inner, "shutdown", None)
+        if shutdown is not None:
+            shutdown()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+__all__ = ["CachingOCRService", "file_digest"]
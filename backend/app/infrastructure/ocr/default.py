@@ -1,18 +1,117 @@
 from __future__ import annotations
 
-import pytesseract
-from PIL import Image
+import logging
+import threading
+from typing import Any, Dict, List, Optional
 
-from app.domain.services import OCRService
+from app.core.telemetry import current_trace
+from app.domain.services import OCRProgress, OCRService
+
+from .engine import PytesseractEngine, ocr_file
+from .hybrid import HybridPdfExtractor
+from .pdf import is_pdf
+from .preprocessing import ImagePreprocessor
+from .workers import OCRWorkerPool
+
+logger = logging.getLogger(__name__)
 
 
 class DefaultOCRService(OCRService):
-    def __init__(self, language: str = "pol") -> None:
+    """Tesseract OCR for images and, with ``pdf_extractor``, PDFs (text layer or scanned).
+
+    Images go to ``worker_pool`` when one is given (long-lived workers with
+    the language model loaded), otherwise to a fresh tesseract process per
+    call. ``preprocessor`` normalises images first; a worker pool must be
+    built with the same preprocessor, since its workers run it.
+    """
+
+    def __init__(
+        self,
+        language: str = "pol",
+        *,
+        pdf_extractor: Optional[HybridPdfExtractor] = None,
+        worker_pool: Optional[OCRWorkerPool] = None,
+        preprocessor: Optional[ImagePreprocessor] = None,
+    ) -> None:
         self._language = language
+        self._pdf_extractor = pdf_extractor
+        self._worker_pool = worker_pool
+        self._preprocessor = preprocessor
+        self._engine = PytesseractEngine(language)
+        self._stats_lock = threading.Lock()
+        self._preprocessed_images = 0
+        self._preprocessing_ms: Dict[str, float] = {}
 
-    def extract_text(self, *, file_path: str) -> str:
+    @property
+    def fingerprint(self) -> Dict[str, Any]:
+        """Settings that change the OCR output; part of the OCR cache key."""
+        engine = (
+            self._worker_pool.engine_name if self._worker_pool is not None else self._engine.name
+        )
+        fingerprint: Dict[str, Any] = {"engine": engine, "language": self._language}
+        if self._preprocessor is not None:
+            fingerprint.update(self._preprocessor.fingerprint)
+        if self._pdf_extractor is not None:
+            fingerprint.update(self._pdf_extractor.fingerprint)
+        return fingerprint
+
+    def extract_text(
+        self,
+        *,
+        file_path: str,
+        progress: Optional[OCRProgress] = None,
+        failed_pages: Optional[List[int]] = None,
+    ) -> str:
+        if self._pdf_extractor is not None and is_pdf(file_path):
+            try:
+                return self._pdf_extractor.extract_text(
+                    file_path, progress=progress, failed_pages=failed_pages
+                )
+            except Exception:  # noqa: BLE001
+                logger.exception("PDF extraction failed for %s", file_path)
+                return ""
         try:
-            with Image.open(file_path) as image:
-                return pytesseract.image_to_string(image, lang=self._language)
-        except Exception:  # noqa: BLE001
+            if self._worker_pool is not None:
+                text, stage_ms = self._worker_pool.ocr_file(file_path)
+            else:
+                text, stage_ms = ocr_file(self._engine, file_path, self._preprocessor)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("OCR of %s failed: %s", file_path, exc)
             return ""
+        self._record_preprocessing(stage_ms)
+        return text
+
+    def preprocessing_stats(self) -> Dict[str, Any]:
+        """Mean preprocessing time per stage (ms) over the images processed so far."""
+        with self._stats_lock:
+            count = self._preprocessed_images
+            return {
+                "images": count,
+                "mean_stage_ms": {
+                    stage: round(total / count, 2) for stage, total in self._preprocessing_ms.items()
+                }
+                if count
+                else {},
+            }
+
+    def shutdown(self) -> None:
+        if self._pdf_extractor is not None:
+            self._pdf_extractor.shutdown()
+        if self._worker_pool is not None:
+            self._worker_pool.shutdown()
+
+    def _record_preprocessing(self, stage_ms: Dict[str, float]) -> None:
+        if not stage_ms:
+            return
+        logger.debug(
+            "OCR preprocessing: %s",
+            ", ".join(f"{stage} {ms:.1f}ms" for stage, ms in stage_ms.items()),
+        )
+        with self._stats_lock:
+            self._preprocessed_images += 1
+            for stage, ms in stage_ms.items():
+                self._preprocessing_ms[stage] = self._preprocessing_ms.get(stage, 0.0) + ms
+        trace = current_trace()
+        if trace is not None:
+            for stage, ms in stage_ms.items():
+                trace.add_stage(f"ocr_{stage}", ms / 1000)
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import logging
+import os
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Optional, Tuple, Union
+
+from PIL import Image
+
+if TYPE_CHECKING:
+    from .preprocessing import ImagePreprocessor
+
+logger = logging.getLogger(__name__)
+
+
+def limit_worker_threads() -> None:
+    """Worker process initializer: one tesseract thread per process.
+
+    A pool with one worker per core already saturates the CPU; tesseract's
+    own OpenMP threads would only oversubscribe it.
+    """
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
+class PytesseractEngine:
+    """Runs the tesseract CLI per image; the language model is reloaded on every call."""
+
+    name = "pytesseract"
+
+    def __init__(self, language: str) -> None:
+        self._language = language
+
+    def image_to_string(self, image: Image.Image) -> str:
+        import pytesseract
+
+        return pytesseract.image_to_string(image, lang=self._language)
+
+    def close(self) -> None:
+        pass
+
+
+class TesserocrEngine:
+    """In-process libtesseract (``tesserocr``); the language model stays loaded between images."""
+
+    name = "tesserocr"
+
+    def __init__(self, language: str) -> None:
+        import tesserocr  # optional dependency
+
+        self._api = tesserocr.PyTessBaseAPI(lang=language)
+
+    def image_to_string(self, image: Image.Image) -> str:
+        self._api.SetImage(image)
+        return self._api.GetUTF8Text()
+
+    def close(self) -> None:
+        self._api.End()
+
+
+OCREngine = Union[PytesseractEngine, TesserocrEngine]
+
+
+def load_engine(language: str) -> OCREngine:
+    """``tesserocr`` when it is installed and can load ``language``, else ``pytesseract``."""
+    try:
+        return TesserocrEngine(language)
+    except ImportError:
+        pass
+    except Exception as exc:  # noqa: BLE001 - e.g. missing traineddata for the library build
+        logger.warning("tesserocr unavailable for %s, using pytesseract: %s", language, exc)
+    return PytesseractEngine(language)
+
+
+def require_tesserocr(language: str) -> None:
+    """Raise ``RuntimeError`` unless ``tesserocr`` is installed and can load ``language``."""
+    try:
+        TesserocrEngine(language).close()
+    except Exception as exc:  # noqa: BLE001 - ImportError or a libtesseract init failure
+        raise RuntimeError(f"tesserocr cannot load OCR language {language!r}: {exc}") from exc
+
+
+@lru_cache(maxsize=None)
+def resolved_engine_name(language: str) -> str:
+    """Name of the engine ``load_engine`` picks in this environment, for cache fingerprints."""
+    engine = load_engine(language)
+    engine.close()
+    return engine.name
+
+
+@lru_cache(maxsize=None)
+def process_engine(language: str) -> OCREngine:
+    """One engine per process and language, for long-lived worker processes."""
+    return load_engine(language)
+
+
+def ocr_file(
+    engine: OCREngine, file_path: str, preprocessor: Optional["ImagePreprocessor"] = None
+) -> Tuple[str, Dict[str, float]]:
+    """OCR an image file; returns the text and the preprocessing time per stage (ms)."""
+    with Image.open(file_path) as image:
+        if preprocessor is None:
+            return engine.image_to_string(image), {}
+        image.load()
+        prepared = preprocessor.process(image)
+    return engine.image_to_string(prepared.image), prepared.stage_ms
+
+
+__all__ = [
+    "OCREngine",
+    "PytesseractEngine",
+    "TesserocrEngine",
+    "load_engine",
+    "limit_worker_threads",
+    "ocr_file",
+    "process_engine",
+    "require_tesserocr",
+    "resolved_engine_name",
+]
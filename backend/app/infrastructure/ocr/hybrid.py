@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.domain.services import OCRProgress
+
+from .pdf import PdfPageOCR
+
+logger = logging.getLogger(__name__)
+
+
+def has_text_layer(text: str, *, min_chars: int) -> bool:
+    """Whether extracted page text is real content rather than a scan's empty or garbled layer."""
+    visible = [char for char in text if not char.isspace()]
+    if len(visible) < min_chars:
+        return False
+    # Broken font encodings come out as runs of symbols and replacement characters.
+    readable = sum(1 for char in visible if char.isalnum())
+    return readable / len(visible) >= 0.5
+
+
+class HybridPdfExtractor:
+    """PDF text from the text layer where there is one, OCR for the rest.
+
+    Every page is read with pypdf first; only pages whose text layer is
+    missing or unusable (see ``has_text_layer``) are rasterized and OCRed,
+    in parallel through ``page_ocr``, and their OCR text replaces the text
+    layer when it is not empty. Mixed documents - typed pages with
+    scanned appendices - therefore keep all their content while costing
+    OCR time only for the scanned part. Without ``page_ocr`` each page keeps
+    whatever its text layer has.
+
+    ``extract_text`` OCRs all scanned pages of the document at once;
+    ``iter_pages`` works through it in windows of pages so a caller that
+    only needs the beginning can stop early.
+    """
+
+    def __init__(self, *, page_ocr: Optional[PdfPageOCR] = None, min_page_chars: int = 32) -> None:
+        self._page_ocr = page_ocr
+        self._min_page_chars = max(1, min_page_chars)
+
+    @property
+    def fingerprint(self) -> Dict[str, Any]:
+        fingerprint: Dict[str, Any] = {"pdf_text_layer_min_chars": self._min_page_chars}
+        if self._page_ocr is not None:
+            fingerprint.update(self._page_ocr.fingerprint)
+        return fingerprint
+
+    def extract_text(
+        self,
+        file_path: str,
+        *,
+        progress: Optional[OCRProgress] = None,
+        failed_pages: Optional[List[int]] = None,
+    ) -> str:
+        from pypdf import PdfReader
+
+        reader = PdfReader(file_path, strict=False)
+        texts, missing = self._read_text_layers(file_path, reader, range(len(reader.pages)))
+        if missing and self._page_ocr is not None:
+            logger.info(
+                "%d of %d pages of %s have no text layer, OCRing them",
+                len(missing),
+                len(texts),
+                file_path,
+            )
+            _merge_ocr(
+                texts,
+                self._page_ocr.ocr_pages(
+                    file_path, missing, progress=progress, failed_pages=failed_pages
+                ),
+            )
+
+        return "\n".join(text for _, text in sorted(texts.items()) if text.strip())
+
+    def iter_pages(
+        self, file_path: str, *, progress: Optional[OCRProgress] = None
+    ) -> Iterator[str]:
+        """Non-empty page texts in order, read lazily.
+
+        Pages are taken in windows of twice the OCR worker count, so the
+        scanned pages of a window are still OCRed in parallel; pages after
+        the window the caller stopped in are never read. At most
+        ``max_pages`` pages are OCRed in total. ``progress`` gets the number
+        of pages of the document read so far, OCRed pages as they finish.
+        """
+        from pypdf import PdfReader
+
+        reader = PdfReader(file_path, strict=False)
+        total = len(reader.pages)
+        window = 2 * self._page_ocr.max_workers if self._page_ocr is not None else 1
+        ocr_budget = self._page_ocr.max_pages if self._page_ocr is not None else 0
+        for start in range(0, total, window):
+            end = min(total, start + window)
+            texts, missing = self._read_text_layers(file_path, reader, range(start, end))
+            if missing and self._page_ocr is not None:
+                if len(missing) > ocr_budget:
+                    logger.warning(
+                        "OCR limit of %d pages reached for %s, skipping scanned pages from %d",
+                        self._page_ocr.max_pages,
+                        file_path,
+                        missing[ocr_budget] + 1,
+                    )
+                    missing = missing[:ocr_budget]
+                ocr_budget -= len(missing)
+                if missing:
+                    window_progress = _offset_progress(progress, end - len(missing), total)
+                    _merge_ocr(
+                        texts,
+                        self._page_ocr.ocr_pages(file_path, missing, progress=window_progress),
+                    )
+            if progress is not None:
+                progress(end, total)
+            for _, text in sorted(texts.items()):
+                if text.strip():
+                    yield text
+
+    def _read_text_layers(
+        self, file_path: str, reader: Any, indexes: Iterable[int]
+    ) -> Tuple[Dict[int, str], List[int]]:
+        """Text layer of each page; pages without a usable one are also listed as missing.
+
+        A short or garbled text layer is kept, so the page still has its
+        text when OCR is disabled or returns nothing for it.
+        """
+        texts: Dict[int, str] = {}
+        missing: List[int] = []
+        for index in indexes:
+            try:
+                text = reader.pages[index].extract_text() or ""
+            except Exception as exc:  # noqa: BLE001 - treat like a page without text
+                logger.debug("Text layer of page %d of %s unreadable: %s", index + 1, file_path, exc)
+                text = ""
+            if not has_text_layer(text, min_chars=self._min_page_chars):
+                missing.append(index)
+            texts[index] = text
+        return texts, missing
+
+    def shutdown(self) -> None:
+        if self._page_ocr is not None:
+            self._page_ocr.shutdown()
+
+
+def _merge_ocr(texts: Dict[int, str], ocr_texts: Dict[int, str]) -> None:
+    """Replace text layers with OCR text, except where OCR found nothing."""
+    for index, text in ocr_texts.items():
+        if text.strip():
+            texts[index] = text
+
+
+def _offset_progress(
+    progress: Optional[OCRProgress], offset: int, total: int
+) -> Optional[OCRProgress]:
+    """Report a window's OCR progress as pages of the whole document."""
+    if progress is None:
+        return None
+    return lambda done, _: progress(offset + done, total)
+
+
+__all__ = ["HybridPdfExtractor", "has_text_layer"]
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.domain.services import OCRProgress
+
+from .engine import limit_worker_threads, process_engine, resolved_engine_name
+
+logger = logging.getLogger(__name__)
+
+_PDF_MAGIC = b"%PDF-"
+
+
+def is_pdf(file_path: str) -> bool:
+    """Sniff the header rather than trust the extension."""
+    try:
+        with open(file_path, "rb") as handle:
+            return handle.read(len(_PDF_MAGIC)) == _PDF_MAGIC
+    except OSError:
+        return False
+
+
+def count_pdf_pages(file_path: str) -> int:
+    from pypdf import PdfReader
+
+    return len(PdfReader(file_path, strict=False).pages)
+
+
+def _ocr_page(file_path: str, page_number: int, dpi: int, language: str) -> str:
+    """Rasterize and OCR a single page (1-based); runs in a worker process."""
+    from pdf2image import convert_from_path
+
+    images = convert_from_path(
+        file_path,
+        dpi=dpi,
+        first_page=page_number,
+        last_page=page_number,
+        grayscale=True,
+    )
+    engine = process_engine(language)
+    try:
+        return "\n".join(engine.image_to_string(image) for image in images)
+    finally:
+        for image in images:
+            image.close()
+
+
+class PdfPageOCR:
+    """OCR for scanned PDFs, one page per worker process.
+
+    Each page is rasterized and OCRed in its own worker, so both steps run in
+    parallel and a document of N pages takes about N / workers page-times.
+    Text is reassembled in page order; pages beyond ``max_pages`` are
+    skipped and a page that fails contributes no text rather than failing
+    the document, but is reported through ``failed_pages``. The pool is created on first use and kept for later calls.
+    """
+
+    def __init__(
+        self,
+        *,
+        language: str = "pol",
+        dpi: int = 300,
+        max_pages: int = 100,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        self._language = language
+        self._dpi = dpi
+        self._max_pages = max(1, max_pages)
+        self._max_workers = max(1, max_workers or os.cpu_count() or 1)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def fingerprint(self) -> Dict[str, Any]:
+        return {
+            "pdf_engine": resolved_engine_name(self._language),
+            "pdf_dpi": self._dpi,
+            "pdf_max_pages": self._max_pages,
+        }
+
+    @property
+    def max_pages(self) -> int:
+        return self._max_pages
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    def extract_text(
+        self,
+        file_path: str,
+        *,
+        progress: Optional[OCRProgress] = None,
+        failed_pages: Optional[List[int]] = None,
+    ) -> str:
+        texts = self.ocr_pages(
+            file_path,
+            range(count_pdf_pages(file_path)),
+            progress=progress,
+            failed_pages=failed_pages,
+        )
+        return "\n\n".join(text.strip() for _, text in sorted(texts.items()) if text.strip())
+
+    def ocr_pages(
+        self,
+        file_path: str,
+        page_indexes: Sequence[int],
+        *,
+        progress: Optional[OCRProgress] = None,
+        failed_pages: Optional[List[int]] = None,
+    ) -> Dict[int, str]:
+        """OCR the given 0-based pages in parallel; returns text per page index.
+
+        Only the first ``max_pages`` of ``page_indexes`` are processed; pages
+        that fail map to "" and their 1-based numbers are appended to
+        ``failed_pages``.
+        """
+        pages = list(page_indexes)[: self._max_pages]
+        if len(page_indexes) > len(pages):
+            logger.warning(
+                "OCR limited to %d of %d pages of %s", len(pages), len(page_indexes), file_path
+            )
+        texts: Dict[int, str] = {index: "" for index in pages}
+        if not pages:
+            return texts
+
+        started = time.perf_counter()
+        executor = self._pool()
+        pending: Dict[Future, int] = {
+            executor.submit(_ocr_page, file_path, index + 1, self._dpi, self._language): index
+            for index in pages
+        }
+        done_count = 0
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = pending.pop(future)
+                    try:
+                        texts[index] = future.result()
+                    except BrokenProcessPool:
+                        self._discard(executor)
+                        raise
+                    except Exception as exc:  # noqa: BLE001 - keep the other pages
+                        logger.warning("OCR of page %d of %s failed: %s", index + 1, file_path, exc)
+                        if failed_pages is not None:
+                            failed_pages.append(index + 1)
+                    done_count += 1
+                    logger.debug(
+                        "OCR progress for %s: %d/%d pages", file_path, done_count, len(pages)
+                    )
+                    if progress is not None:
+                        progress(done_count, len(pages))
+        finally:
+            for future in pending:
+                future.cancel()
+
+        logger.info(
+            "OCRed %d pages of %s in %.1fs with %d workers",
+            len(pages),
+            file_path,
+            time.perf_counter() - started,
+            self._max_workers,
+        )
+        return texts
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Spawned, not forked: the server process holds threads and sockets.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self._max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=limit_worker_threads,
+                )
+            return self._executor
+
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        """Drop a broken pool so the next call starts a fresh one."""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+__all__ = ["PdfPageOCR", "count_pdf_pages", "is_pdf"]
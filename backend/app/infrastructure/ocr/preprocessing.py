@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import dataclasses
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Tuple
+
+import numpy as np
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Long side of an A4 page in inches; photos are scaled as if they showed one page.
+_PAGE_LONG_SIDE_INCHES = 11.7
+# Deskew scores angles on a copy no larger than this (pixels, long side).
+_DESKEW_SAMPLE_SIDE = 1000
+# Share of dark pixels under which a row or column is blank paper, and over
+# which it is background around the page rather than text.
+_BLANK_INK_SHARE = 0.002
+_SOLID_INK_SHARE = 0.9
+
+
+@dataclass(frozen=True, slots=True)
+class PreprocessingConfig:
+    """Which preprocessing stages run; also part of the OCR cache key."""
+
+    target_dpi: int = 300
+    binarize: bool = True
+    deskew: bool = True
+    max_skew_degrees: float = 5.0
+    crop_borders: bool = True
+    border_margin: int = 20
+
+
+@dataclass(slots=True)
+class PreprocessedImage:
+    image: Image.Image
+    # Milliseconds spent per stage, in the order the stages ran.
+    stage_ms: Dict[str, float]
+
+
+class ImagePreprocessor:
+    """Normalises photos and scans before OCR.
+
+    Stages: apply the EXIF orientation, downscale to ``target_dpi`` (a
+    4000x3000 phone photo of a page carries far more pixels than tesseract
+    needs), convert to grayscale, binarise with Otsu's threshold, crop
+    empty borders and the background around the page, and correct small
+    rotations by maximising the variance of the row projection profile.
+    Each stage is timed. Instances are picklable, so OCR worker processes
+    can run them.
+    """
+
+    def __init__(self, config: PreprocessingConfig = PreprocessingConfig()) -> None:
+        self._config = config
+
+    @property
+    def config(self) -> PreprocessingConfig:
+        return self._config
+
+    @property
+    def fingerprint(self) -> Dict[str, Any]:
+        return {"preprocessing": dataclasses.asdict(self._config)}
+
+    def process(self, image: Image.Image) -> PreprocessedImage:
+        config = self._config
+        stage_ms: Dict[str, float] = {}
+
+        def run(name: str, stage, current: Image.Image) -> Image.Image:
+            started = time.perf_counter()
+            result = stage(current)
+            stage_ms[name] = (time.perf_counter() - started) * 1000
+            return result
+
+        image = run("exif", ImageOps.exif_transpose, image)
+        image = run("downscale", self._downscale, image)
+        image = run("grayscale", _grayscale, image)
+        if config.binarize:
+            image = run("binarize", _binarize, image)
+        # Cropping first keeps a dark background around the page from
+        # dominating the projection profile deskew relies on.
+        if config.crop_borders:
+            image = run("crop", self._crop, image)
+        if config.deskew:
+            image = run("deskew", self._deskew, image)
+        return PreprocessedImage(image=image, stage_ms=stage_ms)
+
+    def _downscale(self, image: Image.Image) -> Image.Image:
+        target_dpi = self._config.target_dpi
+        scale = 1.0
+        dpi = _image_dpi(image)
+        if dpi and dpi > target_dpi:
+            scale = target_dpi / dpi
+        # Photo metadata usually claims 72 dpi, so cap the size by page geometry as well.
+        max_side = int(_PAGE_LONG_SIDE_INCHES * target_dpi)
+        scale = min(scale, max_side / max(image.size))
+        if scale >= 1.0:
+            return image
+        size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        resized = image.resize(size, Image.LANCZOS, reducing_gap=3.0)
+        resized.info["dpi"] = (target_dpi, target_dpi)
+        return resized
+
+    def _deskew(self, image: Image.Image) -> Image.Image:
+        angle = estimate_skew(image, max_degrees=self._config.max_skew_degrees)
+        if abs(angle) < 0.1:
+            return image
+        logger.debug("Deskewing by %.2f degrees", angle)
+        return image.rotate(angle, resample=Image.BICUBIC, expand=True, fillcolor=255)
+
+    def _crop(self, image: Image.Image) -> Image.Image:
+        # Rows and columns that are blank paper, or solid dark (the table or
+        # scanner lid around the page), are trimmed from the edges; trimming
+        # rows first lets the columns be judged on the page area only.
+        ink = np.asarray(image, dtype=np.uint8) < 128
+        top, bottom, left, right = 0, ink.shape[0], 0, ink.shape[1]
+        for _ in range(2):
+            top, bottom = _content_span(ink[top:bottom, left:right].mean(axis=1), top)
+            left, right = _content_span(ink[top:bottom, left:right].mean(axis=0), left)
+            if top >= bottom or left >= right:
+                return image
+        margin = self._config.border_margin
+        box = (
+            max(0, left - margin),
+            max(0, top - margin),
+            min(image.width, right + margin),
+            min(image.height, bottom + margin),
+        )
+        return image.crop(box) if box != (0, 0, image.width, image.height) else image
+
+
+def _content_span(ink_share: np.ndarray, offset: int) -> Tuple[int, int]:
+    """First and past-the-last index (plus ``offset``) of lines that carry content."""
+    content = np.flatnonzero((ink_share > _BLANK_INK_SHARE) & (ink_share < _SOLID_INK_SHARE))
+    if not len(content):
+        return offset, offset
+    return offset + int(content[0]), offset + int(content[-1]) + 1
+
+
+def _image_dpi(image: Image.Image) -> float:
+    dpi = image.info.get("dpi")
+    if not dpi:
+        return 0.0
+    try:
+        return float(max(dpi[:2]))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _grayscale(image: Image.Image) -> Image.Image:
+    if image.mode in ("RGBA", "LA", "P"):
+        # Transparent areas become white paper, not black.
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image.convert("RGBA"), mask=image.convert("RGBA").getchannel("A"))
+        image = background
+    return image if image.mode == "L" else image.convert("L")
+
+
+def otsu_threshold(pixels: np.ndarray) -> int:
+    histogram = np.bincount(pixels.ravel(), minlength=256).astype(np.float64)
+    total = histogram.sum()
+    if total == 0:
+        return 128
+    levels = np.arange(256, dtype=np.float64)
+    weight_background = np.cumsum(histogram)
+    weight_foreground = total - weight_background
+    cumulative_mean = np.cumsum(histogram * levels)
+    mean_background = cumulative_mean / np.maximum(weight_background, 1)
+    mean_foreground = (cumulative_mean[-1] - cumulative_mean) / np.maximum(weight_foreground, 1)
+    between = weight_background * weight_foreground * (mean_background - mean_foreground) ** 2
+    return int(np.argmax(between))
+
+
+def _binarize(image: Image.Image) -> Image.Image:
+    threshold = otsu_threshold(np.asarray(image, dtype=np.uint8))
+    # Kept in mode "L": tesseract and the later stages expect 8-bit input.
+    return image.point(lambda value: 255 if value > threshold else 0)
+
+
+def estimate_skew(image: Image.Image, *, max_degrees: float = 5.0, step: float = 0.25) -> float:
+    """Rotation (degrees, counter-clockwise) that best aligns text lines with the rows.
+
+    Text lines produce sharp peaks in the row sums of dark pixels when they
+    are horizontal, so the angle with the highest variance of the profile
+    wins. A coarse pass is refined around the best candidate.
+    """
+    sample = image if image.mode == "L" else image.convert("L")
+    if max(sample.size) > _DESKEW_SAMPLE_SIDE:
+        ratio = _DESKEW_SAMPLE_SIDE / max(sample.size)
+        sample = sample.resize(
+            (max(1, round(sample.width * ratio)), max(1, round(sample.height * ratio))),
+            Image.BILINEAR,
+        )
+    ink = ImageOps.invert(sample)
+
+    def score(angle: float) -> float:
+        rotated = np.asarray(ink.rotate(angle, resample=Image.NEAREST), dtype=np.float32)
+        return float(np.var(rotated.sum(axis=1)))
+
+    coarse = np.arange(-max_degrees, max_degrees + 1e-9, 1.0)
+    best = max(coarse, key=score)
+    fine = np.arange(best - 1.0, best + 1.0 + 1e-9, step)
+    return float(max(fine, key=score))
+
+
+__all__ = [
+    "ImagePreprocessor",
+    "PreprocessedImage",
+    "PreprocessingConfig",
+    "estimate_skew",
+    "otsu_threshold",
+]
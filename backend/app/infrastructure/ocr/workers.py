@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import queue
+import threading
+from dataclasses import dataclass
+from multiprocessing.connection import Connection
+from typing import Any, Dict, List, Optional, Tuple
+
+from .engine import limit_worker_threads, ocr_file, process_engine, resolved_engine_name
+from .preprocessing import ImagePreprocessor
+
+logger = logging.getLogger(__name__)
+
+_PING = "ping"
+_OCR = "ocr"
+
+
+class OCRJobError(RuntimeError):
+    """The worker is healthy but could not OCR the file (unreadable image, ...)."""
+
+
+class OCRWorkerUnavailable(RuntimeError):
+    """No worker became free in time, or the worker died or hung mid-job."""
+
+
+def _worker_main(
+    conn: Connection, language: str, preprocessor: Optional[ImagePreprocessor]
+) -> None:
+    """Loop of a worker process: load the engine once, then answer requests until told to stop."""
+    limit_worker_threads()
+    engine = process_engine(language)
+    conn.send(("ok", engine.name))
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                break
+            if message is None:
+                break
+            kind, payload = message
+            try:
+                result = engine.name if kind == _PING else ocr_file(engine, payload, preprocessor)
+            except Exception as exc:  # noqa: BLE001 - reported to the caller
+                conn.send(("error", f"{exc.__class__.__name__}: {exc}"))
+            else:
+                conn.send(("ok", result))
+    finally:
+        engine.close()
+
+
+class _Worker:
+    def __init__(
+        self,
+        context: Any,
+        language: str,
+        preprocessor: Optional[ImagePreprocessor],
+        number: int,
+    ) -> None:
+        parent, child = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child, language, preprocessor),
+            name=f"ocr-worker-{number}",
+            daemon=True,
+        )
+        self.process.start()
+        child.close()
+        self.conn = parent
+        self.jobs = 0
+        self.engine = ""
+
+    def call(self, message: Tuple[str, Any], timeout: float) -> Any:
+        self.conn.send(message)
+        return self.result(timeout)
+
+    def result(self, timeout: float) -> Any:
+        if not self.conn.poll(timeout):
+            raise TimeoutError(f"{self.process.name} did not answer within {timeout:.0f}s")
+        status, value = self.conn.recv()
+        if status == "error":
+            raise OCRJobError(value)
+        return value
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=1.0)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(timeout=1.0)
+        self.conn.close()
+
+
+@dataclass(frozen=True, slots=True)
+class OCRPoolStats:
+    size: int
+    idle: int
+    jobs: int
+    failures: int
+    restarts: int
+    engine: str
+
+
+class OCRWorkerPool:
+    """Long-lived OCR worker processes that keep the language model loaded.
+
+    Each worker loads its engine once (``tesserocr`` when installed, which
+    keeps libtesseract and the traineddata in memory; otherwise
+    ``pytesseract``) and then serves requests over a pipe, running
+    ``preprocessor`` on each image first. Idle workers wait
+    in a queue: a request takes one, so at most ``size`` OCR jobs run at
+    once and further requests wait up to ``timeout`` for a free worker.
+
+    A worker that crashes or does not answer within ``timeout`` is killed
+    and replaced; one that served ``max_jobs_per_worker`` requests is
+    recycled to bound leaks. A background thread pings idle workers every
+    ``healthcheck_interval`` seconds and replaces those that fail. Workers
+    are started on first use.
+    """
+
+    def __init__(
+        self,
+        *,
+        language: str = "pol",
+        preprocessor: Optional[ImagePreprocessor] = None,
+        size: int = 2,
+        timeout: float = 120.0,
+        healthcheck_interval: float = 30.0,
+        max_jobs_per_worker: int = 500,
+    ) -> None:
+        self._language = language
+        self._preprocessor = preprocessor
+        self._size = max(1, size)
+        self._timeout = timeout
+        self._healthcheck_interval = healthcheck_interval
+        self._max_jobs_per_worker = max(1, max_jobs_per_worker)
+        # Spawned, not forked: the server process holds threads and sockets.
+        self._context = multiprocessing.get_context("spawn")
+
+        self._lock = threading.Lock()
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._workers: List[_Worker] = []
+        self._started = False
+        self._closed = threading.Event()
+        self._spawned = 0
+        # Workers being started, counted so the pool never grows past ``size``.
+        self._starting = 0
+        self._jobs = 0
+        self._failures = 0
+        self._restarts = 0
+        self._engine = ""
+
+    def ocr_file(self, file_path: str) -> Tuple[str, Dict[str, float]]:
+        """OCR an image; returns the text and preprocessing time per stage (ms)."""
+        worker = self._acquire()
+        try:
+            text, stage_ms = worker.call((_OCR, file_path), self._timeout)
+        except OCRJobError:
+            self._count(failed=True)
+            self._finish(worker)
+            raise
+        except (TimeoutError, EOFError, OSError) as exc:
+            self._count(failed=True)
+            logger.warning("OCR worker %s failed, restarting it: %s", worker.process.name, exc)
+            self._replace(worker)
+            raise OCRWorkerUnavailable(str(exc) or exc.__class__.__name__) from exc
+        self._count(failed=False)
+        self._finish(worker)
+        return text, stage_ms
+
+    @property
+    def engine_name(self) -> str:
+        """Engine the workers run; resolved locally until the first worker reports it."""
+        return self._engine or resolved_engine_name(self._language)
+
+    def healthcheck(self) -> int:
+        """Ping every idle worker; returns how many had to be replaced."""
+        checked: List[_Worker] = []
+        while True:
+            try:
+                checked.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        replaced = 0
+        for worker in checked:
+            try:
+                worker.call((_PING, None), min(self._timeout, 10.0))
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("OCR worker %s failed its health check: %s", worker.process.name, exc)
+                self._replace(worker)
+                replaced += 1
+            else:
+                self._release(worker)
+        return replaced
+
+    def stats(self) -> OCRPoolStats:
+        with self._lock:
+            return OCRPoolStats(
+                size=self._size,
+                idle=self._idle.qsize(),
+                jobs=self._jobs,
+                failures=self._failures,
+                restarts=self._restarts,
+                engine=self._engine,
+            )
+
+    def shutdown(self) -> None:
+        self._closed.set()
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.stop()
+
+    def _acquire(self) -> _Worker:
+        self._ensure_started()
+        try:
+            return self._idle.get(timeout=self._timeout)
+        except queue.Empty:
+            raise OCRWorkerUnavailable(
+                f"No OCR worker became free within {self._timeout:.0f}s"
+            ) from None
+
+    def _finish(self, worker: _Worker) -> None:
+        worker.jobs += 1
+        if worker.jobs >= self._max_jobs_per_worker:
+            self._replace(worker, restart=False)
+        else:
+            self._release(worker)
+
+    def _release(self, worker: _Worker) -> None:
+        if self._closed.is_set():
+            worker.stop()
+        else:
+            self._idle.put(worker)
+
+    def _replace(self, worker: _Worker, *, restart: bool = True) -> None:
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+            if restart:
+                self._restarts += 1
+            self._starting += 1
+        worker.stop()
+        self._start_reserved()
+
+    def _start_reserved(self) -> None:
+        """Start a worker for a slot already counted in ``_starting``."""
+        try:
+            if not self._closed.is_set():
+                self._release(self._spawn())
+        except Exception:  # noqa: BLE001 - the health check will retry
+            logger.exception("Could not start an OCR worker")
+        finally:
+            with self._lock:
+                self._starting -= 1
+
+    def _spawn(self) -> _Worker:
+        with self._lock:
+            self._spawned += 1
+            number = self._spawned
+        worker = _Worker(self._context, self._language, self._preprocessor, number)
+        try:
+            # The first message is sent once the engine (and its model) is loaded.
+            worker.engine = worker.result(self._timeout)
+        except Exception:
+            worker.stop()
+            raise
+        with self._lock:
+            self._workers.append(worker)
+            self._engine = worker.engine
+        return worker
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            self._starting += self._size
+        for _ in range(self._size):
+            self._start_reserved()
+        logger.info("Started %d OCR workers (%s)", len(self._workers), self._engine)
+        if self._healthcheck_interval > 0:
+            threading.Thread(
+                target=self._healthcheck_loop, name="ocr-pool-health", daemon=True
+            ).start()
+
+    def _healthcheck_loop(self) -> None:
+        while not self._closed.wait(self._healthcheck_interval):
+            try:
+                self.healthcheck()
+                self._top_up()
+            except Exception:  # noqa: BLE001 - keep checking
+                logger.exception("OCR pool health check failed")
+
+    def _top_up(self) -> None:
+        """Restore the pool size after workers that could not be started."""
+        with self._lock:
+            missing = max(0, self._size - len(self._workers) - self._starting)
+            self._starting += missing
+        for _ in range(missing):
+            self._start_reserved()
+
+    def _count(self, *, failed: bool) -> None:
+        with self._lock:
+            self._jobs += 1
+            if failed:
+                self._failures += 1
+
+
+__all__ = ["OCRJobError", "OCRPoolStats", "OCRWorkerPool", "OCRWorkerUnavailable"]
@@ -1,10 +1,14 @@
 """SQLModel-based repository implementations."""
 
 from .mappers import (
+    bank_entry_to_domain,
     file_to_domain,
     file_to_row,
+    generation_run_to_domain,
+    generation_run_to_row,
     material_to_domain,
     material_to_row,
+    question_to_bank_entry,
     question_to_domain,
     question_to_row,
     test_to_domain,
@@ -14,16 +18,22 @@ from .mappers import (
 )
 from .repositories import (
     SqlModelFileRepository,
+    SqlModelGenerationRunRepository,
     SqlModelMaterialRepository,
+    SqlModelQuestionBankRepository,
     SqlModelTestRepository,
     SqlModelUserRepository,
 )
 
 __all__ = [
+    "bank_entry_to_domain",
     "file_to_domain",
     "file_to_row",
+    "generation_run_to_domain",
+    "generation_run_to_row",
     "material_to_domain",
     "material_to_row",
+    "question_to_bank_entry",
     "question_to_domain",
     "question_to_row",
     "test_to_domain",
@@ -31,7 +41,9 @@ __all__ = [
     "user_to_domain",
     "user_to_row",
     "SqlModelFileRepository",
+    "SqlModelGenerationRunRepository",
     "SqlModelMaterialRepository",
+    "SqlModelQuestionBankRepository",
     "SqlModelTestRepository",
     "SqlModelUserRepository",
 ]
@@ -5,7 +5,7 @@ from pathlib import Path
 from typing import Iterable, Optional
 
 from app.db import models as db_models
-from app.domain.models import File, Material, Question, Test, User
+from app.domain.models import File, GenerationRun, Material, Question, Test, User
 from app.domain.models.enums import ProcessingStatus, QuestionDifficulty
 
 
@@ -54,6 +54,94 @@ def question_to_row(question: Question, test_id: int) -> db_models.Question:
     )
 
 
+def bank_entry_to_domain(row: db_models.QuestionBankEntry) -> Question:
+    return Question(
+        id=row.id,
+        text=row.text,
+        is_closed=row.is_closed,
+        difficulty=QuestionDifficulty(row.difficulty),
+        choices=row.choices or [],
+        correct_choices=row.correct_choices or [],
+    )
+
+
+def question_to_bank_entry(
+    question: Question, *, source_checksum: str, fingerprint: str
+) -> db_models.QuestionBankEntry:
+    return db_models.QuestionBankEntry(
+        source_checksum=source_checksum,
+        fingerprint=fingerprint,
+        question_type=question.kind.value,
+        text=question.text,
+        is_closed=question.is_closed,
+        difficulty=question.difficulty.value,
+        choices=question.choices or None,
+        correct_choices=question.correct_choices or None,
+    )
+
+
+def generation_run_to_domain(row: db_models.GenerationRun) -> GenerationRun:
+    return GenerationRun(
+        id=row.id,
+        owner_id=row.owner_id,
+        test_id=row.test_id,
+        source_kind=row.source_kind,
+        status=row.status,
+        error_class=row.error_class,
+        model_name=row.model_name,
+        questions_requested=row.questions_requested,
+        questions_returned=row.questions_returned,
+        questions_saved=row.questions_saved,
+        reused_from_bank=row.reused_from_bank,
+        source_chars=row.source_chars,
+        prompt_chars=row.prompt_chars,
+        response_chars=row.response_chars,
+        prompt_tokens=row.prompt_tokens,
+        output_tokens=row.output_tokens,
+        total_tokens=row.total_tokens,
+        llm_calls=row.llm_calls,
+        cost_usd=row.cost_usd,
+        source_ms=row.source_ms,
+        prompt_ms=row.prompt_ms,
+        llm_ms=row.llm_ms,
+        parse_ms=row.parse_ms,
+        store_ms=row.store_ms,
+        total_ms=row.total_ms,
+        created_at=row.created_at,
+    )
+
+
+def generation_run_to_row(run: GenerationRun) -> db_models.GenerationRun:
+    return db_models.GenerationRun(
+        id=run.id,
+        owner_id=run.owner_id,
+        test_id=run.test_id,
+        source_kind=run.source_kind,
+        status=run.status,
+        error_class=run.error_class,
+        model_name=run.model_name,
+        questions_requested=run.questions_requested,
+        questions_returned=run.questions_returned,
+        questions_saved=run.questions_saved,
+        reused_from_bank=run.reused_from_bank,
+        source_chars=run.source_chars,
+        prompt_chars=run.prompt_chars,
+        response_chars=run.response_chars,
+        prompt_tokens=run.prompt_tokens,
+        output_tokens=run.output_tokens,
+        total_tokens=run.total_tokens,
+        llm_calls=run.llm_calls,
+        cost_usd=run.cost_usd,
+        source_ms=run.source_ms,
+        prompt_ms=run.prompt_ms,
+        llm_ms=run.llm_ms,
+        parse_ms=run.parse_ms,
+        store_ms=run.store_ms,
+        total_ms=run.total_ms,
+        created_at=run.created_at or datetime.utcnow(),
+    )
+
+
 def test_to_domain(row: db_models.Test, questions: Optional[Iterable[db_models.Question]] = None) -> Test:
     question_models = list(questions) if questions is not None else list(row.questions or [])
     return Test(
@@ -1,15 +1,20 @@
 from __future__ import annotations
 
+import hashlib
+from datetime import datetime
 from typing import Iterable, List
 
 from sqlalchemy.orm import Session
 from sqlmodel import select
 
 from app.db import models as db_models
-from app.domain.models import File, Material, Question, Test, User
+from app.domain.models import File, GenerationRun, Material, Question, Test, User
+from app.domain.models.enums import ProcessingStatus
 from app.domain.repositories import (
     FileRepository,
+    GenerationRunRepository,
     MaterialRepository,
+    QuestionBankRepository,
     TestRepository,
     UserRepository,
 )
@@ -84,6 +89,16 @@ class SqlModelTestRepository(TestRepository):
         rows = self._session.exec(stmt).all()
         return [mappers.test_to_domain(row) for row in rows]
 
+    def list_questions_for_user(self, user_id: int, *, limit: int) -> Iterable[Question]:
+        stmt = (
+            select(db_models.Question)
+            .join(db_models.Test, db_models.Test.id == db_models.Question.test_id)
+            .where(db_models.Test.owner_id == user_id)
+            .order_by(db_models.Question.id.desc())
+            .limit(limit)
+        )
+        rows = self._session.exec(stmt).all()
+        return [mappers.question_to_domain(row) for row in rows]
 
     def remove(self, test_id: int) -> None:
         db_test = self._session.get(db_models.Test, test_id)
@@ -134,6 +149,11 @@ class SqlModelMaterialRepository(MaterialRepository):
         db_material = self._session.get(db_models.Material, material_id)
         return mappers.material_to_domain(db_material) if db_material else None
 
+    def get_by_file(self, file_id: int) -> Material | None:
+        stmt = select(db_models.Material).where(db_models.Material.file_id == file_id)
+        db_material = self._session.exec(stmt).first()
+        return mappers.material_to_domain(db_material) if db_material else None
+
     def list_for_user(self, user_id: int) -> Iterable[Material]:
         stmt = select(db_models.Material).where(db_models.Material.owner_id == user_id)
         rows = self._session.exec(stmt).all()
@@ -142,6 +162,14 @@ class SqlModelMaterialRepository(MaterialRepository):
             materials.append(mappers.material_to_domain(row))
         return materials
 
+    def list_by_status(self, status: ProcessingStatus) -> Iterable[Material]:
+        stmt = (
+            select(db_models.Material)
+            .where(db_models.Material.processing_status == db_models.ProcessingStatus(status.value))
+            .order_by(db_models.Material.id)
+        )
+        return [mappers.material_to_domain(row) for row in self._session.exec(stmt).all()]
+
     def update(self, material: Material) -> Material:
         db_material = self._session.get(db_models.Material, material.id)
         if not db_material:
@@ -166,10 +194,98 @@ class SqlModelMaterialRepository(MaterialRepository):
             self._session.commit()
 
 
+def _bank_fingerprint(question: Question) -> str:
+    # Exact-match identity only; near-duplicates are the deduplicator's job.
+    choices = sorted(" ".join(choice.split()).casefold() for choice in question.choices or [])
+    text = " ".join(question.text.split()).casefold()
+    payload = "\x1f".join([question.kind.value, text, *choices])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SqlModelQuestionBankRepository(QuestionBankRepository):
+    def __init__(self, session: Session):
+        self._session = session
+
+    def add_many(self, checksum: str, questions: Iterable[Question], *, used: bool = False) -> int:
+        candidates = {}
+        for question in questions:
+            candidates.setdefault(_bank_fingerprint(question), question)
+        if not candidates:
+            return 0
+
+        stmt = select(db_models.QuestionBankEntry.fingerprint).where(
+            db_models.QuestionBankEntry.source_checksum == checksum,
+            db_models.QuestionBankEntry.fingerprint.in_(list(candidates)),
+        )
+        existing = set(self._session.exec(stmt).all())
+        now = datetime.utcnow()
+        added = 0
+        for fingerprint, question in candidates.items():
+            if fingerprint in existing:
+                continue
+            row = mappers.question_to_bank_entry(
+                question, source_checksum=checksum, fingerprint=fingerprint
+            )
+            if used:
+                row.times_used = 1
+                row.last_used_at = now
+            self._session.add(row)
+            added += 1
+        self._session.commit()
+        return added
+
+    def list_for_source(self, checksum: str, *, limit: int) -> List[Question]:
+        stmt = (
+            select(db_models.QuestionBankEntry)
+            .where(db_models.QuestionBankEntry.source_checksum == checksum)
+            .order_by(
+                db_models.QuestionBankEntry.times_used.asc(),
+                db_models.QuestionBankEntry.id.asc(),
+            )
+            .limit(limit)
+        )
+        return [mappers.bank_entry_to_domain(row) for row in self._session.exec(stmt).all()]
+
+    def mark_used(self, entry_ids: Iterable[int]) -> None:
+        ids = list(entry_ids)
+        if not ids:
+            return
+        stmt = select(db_models.QuestionBankEntry).where(db_models.QuestionBankEntry.id.in_(ids))
+        now = datetime.utcnow()
+        for row in self._session.exec(stmt).all():
+            row.times_used += 1
+            row.last_used_at = now
+            self._session.add(row)
+        self._session.commit()
+
+
+class SqlModelGenerationRunRepository(GenerationRunRepository):
+    def __init__(self, session: Session):
+        self._session = session
+
+    def add(self, run: GenerationRun) -> GenerationRun:
+        db_run = mappers.generation_run_to_row(run)
+        self._session.add(db_run)
+        self._session.commit()
+        self._session.refresh(db_run)
+        return mappers.generation_run_to_domain(db_run)
+
+    def list_since(self, since: datetime, *, limit: int) -> List[GenerationRun]:
+        stmt = (
+            select(db_models.GenerationRun)
+            .where(db_models.GenerationRun.created_at >= since)
+            .order_by(db_models.GenerationRun.created_at.desc())
+            .limit(limit)
+        )
+        return [mappers.generation_run_to_domain(row) for row in self._session.exec(stmt).all()]
+
+
 __all__ = [
     "SqlModelUserRepository",
     "SqlModelTestRepository",
     "SqlModelFileRepository",
     "SqlModelMaterialRepository",
+    "SqlModelQuestionBankRepository",
+    "SqlModelGenerationRunRepository",
 ]
 
@@ -0,0 +1,270 @@
+"""Load test for the generate -> read -> export path.
+
+Drives the API at a fixed arrival rate (open loop: requests start on
+schedule whether or not earlier ones have finished) and reports latency
+percentiles per endpoint.
+
+By default the app is built in-process with ``create_app`` and served
+through ``httpx.ASGITransport``, with ``LLM_PROVIDER=fake`` so no Gemini
+calls are made; tune the fake with the ``FAKE_LLM_*`` settings. The
+configured ``DATABASE_URL`` must point at PostgreSQL (the schema uses
+JSONB), e.g. the ``db`` service from docker compose. Pass ``--base-url``
+to target a running server instead.
+
+    cd backend
+    python -m benchmarks.loadtest --rps 20 --duration 60
+    FAKE_LLM_FAILURE_RATE=0.05 python -m benchmarks.loadtest --export pdf
+    python -m benchmarks.loadtest --base-url http://localhost:8000 --rps 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+
+_SAMPLE_TEXT = (
+    "Fotosynteza to proces, w którym rośliny zielone wytwarzają związki organiczne "
+    "z dwutlenku węgla i wody przy udziale energii świetlnej. Zachodzi ona w "
+    "chloroplastach, a kluczową rolę odgrywa chlorofil pochłaniający światło "
+    "czerwone i niebieskie. W fazie jasnej powstaje ATP oraz NADPH, a jako produkt "
+    "uboczny uwalniany jest tlen. W fazie ciemnej, nazywanej cyklem Calvina, "
+    "dwutlenek węgla jest wiązany i przekształcany w glukozę. Intensywność "
+    "fotosyntezy zależy od natężenia światła, stężenia dwutlenku węgla oraz "
+    "temperatury. Glukoza może być zużywana w oddychaniu komórkowym lub "
+    "magazynowana w postaci skrobi."
+)
+
+
+class LatencyRecorder:
+    def __init__(self) -> None:
+        self._samples: Dict[str, List[float]] = defaultdict(list)
+        self._errors: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, endpoint: str, seconds: float, error: Optional[str] = None) -> None:
+        self._samples[endpoint].append(seconds)
+        if error:
+            self._errors[endpoint][error] += 1
+
+    def summary(self) -> Dict[str, Dict[str, object]]:
+        result: Dict[str, Dict[str, object]] = {}
+        for endpoint, samples in self._samples.items():
+            ordered = sorted(samples)
+            errors = dict(self._errors.get(endpoint, {}))
+            result[endpoint] = {
+                "count": len(ordered),
+                "errors": sum(errors.values()),
+                "error_kinds": errors,
+                "p50_ms": _percentile(ordered, 50) * 1000,
+                "p95_ms": _percentile(ordered, 95) * 1000,
+                "p99_ms": _percentile(ordered, 99) * 1000,
+                "max_ms": ordered[-1] * 1000,
+                "mean_ms": statistics.fmean(ordered) * 1000,
+            }
+        return result
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+@asynccontextmanager
+async def _client(base_url: Optional[str]) -> AsyncIterator[httpx.AsyncClient]:
+    timeout = httpx.Timeout(300.0)
+    if base_url:
+        async with httpx.AsyncClient(base_url=base_url, timeout=timeout) as client:
+            yield client
+        return
+
+    os.environ.setdefault("LLM_PROVIDER", "fake")
+    # Every request would otherwise hit the LLM cache after the first one.
+    os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+    os.environ.setdefault("SQL_ECHO", "false")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    from app.bootstrap import create_app
+
+    app = create_app()
+    await app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://loadtest", timeout=timeout
+        ) as client:
+            yield client
+    finally:
+        await app.router.shutdown()
+
+
+async def _create_users(client: httpx.AsyncClient, count: int) -> List[Dict[str, str]]:
+    run_id = uuid.uuid4().hex[:8]
+    headers: List[Dict[str, str]] = []
+    for index in range(count):
+        email = f"loadtest-{run_id}-{index}@example.com"
+        password = "loadtest-password"
+        response = await client.post(
+            "/auth/register",
+            json={
+                "email": email,
+                "password": password,
+                "first_name": "Load",
+                "last_name": f"Test {index}",
+            },
+        )
+        response.raise_for_status()
+        response = await client.post(
+            "/auth/login", data={"username": email, "password": password}
+        )
+        response.raise_for_status()
+        headers.append({"Authorization": f"Bearer {response.json()['access_token']}"})
+    return headers
+
+
+async def _timed(
+    recorder: LatencyRecorder,
+    endpoint: str,
+    request,
+) -> Optional[httpx.Response]:
+    started = time.perf_counter()
+    try:
+        response = await request
+    except httpx.HTTPError as exc:
+        recorder.record(endpoint, time.perf_counter() - started, exc.__class__.__name__)
+        return None
+    elapsed = time.perf_counter() - started
+    recorder.record(endpoint, elapsed, None if response.is_success else str(response.status_code))
+    return response if response.is_success else None
+
+
+async def _scenario(
+    client: httpx.AsyncClient,
+    recorder: LatencyRecorder,
+    *,
+    headers: Dict[str, str],
+    iteration: int,
+    text: str,
+    params: Dict[str, object],
+    export: str,
+) -> None:
+    # A per-iteration suffix keeps source texts distinct, like real uploads.
+    payload = {**params, "text": f"{text}\n\nWariant materiału nr {iteration}."}
+    response = await _timed(
+        recorder,
+        "POST /tests/generate",
+        client.post("/tests/generate", json=payload, headers=headers),
+    )
+    if response is None:
+        return
+
+    test_id = response.json()["test_id"]
+    await _timed(recorder, "GET /tests/{id}", client.get(f"/tests/{test_id}", headers=headers))
+    if export != "none":
+        await _timed(
+            recorder,
+            f"GET /tests/{{id}}/export/{export}",
+            client.get(f"/tests/{test_id}/export/{export}", headers=headers),
+        )
+
+
+async def run(args: argparse.Namespace) -> Tuple[Dict[str, Dict[str, object]], float, int]:
+    text = _SAMPLE_TEXT
+    if args.text_file:
+        with open(args.text_file, encoding="utf-8") as handle:
+            text = handle.read()
+
+    params = {
+        "closed": {
+            "true_false": args.true_false,
+            "single_choice": args.single_choice,
+            "multi_choice": args.multi_choice,
+        },
+        "num_open": args.num_open,
+    }
+    total = args.true_false + args.single_choice + args.multi_choice + args.num_open
+    params.update(easy=total - 2 * (total // 3), medium=total // 3, hard=total // 3)
+
+    recorder = LatencyRecorder()
+    async with _client(args.base_url) as client:
+        users = await _create_users(client, args.users)
+        total_requests = int(args.rps * args.duration)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        tasks = []
+        for iteration in range(total_requests):
+            delay = started + iteration / args.rps - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(
+                asyncio.create_task(
+                    _scenario(
+                        client,
+                        recorder,
+                        headers=users[iteration % len(users)],
+                        iteration=iteration,
+                        text=text,
+                        params=params,
+                        export=args.export,
+                    )
+                )
+            )
+        await asyncio.gather(*tasks)
+        wall = loop.time() - started
+
+    return recorder.summary(), wall, total_requests
+
+
+def _print_report(summary: Dict[str, Dict[str, object]], wall: float, scenarios: int) -> None:
+    print(f"\n{scenarios} scenarios in {wall:.1f}s ({scenarios / wall:.2f}/s)\n")
+    header = f"{'endpoint':<32} {'count':>6} {'errors':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+    print(header)
+    print("-" * len(header))
+    for endpoint, row in summary.items():
+        print(
+            f"{endpoint:<32} {row['count']:>6} {row['errors']:>6} "
+            f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['max_ms']:>9.1f}"
+        )
+        if row["error_kinds"]:
+            print(f"{'':<32} errors: {row['error_kinds']}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", help="Target a running server instead of an in-process app")
+    parser.add_argument("--rps", type=float, default=5.0, help="Scenario arrival rate per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to keep issuing scenarios")
+    parser.add_argument("--users", type=int, default=10, help="Distinct accounts to spread load over")
+    parser.add_argument("--export", choices=["xml", "pdf", "none"], default="xml")
+    parser.add_argument("--text-file", help="Source material to generate from (defaults to a sample)")
+    parser.add_argument("--true-false", type=int, default=3)
+    parser.add_argument("--single-choice", type=int, default=3)
+    parser.add_argument("--multi-choice", type=int, default=2)
+    parser.add_argument("--num-open", type=int, default=2)
+    parser.add_argument("--json", dest="json_path", help="Also write the summary as JSON to this path")
+    args = parser.parse_args(argv)
+
+    summary, wall, scenarios = asyncio.run(run(args))
+    _print_report(summary, wall, scenarios)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as handle:
+            json.dump(
+                {"wall_seconds": wall, "scenarios": scenarios, "endpoints": summary},
+                handle,
+                indent=2,
+            )
+    return 0 if not any(row["errors"] for row in summary.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
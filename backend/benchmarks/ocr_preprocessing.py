@@ -0,0 +1,135 @@
+"""OCR time and character yield with and without image preprocessing.
+
+Runs tesseract over each image twice, once on the raw file and once after
+``ImagePreprocessor``, and prints wall time, characters recognised and the
+mean time of every preprocessing stage. Without ``--image`` a synthetic
+"phone photo" of a page is generated: a 4000x3000 RGB image at 72 dpi with
+a grey background, text rotated by ``--skew`` degrees and wide empty
+borders. Requires the tesseract binary and the ``--lang`` traineddata.
+
+    cd backend
+    python -m benchmarks.ocr_preprocessing
+    python -m benchmarks.ocr_preprocessing --image scan1.jpg --image photo.png --repeat 3
+    python -m benchmarks.ocr_preprocessing --skew 0 --no-binarize
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+from app.infrastructure.ocr.engine import PytesseractEngine, ocr_file
+from app.infrastructure.ocr.preprocessing import ImagePreprocessor, PreprocessingConfig
+
+_SAMPLE_LINES = [
+    "Fotosynteza to proces, w którym rośliny zielone wytwarzają",
+    "związki organiczne z dwutlenku węgla i wody przy udziale",
+    "energii świetlnej. Zachodzi ona w chloroplastach, a kluczową",
+    "rolę odgrywa chlorofil pochłaniający światło czerwone i niebieskie.",
+    "W fazie jasnej powstaje ATP oraz NADPH, a jako produkt uboczny",
+    "uwalniany jest tlen. W fazie ciemnej, nazywanej cyklem Calvina,",
+    "dwutlenek węgla jest wiązany i przekształcany w glukozę.",
+]
+
+
+def _font(size: int) -> ImageFont.ImageFont:
+    for name in ("DejaVuSans.ttf", "LiberationSans-Regular.ttf", "Arial.ttf"):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
+def synthetic_photo(path: str, *, skew: float) -> None:
+    page = Image.new("L", (2400, 1400), 255)
+    draw = ImageDraw.Draw(page)
+    font = _font(56)
+    for number, line in enumerate(_SAMPLE_LINES * 2):
+        draw.text((80, 60 + number * 90), line, fill=20, font=font)
+    page = page.rotate(skew, resample=Image.BICUBIC, expand=True, fillcolor=255)
+
+    photo = Image.new("RGB", (4000, 3000), (170, 165, 160))
+    photo.paste(page.convert("RGB"), ((4000 - page.width) // 2, (3000 - page.height) // 2))
+    photo.save(path, dpi=(72, 72))
+
+
+def _mean(values: List[float]) -> float:
+    return statistics.fmean(values) if values else 0.0
+
+
+def _measure(
+    engine: PytesseractEngine, path: str, preprocessor: ImagePreprocessor | None, repeat: int
+) -> Tuple[List[float], int, Dict[str, List[float]]]:
+    timings: List[float] = []
+    stages: Dict[str, List[float]] = defaultdict(list)
+    chars = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        text, stage_ms = ocr_file(engine, path, preprocessor)
+        timings.append(time.perf_counter() - started)
+        chars = len("".join(text.split()))
+        for stage, ms in stage_ms.items():
+            stages[stage].append(ms)
+    return timings, chars, stages
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--image", action="append", default=[], help="image to OCR (repeatable)")
+    parser.add_argument("--lang", default=os.getenv("OCR_LANGUAGE", "pol"))
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--skew", type=float, default=2.5, help="rotation of the synthetic page")
+    parser.add_argument("--target-dpi", type=int, default=300)
+    parser.add_argument("--no-binarize", action="store_true")
+    parser.add_argument("--no-deskew", action="store_true")
+    parser.add_argument("--no-crop", action="store_true")
+    args = parser.parse_args(argv)
+
+    preprocessor = ImagePreprocessor(
+        PreprocessingConfig(
+            target_dpi=args.target_dpi,
+            binarize=not args.no_binarize,
+            deskew=not args.no_deskew,
+            crop_borders=not args.no_crop,
+        )
+    )
+    engine = PytesseractEngine(args.lang)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        images = list(args.image)
+        if not images:
+            path = os.path.join(workdir, "synthetic-photo.jpg")
+            synthetic_photo(path, skew=args.skew)
+            images.append(path)
+
+        for path in images:
+            with Image.open(path) as image:
+                size = image.size
+            print(f"\n{os.path.basename(path)} ({size[0]}x{size[1]})")
+            try:
+                raw_times, raw_chars, _ = _measure(engine, path, None, args.repeat)
+                pre_times, pre_chars, stages = _measure(engine, path, preprocessor, args.repeat)
+            except Exception as exc:  # noqa: BLE001
+                print(f"  OCR failed: {exc}", file=sys.stderr)
+                return 1
+            print(f"  {'':16}{'mean s':>10}{'chars':>10}")
+            print(f"  {'raw':16}{_mean(raw_times):>10.2f}{raw_chars:>10}")
+            print(f"  {'preprocessed':16}{_mean(pre_times):>10.2f}{pre_chars:>10}")
+            for stage, values in stages.items():
+                print(f"    {stage:14}{_mean(values):>10.1f} ms")
+            if _mean(pre_times):
+                print(f"  speed-up x{_mean(raw_times) / _mean(pre_times):.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
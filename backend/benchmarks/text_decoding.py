@@ -0,0 +1,113 @@
+"""Decoding speed of large text uploads: sampled detection vs whole-file chardet.
+
+Writes synthetic Polish text files in several encodings and reads each
+one twice: the old way (read all bytes, ``chardet.detect`` over all of
+them, decode) and through ``extract_text_from_file``, which detects the
+encoding from a bounded sample and decodes in chunks. Prints wall time,
+throughput, peak traced memory and whether both produced the same text.
+Without ``--memory`` peak memory is not traced, which keeps timings clean.
+Whole-file chardet runs at well under 1 MB/s on single-byte encodings;
+use ``--skip-baseline`` for large sizes.
+
+    cd backend
+    python -m benchmarks.text_decoding
+    python -m benchmarks.text_decoding --size-mb 32 --encoding cp1250 --memory
+    python -m benchmarks.text_decoding --size-mb 200 --skip-baseline
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from app.infrastructure.extractors import extract_text_from_file
+
+_SENTENCES = [
+    "Fotosynteza to proces, w którym rośliny zielone wytwarzają związki organiczne.",
+    "Zachodzi ona w chloroplastach, a kluczową rolę odgrywa chlorofil.",
+    "W fazie jasnej powstaje ATP oraz NADPH, a produktem ubocznym jest tlen.",
+    "Dwutlenek węgla jest wiązany w cyklu Calvina i przekształcany w glukozę.",
+    "Intensywność fotosyntezy zależy od natężenia światła i temperatury.",
+    "Żółte liście jesienią tracą chlorofil; źdźbła traw więdną szybciej.",
+    "Łódź, Gdańsk i Kraków prowadzą pomiary stężenia pyłów zawieszonych.",
+]
+_ENCODINGS = ["utf-8", "utf-8-sig", "cp1250", "iso-8859-2", "utf-16"]
+
+
+def synthetic_text(size_bytes: int, *, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    lines: List[str] = []
+    total = 0
+    while total < size_bytes:
+        line = " ".join(rng.choice(_SENTENCES) for _ in range(rng.randint(1, 4)))
+        lines.append(line)
+        total += len(line) + 1
+    return "\n".join(lines) + "\n"
+
+
+def _baseline(path: Path) -> str:
+    import chardet
+
+    data = path.read_bytes()
+    encoding = chardet.detect(data)["encoding"] or "utf-8"
+    return data.decode(encoding, errors="ignore")
+
+
+def _sampled(path: Path) -> str:
+    return extract_text_from_file(path, None) or ""
+
+
+def _run(read: Callable[[Path], str], path: Path, trace: bool) -> Tuple[float, Optional[int], str]:
+    if trace:
+        tracemalloc.start()
+    started = time.perf_counter()
+    text = read(path)
+    elapsed = time.perf_counter() - started
+    peak = None
+    if trace:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return elapsed, peak, text
+
+
+def _row(label: str, elapsed: float, peak: Optional[int], size: int) -> str:
+    memory = f"{peak / 1e6:>10.1f}" if peak is not None else f"{'-':>10}"
+    return f"  {label:10}{elapsed:>10.2f}{size / 1e6 / elapsed:>12.1f}{memory}"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=float, default=4.0, help="approximate text size per file")
+    parser.add_argument("--encoding", action="append", help=f"default: {', '.join(_ENCODINGS)}")
+    parser.add_argument("--memory", action="store_true", help="trace peak memory (slower)")
+    parser.add_argument("--skip-baseline", action="store_true", help="skip whole-file chardet")
+    args = parser.parse_args(argv)
+
+    text = synthetic_text(int(args.size_mb * 1e6))
+    with tempfile.TemporaryDirectory() as workdir:
+        for encoding in args.encoding or _ENCODINGS:
+            path = Path(workdir, f"sample-{encoding}.txt")
+            path.write_bytes(text.encode(encoding))
+            size = os.path.getsize(path)
+            print(f"\n{encoding} ({size / 1e6:.1f} MB)")
+            print(f"  {'':10}{'seconds':>10}{'MB/s':>12}{'peak MB':>10}")
+
+            elapsed, peak, sampled = _run(_sampled, path, args.memory)
+            print(_row("sampled", elapsed, peak, size))
+            if args.skip_baseline:
+                continue
+            elapsed, peak, baseline = _run(_baseline, path, args.memory)
+            print(_row("chardet", elapsed, peak, size))
+            print(f"  same text: {'yes' if sampled == baseline else 'NO'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""add generation run telemetry
+
+Revision ID: 3f8a61c0d2b4
+Revises: 9c4e2b7d1a63
+Create Date: 2026-10-18 14:02:17.220941
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '3f8a61c0d2b4'
+down_revision = '9c4e2b7d1a63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('generation_run',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=True),
+    sa.Column('test_id', sa.Integer(), nullable=True),
+    sa.Column('source_kind', sa.String(length=20), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('error_class', sa.String(length=120), nullable=True),
+    sa.Column('model_name', sa.String(length=120), nullable=True),
+    sa.Column('questions_requested', sa.Integer(), nullable=False),
+    sa.Column('questions_returned', sa.Integer(), nullable=False),
+    sa.Column('questions_saved', sa.Integer(), nullable=False),
+    sa.Column('reused_from_bank', sa.Integer(), nullable=False),
+    sa.Column('source_chars', sa.Integer(), nullable=False),
+    sa.Column('prompt_chars', sa.Integer(), nullable=False),
+    sa.Column('response_chars', sa.Integer(), nullable=False),
+    sa.Column('prompt_tokens', sa.Integer(), nullable=False),
+    sa.Column('output_tokens', sa.Integer(), nullable=False),
+    sa.Column('total_tokens', sa.Integer(), nullable=False),
+    sa.Column('llm_calls', sa.Integer(), nullable=False),
+    sa.Column('cost_usd', sa.Float(), nullable=False),
+    sa.Column('source_ms', sa.Float(), nullable=False),
+    sa.Column('prompt_ms', sa.Float(), nullable=False),
+    sa.Column('llm_ms', sa.Float(), nullable=False),
+    sa.Column('parse_ms', sa.Float(), nullable=False),
+    sa.Column('store_ms', sa.Float(), nullable=False),
+    sa.Column('total_ms', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['owner_id'], ['user.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_generation_run_owner_id'), 'generation_run', ['owner_id'], unique=False)
+    op.create_index(op.f('ix_generation_run_created_at'), 'generation_run', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_generation_run_created_at'), table_name='generation_run')
+    op.drop_index(op.f('ix_generation_run_owner_id'), table_name='generation_run')
+    op.drop_table('generation_run')
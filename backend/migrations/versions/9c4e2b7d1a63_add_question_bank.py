@@ -0,0 +1,41 @@
+"""add question bank
+
+Revision ID: 9c4e2b7d1a63
+Revises: 51acd0300351
+Create Date: 2026-10-18 10:12:41.508213
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '9c4e2b7d1a63'
+down_revision = '51acd0300351'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('question_bank',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('source_checksum', sa.String(length=64), nullable=False),
+    sa.Column('fingerprint', sa.String(length=64), nullable=False),
+    sa.Column('question_type', sa.String(length=20), nullable=False),
+    sa.Column('text', sa.String(), nullable=False),
+    sa.Column('is_closed', sa.Boolean(), nullable=False),
+    sa.Column('difficulty', sa.Integer(), nullable=False),
+    sa.Column('choices', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('correct_choices', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('times_used', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('last_used_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('source_checksum', 'fingerprint', name='uq_question_bank_source_fingerprint')
+    )
+    op.create_index(op.f('ix_question_bank_source_checksum'), 'question_bank', ['source_checksum'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_question_bank_source_checksum'), table_name='question_bank')
+    op.drop_table('question_bank')
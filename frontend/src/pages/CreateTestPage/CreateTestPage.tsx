@@ -1,7 +1,11 @@
 import React, { useRef, useState } from "react";
 import { useNavigate, useOutletContext } from "react-router-dom";
 import { generateTest } from "../../services/test";
-import { uploadMaterial, type MaterialUploadResponse } from "../../services/materials";
+import {
+  uploadMaterial,
+  waitForMaterial,
+  type MaterialUploadResponse,
+} from "../../services/materials";
 import Footer from "../../components/Footer/Footer";
 import { useLoader } from "../../components/Loader/GlobalLoader";
 import useDocumentTitle from "../../components/GeneralComponents/Hooks/useDocumentTitle";
@@ -84,7 +88,10 @@ const CreateTestPage: React.FC = () => {
     setMaterialError(null);
     setMaterialUploading(true);
     try {
-      const uploaded = await uploadMaterial(file);
+      let uploaded = await uploadMaterial(file);
+      if (uploaded.processing_status === "pending") {
+        uploaded = await waitForMaterial(uploaded.id);
+      }
       if (uploaded.processing_status === "done") {
         setMaterialData(uploaded);
         setGenError(null);
@@ -33,3 +33,58 @@ export async function uploadMaterial(file: File): Promise<MaterialUploadResponse
 
   return res.json();
 }
+
+function authHeaders(): HeadersInit {
+  return { Authorization: `Bearer ${localStorage.getItem("access_token")}` };
+}
+
+export async function getMaterial(id: number): Promise<MaterialUploadResponse> {
+  const res = await fetch(`${API_BASE}/materials/${id}`, { headers: authHeaders() });
+  if (!res.ok) {
+    const err = await res.json().catch(() => ({}));
+    throw new Error(err.detail || "Nie udało się pobrać materiału");
+  }
+  return res.json();
+}
+
+// Follows GET /materials/{id}/events (server-sent events) until processing
+// settles, then returns the full material including the extracted text.
+// EventSource cannot send the Authorization header, so the stream is read via fetch.
+export async function waitForMaterial(id: number): Promise<MaterialUploadResponse> {
+  const res = await fetch(`${API_BASE}/materials/${id}/events`, { headers: authHeaders() });
+  if (!res.ok || !res.body) {
+    const err = await res.json().catch(() => ({}));
+    throw new Error(err.detail || "Nie udało się śledzić przetwarzania materiału");
+  }
+
+  const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = "";
+  let status = "pending";
+  while (status === "pending") {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += value;
+    let boundary = buffer.indexOf("\n\n");
+    while (boundary !== -1) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf("\n\n");
+      const event = block.match(/^event: (.*)$/m)?.[1];
+      const data = block.match(/^data: (.*)$/m)?.[1];
+      if (event === "status" && data) {
+        status = JSON.parse(data).processing_status;
+      } else if (event === "timeout" || event === "deleted") {
+        status = event;
+      }
+    }
+  }
+  await reader.cancel().catch(() => undefined);
+
+  if (status === "pending" || status === "timeout") {
+    throw new Error("Przetwarzanie materiału trwa zbyt długo. Spróbuj ponownie później.");
+  }
+  if (status === "deleted") {
+    throw new Error("Materiał został usunięty.");
+  }
+  return getMaterial(id);
+}